@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+📚 BATCH READER - ExcelTools
+============================
+
+Lettura di più file CSV/Excel in un pool di processi: ogni file viene
+restituito appena pronto e un file illeggibile non interrompe gli altri.
+
+Diverso da modules/batch_reader.py: legge anche i fogli e le colonne
+scelti nel selettore (sheet_reader, projection), che l'app principale non
+ha, e restituisce quindi anche il foglio di ogni lettura.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from projection import read_columns
+from sheet_reader import cache_key, default_max_workers
+
+DATA_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+
+# (percorso, foglio, DataFrame, errore)
+FileResult = Tuple[str, object, Optional[pd.DataFrame], Optional[Exception]]
+
+
+def read_data_file(filepath: str, parse_cache=None, sheet_name=None,
+                   usecols: Optional[List] = None) -> pd.DataFrame:
+    """
+    Legge un file CSV o Excel (dalla cache su disco se disponibile).
+    sheet_name e usecols limitano la lettura al foglio e alle colonne scelte.
+    """
+    if filepath.endswith('.csv'):
+        def reader():
+            return pd.read_csv(filepath, usecols=usecols)
+    else:
+        def reader():
+            return read_columns(filepath, usecols, sheet_name)
+    if parse_cache is None:
+        return reader()
+    extra = ""
+    if sheet_name is not None or usecols:
+        extra = cache_key(sheet_name, usecols)
+    return parse_cache.load(filepath, reader, extra)
+
+
+def data_file_jobs(filepaths: List[str],
+                   selections: Optional[Dict[str, Dict]] = None
+                   ) -> List[Tuple[str, object, Optional[List]]]:
+    """
+    Letture da eseguire come (percorso, foglio, colonne). selections
+    associa a un percorso {foglio: colonne o None}; senza scelta si legge
+    il primo foglio.
+    """
+    selections = selections or {}
+    jobs = []
+    for filepath in filepaths:
+        chosen = selections.get(filepath)
+        if not chosen:
+            jobs.append((filepath, None, None))
+        elif filepath.endswith('.csv'):
+            jobs.append((filepath, None, next(iter(chosen.values()))))
+        else:
+            jobs.extend((filepath, sheet_name, usecols)
+                        for sheet_name, usecols in chosen.items())
+    return jobs
+
+
+def iter_data_files(filepaths: List[str], max_workers: Optional[int] = None,
+                    parse_cache=None,
+                    selections: Optional[Dict[str, Dict]] = None
+                    ) -> Iterator[FileResult]:
+    """
+    Restituisce (percorso, foglio, DataFrame, errore) per ogni lettura di
+    data_file_jobs nell'ordine di completamento (foglio None = primo foglio).
+    Il numero di processi segue config.ini [PERFORMANCE].
+    """
+    if max_workers is None:
+        max_workers = default_max_workers()
+    jobs = data_file_jobs(filepaths, selections)
+
+    if max_workers <= 1 or len(jobs) <= 1:
+        for filepath, sheet_name, usecols in jobs:
+            try:
+                df = read_data_file(filepath, parse_cache, sheet_name, usecols)
+                yield filepath, sheet_name, df, None
+            except Exception as e:
+                yield filepath, sheet_name, None, e
+        return
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+        futures = {
+            pool.submit(read_data_file, filepath, parse_cache, sheet_name,
+                        usecols): (filepath, sheet_name)
+            for filepath, sheet_name, usecols in jobs
+        }
+        for future in as_completed(futures):
+            filepath, sheet_name = futures[future]
+            try:
+                yield filepath, sheet_name, future.result(), None
+            except Exception as e:
+                yield filepath, sheet_name, None, e
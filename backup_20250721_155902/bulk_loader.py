@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+🚚 BULK LOADER - ExcelTools
+===========================
+
+Caricamento massivo di DataFrame in SQLite: CREATE TABLE tipizzata,
+executemany a blocchi in un'unica transazione, PRAGMA di import
+ripristinati alla fine e indici creati solo dopo il caricamento.
+Import incrementale (upsert) per chiave o per riga intera, calcolato in SQL.
+"""
+
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("BulkLoader")
+
+# PRAGMA applicati durante l'import e ripristinati al termine
+IMPORT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "OFF",
+    "cache_size": -262144,  # 256 MB (valori negativi = KiB)
+}
+
+# Tabella temporanea con le righe da confrontare nell'upsert
+STAGING_TABLE = "_upsert_staging"
+
+
+def quote_identifier(name: Any) -> str:
+    """Quota un nome di tabella/colonna per SQLite"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def sqlite_type(dtype) -> str:
+    """Tipo SQLite corrispondente al dtype pandas (come DataFrame.to_sql)"""
+    if (pd.api.types.is_bool_dtype(dtype)
+            or pd.api.types.is_integer_dtype(dtype)):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "TIMESTAMP"
+    return "TEXT"
+
+
+def column_values(series: pd.Series) -> List[Any]:
+    """Valori Python della colonna pronti per sqlite3 (NaN/NaT -> None)"""
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        if series.dt.tz is not None:
+            values = series.astype(object).where(series.notna(), None)
+            return [None if v is None else v.isoformat(" ")
+                    for v in values.tolist()]
+        # Stesso testo di datetime.isoformat(" "), ma vettorizzato
+        text = series.dt.strftime("%Y-%m-%d %H:%M:%S")
+        fractional = series.dt.microsecond != 0
+        if fractional.any():
+            text[fractional] = series[fractional].dt.strftime(
+                "%Y-%m-%d %H:%M:%S.%f")
+        return text.astype(object).where(series.notna(), None).tolist()
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biu":
+        return series.tolist()
+    if (isinstance(series.dtype, np.dtype) and series.dtype.kind == "f"
+            and not series.isna().any()):
+        return series.tolist()
+    values = series.astype(object).where(series.notna(), None).tolist()
+    return [str(v) if isinstance(v, pd.Timedelta) else v for v in values]
+
+
+class BulkLoader:
+    """Carica DataFrame in una connessione SQLite con throughput elevato"""
+
+    def __init__(self, conn: sqlite3.Connection, batch_size: int = 50000):
+        self.conn = conn
+        self.batch_size = batch_size
+
+    def _set_pragmas(self, pragmas: Dict[str, Any]) -> Dict[str, Any]:
+        """Applica i PRAGMA e restituisce i valori precedenti"""
+        previous = {}
+        for name, value in pragmas.items():
+            previous[name] = self.conn.execute(f"PRAGMA {name}").fetchone()[0]
+            self.conn.execute(f"PRAGMA {name} = {value}")
+        return previous
+
+    @contextmanager
+    def import_transaction(self):
+        """Unica transazione esplicita con i PRAGMA di import attivi"""
+        self.conn.commit()
+        isolation_level = self.conn.isolation_level
+        self.conn.isolation_level = None  # Transazione gestita esplicitamente
+        previous = self._set_pragmas(IMPORT_PRAGMAS)
+        try:
+            self.conn.execute("BEGIN")
+            try:
+                yield
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        finally:
+            self._set_pragmas(previous)
+            self.conn.isolation_level = isolation_level
+
+    def table_columns(self, table_name: str) -> List[tuple]:
+        """Colonne della tabella come (nome, tipo dichiarato), o lista vuota"""
+        rows = self.conn.execute(
+            f"PRAGMA table_info({quote_identifier(table_name)})").fetchall()
+        return [(row[1], row[2].upper()) for row in rows]
+
+    def load_dataframe(self, df: pd.DataFrame, table_name: str,
+                       if_exists: str = "replace",
+                       index_columns: Optional[List[str]] = None
+                       ) -> Dict[str, Any]:
+        """
+        Scrive df nella tabella table_name.
+        if_exists: 'replace' ricrea la tabella, 'append' aggiunge le righe,
+        'fail' solleva errore.
+        Restituisce righe scritte, durata e righe al secondo.
+        """
+        start = time.perf_counter()
+        table = quote_identifier(table_name)
+        columns = ", ".join(quote_identifier(col) for col in df.columns)
+        placeholders = ", ".join("?" for _ in df.columns)
+
+        with self.import_transaction():
+            exists = self.conn.execute(
+                "SELECT 1 FROM sqlite_master "
+                "WHERE type = 'table' AND name = ?",
+                (str(table_name),)).fetchone() is not None
+            if exists and if_exists == "fail":
+                raise ValueError(f"Tabella '{table_name}' già esistente")
+            if exists and if_exists == "replace":
+                self.conn.execute(f"DROP TABLE {table}")
+            if not exists or if_exists == "replace":
+                definitions = ", ".join(
+                    f"{quote_identifier(col)} "
+                    f"{sqlite_type(df.iloc[:, i].dtype)}"
+                    for i, col in enumerate(df.columns))
+                self.conn.execute(f"CREATE TABLE {table} ({definitions})")
+
+            insert = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+            for offset in range(0, len(df), self.batch_size):
+                batch = df.iloc[offset:offset + self.batch_size]
+                values = [column_values(batch.iloc[:, i])
+                          for i in range(batch.shape[1])]
+                self.conn.executemany(insert, zip(*values))
+
+            # Indici creati solo dopo il caricamento dei dati
+            for col in index_columns or []:
+                index_name = quote_identifier(f"idx_{table_name}_{col}")
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {index_name} "
+                    f"ON {table} ({quote_identifier(col)})")
+
+        elapsed = time.perf_counter() - start
+        rows_per_second = len(df) / elapsed if elapsed > 0 else float(len(df))
+        logger.info(f"Bulk load '{table_name}': {len(df)} righe in "
+                    f"{elapsed:.2f}s ({rows_per_second:,.0f} righe/s)")
+        return {
+            "table": table_name,
+            "rows": len(df),
+            "seconds": elapsed,
+            "rows_per_second": rows_per_second,
+        }
+
+    def upsert_dataframe(self, df: pd.DataFrame, table_name: str,
+                         key_columns: Optional[List[str]] = None
+                         ) -> Dict[str, Any]:
+        """
+        Import incrementale: confronta df con la tabella esistente e applica
+        solo le righe inserite, aggiornate ed eliminate. Il confronto avviene
+        in SQL su una tabella temporanea, nella stessa transazione delle
+        modifiche. Con key_columns le righe sono identificate dalla chiave
+        (le righe con la stessa chiave e valori diversi sono aggiornate);
+        senza chiave dall'intera riga (le modifiche risultano come
+        eliminazione + inserimento).
+        Se la tabella non esiste o le colonne sono cambiate viene ricreata.
+        """
+        start = time.perf_counter()
+        table = quote_identifier(table_name)
+        columns = [str(col) for col in df.columns]
+        existing_columns = self.table_columns(table_name)
+
+        if [name for name, _ in existing_columns] != columns:
+            previous_rows = 0
+            if existing_columns:
+                previous_rows = self.conn.execute(
+                    f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            stats = self.load_dataframe(df, table_name, if_exists="replace")
+            stats.update(mode="replace", inserted=len(df), updated=0,
+                         deleted=previous_rows)
+            return stats
+
+        key_columns = [str(col) for col in key_columns or []]
+        missing = [col for col in key_columns if col not in columns]
+        if missing:
+            raise ValueError(
+                f"Colonne chiave non trovate: {', '.join(missing)}")
+
+        with self.import_transaction():
+            # Righe importate in una tabella temporanea con gli stessi tipi
+            # dichiarati: l'affinità converte i valori come nella tabella
+            # di destinazione e il confronto avviene in SQL sui valori reali
+            self._stage_rows(df, existing_columns)
+            if key_columns:
+                counts = self._apply_by_key(table, columns, key_columns)
+            else:
+                counts = self._apply_by_row(table, columns)
+            self.conn.execute(f"DROP TABLE temp.{STAGING_TABLE}")
+        inserted, updated, deleted = counts
+
+        elapsed = time.perf_counter() - start
+        rows_per_second = len(df) / elapsed if elapsed > 0 else float(len(df))
+        logger.info(f"Upsert '{table_name}': +{inserted} ~{updated} "
+                    f"-{deleted} su {len(df)} righe in {elapsed:.2f}s "
+                    f"({rows_per_second:,.0f} righe/s)")
+        return {
+            "table": table_name,
+            "rows": len(df),
+            "mode": "upsert",
+            "inserted": inserted,
+            "updated": updated,
+            "deleted": deleted,
+            "seconds": elapsed,
+            "rows_per_second": rows_per_second,
+        }
+
+    def _changes(self, sql: str, params=()) -> int:
+        """Righe modificate dall'istruzione (anche con WITH iniziale)"""
+        before = self.conn.total_changes
+        self.conn.execute(sql, params)
+        return self.conn.total_changes - before
+
+    def _stage_rows(self, df: pd.DataFrame, existing_columns: List[tuple]):
+        """Copia df in temp.STAGING_TABLE con i tipi della tabella esistente"""
+        definitions = ", ".join(
+            f"{quote_identifier(name)} {declared}"
+            for name, declared in existing_columns)
+        self.conn.execute(f"DROP TABLE IF EXISTS temp.{STAGING_TABLE}")
+        self.conn.execute(
+            f"CREATE TEMP TABLE {STAGING_TABLE} ({definitions})")
+        placeholders = ", ".join("?" for _ in existing_columns)
+        insert = f"INSERT INTO temp.{STAGING_TABLE} VALUES ({placeholders})"
+        for offset in range(0, len(df), self.batch_size):
+            batch = df.iloc[offset:offset + self.batch_size]
+            values = [column_values(batch.iloc[:, i])
+                      for i in range(batch.shape[1])]
+            self.conn.executemany(insert, zip(*values))
+
+    def _apply_by_key(self, table: str, columns: List[str],
+                      key_columns: List[str]) -> tuple:
+        """Eliminazioni, aggiornamenti e inserimenti per chiave"""
+        staging = f"temp.{STAGING_TABLE}"
+        keys = ", ".join(quote_identifier(col) for col in key_columns)
+        self.conn.execute(
+            f"CREATE INDEX temp.{STAGING_TABLE}_key ON {STAGING_TABLE} "
+            f"({keys})")
+
+        duplicate = self.conn.execute(
+            f"SELECT {keys} FROM {staging} GROUP BY {keys} "
+            f"HAVING COUNT(*) > 1 LIMIT 1").fetchone()
+        if duplicate is not None:
+            raise ValueError(
+                f"Chiave duplicata nei dati importati: {tuple(duplicate)}")
+
+        # IS: confronto che considera uguali i NULL, come tra tuple Python
+        def match(left: str, right: str, names: List[str]) -> str:
+            return " AND ".join(
+                f"{left}.{quote_identifier(col)} IS "
+                f"{right}.{quote_identifier(col)}" for col in names)
+
+        # Chiavi duplicate in tabella: resta la riga inserita per ultima
+        deleted = self._changes(
+            f"DELETE FROM {table} WHERE rowid NOT IN "
+            f"(SELECT MAX(rowid) FROM {table} GROUP BY {keys})")
+        deleted += self._changes(
+            f"DELETE FROM {table} AS t WHERE NOT EXISTS "
+            f"(SELECT 1 FROM {staging} AS s "
+            f"WHERE {match('s', 't', key_columns)})")
+
+        values = [col for col in columns if col not in key_columns]
+        updated = 0
+        if values:
+            targets = ", ".join(quote_identifier(col) for col in values)
+            sources = ", ".join(f"s.{quote_identifier(col)}" for col in values)
+            differs = " OR ".join(
+                f"s.{quote_identifier(col)} IS NOT t.{quote_identifier(col)}"
+                for col in values)
+            updated = self._changes(
+                f"UPDATE {table} AS t SET ({targets}) = "
+                f"(SELECT {sources} FROM {staging} AS s "
+                f"WHERE {match('s', 't', key_columns)}) "
+                f"WHERE EXISTS (SELECT 1 FROM {staging} AS s "
+                f"WHERE {match('s', 't', key_columns)} AND ({differs}))")
+
+        # Chiavi nuove con EXCEPT (nessuna ricerca riga per riga nella
+        # tabella di destinazione, che può non avere indici sulla chiave)
+        names = ", ".join(quote_identifier(col) for col in columns)
+        selected = ", ".join(f"s.{quote_identifier(col)}" for col in columns)
+        inserted = self._changes(
+            f"INSERT INTO {table} ({names}) SELECT {selected} FROM "
+            f"(SELECT {keys} FROM {staging} EXCEPT SELECT {keys} FROM {table})"
+            f" AS k JOIN {staging} AS s ON {match('s', 'k', key_columns)}")
+        return inserted, updated, deleted
+
+    def _apply_by_row(self, table: str, columns: List[str]) -> tuple:
+        """
+        Confronto per riga intera come multiinsieme: la n-esima copia di una
+        riga resta se i dati importati ne contengono almeno n.
+        """
+        staging = f"temp.{STAGING_TABLE}"
+        names = ", ".join(quote_identifier(col) for col in columns)
+        numbered = (f"SELECT {names}, ROW_NUMBER() OVER "
+                    f"(PARTITION BY {names}) AS _copy FROM {staging}")
+        self.conn.execute(
+            f"CREATE TEMP TABLE {STAGING_TABLE}_rows AS {numbered}")
+        self.conn.execute(
+            f"CREATE INDEX temp.{STAGING_TABLE}_rows_all ON "
+            f"{STAGING_TABLE}_rows ({names}, _copy)")
+
+        existing = (f"SELECT rowid AS _rid, {names}, ROW_NUMBER() OVER "
+                    f"(PARTITION BY {names} ORDER BY rowid) AS _copy "
+                    f"FROM {table}")
+        match = " AND ".join(
+            f"s.{quote_identifier(col)} IS o.{quote_identifier(col)}"
+            for col in columns)
+        deleted = self._changes(
+            f"WITH o AS ({existing}) DELETE FROM {table} WHERE rowid IN "
+            f"(SELECT _rid FROM o WHERE NOT EXISTS "
+            f"(SELECT 1 FROM temp.{STAGING_TABLE}_rows AS s "
+            f"WHERE {match} AND s._copy = o._copy))")
+
+        # Le copie rimaste sono numerate 1..n: mancano quelle oltre n
+        current = (f"SELECT {names}, ROW_NUMBER() OVER "
+                   f"(PARTITION BY {names} ORDER BY rowid) FROM {table}")
+        inserted = self._changes(
+            f"INSERT INTO {table} ({names}) SELECT {names} FROM "
+            f"(SELECT {names}, _copy FROM temp.{STAGING_TABLE}_rows "
+            f"EXCEPT {current})")
+        self.conn.execute(f"DROP TABLE temp.{STAGING_TABLE}_rows")
+        return inserted, 0, deleted
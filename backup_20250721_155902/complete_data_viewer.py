@@ -21,11 +21,16 @@ import os
 class DataVisualizer:
     """Visualizzatore avanzato per dati Excel"""
 
-    def __init__(self, parent):
+    def __init__(self, parent, on_columns_changed=None):
         self.parent = parent
         self.current_data = None
         self.filtered_data = None
         self.selected_columns = []
+        # File di origine e sue colonne: la selezione viene applicata
+        # rileggendo solo le colonne scelte
+        self.file_path = None
+        self.all_columns = None
+        self.on_columns_changed = on_columns_changed
 
     def create_data_viewer_window(self):
         """Crea finestra principale visualizzazione dati"""
@@ -303,10 +308,10 @@ class DataVisualizer:
         canvas.create_window((0, 0), window=self.columns_scrollable_frame, anchor="nw")
         canvas.configure(yscrollcommand=scrollbar.set)
 
-        # Checkbox per ogni colonna
+        # Checkbox per ogni colonna del file (caricate selezionate di default)
         self.column_vars = {}
-        for i, col in enumerate(self.current_data.columns):
-            var = tk.BooleanVar(value=True)  # Selezionate di default
+        for i, col in enumerate(self.all_columns or self.current_data.columns):
+            var = tk.BooleanVar(value=col in self.current_data.columns)
             self.column_vars[col] = var
 
             # Frame per checkbox con info
@@ -321,10 +326,13 @@ class DataVisualizer:
 
             # Info colonna
             try:
-                col_type = str(self.current_data[col].dtype)
-                non_null = self.current_data[col].count()
-                total = len(self.current_data)
-                info_text = f"  ({col_type} - {non_null}/{total} valori)"
+                if col in self.current_data.columns:
+                    col_type = str(self.current_data[col].dtype)
+                    non_null = self.current_data[col].count()
+                    total = len(self.current_data)
+                    info_text = f"  ({col_type} - {non_null}/{total} valori)"
+                else:
+                    info_text = "  (non caricata)"
 
                 info_label = tk.Label(col_frame, text=info_text, bg='#2b2b2b', fg='#cccccc',
                                      font=("Arial", 8))
@@ -401,9 +409,26 @@ class DataVisualizer:
             messagebox.showwarning("Avviso", "Seleziona almeno una colonna!")
             return
 
-        # Applica selezione
+        # Applica selezione: le colonne escluse vengono liberate, quelle
+        # mancanti rilette dal file (solo loro e le già scelte)
         self.selected_columns = selected_cols
-        display_data = self.current_data[selected_cols]
+        if any(col not in self.current_data.columns for col in selected_cols):
+            from projection import read_columns
+            try:
+                self.current_data = read_columns(self.file_path, selected_cols)
+            except Exception as e:
+                messagebox.showerror("Errore", f"Errore lettura colonne: {e}")
+                return
+            self.filtered_data = None
+            self.filter_info_label.config(text="Nessun filtro applicato")
+        elif len(selected_cols) < len(self.current_data.columns):
+            self.current_data = self.current_data[selected_cols]
+            if self.filtered_data is not None:
+                self.filtered_data = self.filtered_data[selected_cols]
+        display_data = (self.filtered_data if self.filtered_data is not None
+                        else self.current_data)
+        if self.on_columns_changed:
+            self.on_columns_changed(self.current_data, selected_cols)
 
         # Aggiorna vista dati
         self.data_tree.destroy()
@@ -628,13 +653,19 @@ class AdvancedExcelToolsComplete:
 
             self.root.update()
 
-            # Importa dati
-            import pandas as pd
+            # Importa dati: se per il file esiste una vista salvata si
+            # leggono solo le sue colonne
+            from projection import read_columns
+            from workbook_inspector import inspect_file
 
-            if file_path.endswith('.csv'):
-                self.current_data = pd.read_csv(file_path)
-            else:
-                self.current_data = pd.read_excel(file_path)
+            sheets_info = inspect_file(file_path, sample_rows=0)
+            all_columns = (list(sheets_info[0]['headers'])
+                           if sheets_info else None)
+            view_columns = self.load_column_view(file_path)
+            if view_columns and not (
+                    all_columns and set(view_columns) <= set(all_columns)):
+                view_columns = None  # Struttura del file cambiata
+            self.current_data = read_columns(file_path, view_columns)
 
             # Salva info nel database
             filename = os.path.basename(file_path)
@@ -654,16 +685,24 @@ class AdvancedExcelToolsComplete:
             )
 
             # Crea visualizzatore
-            self.data_visualizer = DataVisualizer(self.root)
+            self.data_visualizer = DataVisualizer(self.root,
+                                                  self.on_columns_changed)
             self.data_visualizer.current_data = self.current_data
+            self.data_visualizer.file_path = file_path
+            self.data_visualizer.all_columns = all_columns
+            if view_columns:
+                self.data_visualizer.selected_columns = list(
+                    self.current_data.columns)
 
             # Mostra anteprima automatica
+            view_note = (f" (vista salvata, {len(all_columns)} nel file)"
+                         if view_columns else "")
             preview_msg = f"""
 🎉 File importato con successo!
 
 📄 File: {filename}
 📊 Righe: {len(self.current_data):,}
-📋 Colonne: {len(self.current_data.columns)}
+📋 Colonne: {len(self.current_data.columns)}{view_note}
 💾 Dimensione: {self.current_data.memory_usage(deep=True).sum() / 1024 / 1024:.2f} MB
 
 🔍 Anteprima colonne:
@@ -680,6 +719,47 @@ Vuoi aprire immediatamente il visualizzatore dati completo?
                 progress_window.destroy()
             messagebox.showerror("Errore Importazione", f"Errore durante l'importazione:\n{str(e)}")
 
+    def load_column_view(self, file_path):
+        """Colonne della vista salvata per il file, o None"""
+        try:
+            cursor = self.db_connection.cursor()
+            cursor.execute(
+                "SELECT query_data FROM saved_queries WHERE name = ? "
+                "ORDER BY id DESC LIMIT 1",
+                (f"vista_colonne:{file_path}",))
+            row = cursor.fetchone()
+            return json.loads(row[0]).get('selected_columns') if row else None
+        except Exception:
+            return None
+
+    def on_columns_changed(self, data, selected_columns):
+        """
+        Selezione colonne applicata nel visualizzatore: salvata come
+        vista del file
+        """
+        self.current_data = data
+        file_path = self.data_visualizer.file_path
+        all_columns = self.data_visualizer.all_columns or []
+        name = f"vista_colonne:{file_path}"
+        try:
+            cursor = self.db_connection.cursor()
+            cursor.execute("DELETE FROM saved_queries WHERE name = ?", (name,))
+            if selected_columns != all_columns:
+                cursor.execute(
+                    "INSERT INTO saved_queries (name, query_data) "
+                    "VALUES (?, ?)",
+                    (name, json.dumps({'file_path': file_path,
+                                       'selected_columns': selected_columns})))
+            self.db_connection.commit()
+        except Exception as e:
+            messagebox.showerror("Errore Database",
+                                 f"Errore salvataggio vista: {e}")
+
+        self.file_info_label.config(
+            text=f"📊 {os.path.basename(file_path)} | {len(data):,} righe | "
+                 f"{len(data.columns)} colonne"
+        )
+
     def show_data_visualizer(self):
         """Mostra visualizzatore dati completo"""
         if self.current_data is None:
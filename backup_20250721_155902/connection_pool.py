@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+🔌 CONNECTION POOL - ExcelTools
+===============================
+
+Connessioni SQLite condivise per file di database, configurate una sola
+volta da config.ini [DATABASE]:
+- una connessione di lettura per thread (query_only), riutilizzata dai
+  thread successivi quando il thread proprietario termina, così schema e
+  cache delle pagine restano caldi;
+- un'unica connessione di scrittura serializzata da un lock, con commit
+  o rollback automatico;
+- PRAGMA ottimizzati (WAL: le letture non bloccano la scrittura) e cache
+  delle istruzioni preparate (cached_statements) su ogni connessione.
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+from settings import load_config
+
+
+class ConnectionPool:
+    """Lettori per thread e scrittore unico su un file SQLite"""
+
+    def __init__(self, db_path: str, journal_mode: str = "WAL",
+                 synchronous: str = "NORMAL", cache_size_mb: int = 64,
+                 mmap_size_mb: int = 256, busy_timeout_ms: int = 5000,
+                 statement_cache_size: int = 256, max_idle_readers: int = 4):
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.statement_cache_size = statement_cache_size
+        self.max_idle_readers = max_idle_readers
+        self.pragmas = {
+            "busy_timeout": busy_timeout_ms,
+            "cache_size": -cache_size_mb * 1024,  # valori negativi = KiB
+            "mmap_size": mmap_size_mb * 1024 * 1024,
+            "temp_store": "MEMORY",
+        }
+        self.synchronous = synchronous
+        self.journal_mode = journal_mode
+
+        self._lock = threading.Lock()
+        self._readers: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._idle: List[sqlite3.Connection] = []
+        self._writer = None
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        self.readers_opened = 0
+        self.readers_reused = 0
+
+    @classmethod
+    def from_config(cls, db_path: str, config=None) -> "ConnectionPool":
+        """Pool con i parametri di config.ini [DATABASE]"""
+        config = config or load_config()
+        section = "DATABASE"
+        return cls(
+            db_path,
+            journal_mode=config.get(section, "journal_mode", fallback="WAL"),
+            synchronous=config.get(section, "synchronous",
+                                   fallback="NORMAL"),
+            cache_size_mb=config.getint(section, "cache_size_mb",
+                                        fallback=64),
+            mmap_size_mb=config.getint(section, "mmap_size_mb",
+                                       fallback=256),
+            busy_timeout_ms=config.getint(section, "busy_timeout_ms",
+                                          fallback=5000),
+            statement_cache_size=config.getint(
+                section, "statement_cache_size", fallback=256),
+            max_idle_readers=config.getint(section, "max_idle_readers",
+                                           fallback=4),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        # check_same_thread=False: le connessioni passano da un thread
+        # terminato al successivo e close() può avvenire da qualsiasi thread
+        conn = sqlite3.connect(self.db_path,
+                               timeout=self.busy_timeout_ms / 1000,
+                               check_same_thread=False,
+                               cached_statements=self.statement_cache_size)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _reclaim(self):
+        """
+        Rende disponibili le connessioni dei thread terminati (lock già
+        acquisito)
+        """
+        for thread in [t for t in self._readers if not t.is_alive()]:
+            conn = self._readers.pop(thread)
+            if conn.in_transaction:
+                conn.rollback()
+            if len(self._idle) < self.max_idle_readers:
+                self._idle.append(conn)
+            else:
+                conn.close()
+
+    def reader(self) -> sqlite3.Connection:
+        """Connessione di sola lettura del thread corrente"""
+        thread = threading.current_thread()
+        conn = self._readers.get(thread)
+        if conn is not None:
+            return conn
+        with self._lock:
+            self._reclaim()
+            if self._idle:
+                conn = self._idle.pop()
+                self.readers_reused += 1
+            else:
+                conn = self.open_reader()
+                self.readers_opened += 1
+            self._readers[thread] = conn
+        return conn
+
+    def open_reader(self) -> sqlite3.Connection:
+        """
+        Connessione di sola lettura non condivisa (la chiude il chiamante)
+        """
+        conn = self._connect()
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """with pool.read() as conn: letture senza aprire/chiudere il file"""
+        yield self.reader()
+
+    def _writer_connection(self) -> sqlite3.Connection:
+        if self._writer is None:
+            conn = self._connect()
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+            conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+            self._writer = conn
+        return self._writer
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """
+        Connessione di scrittura, un thread alla volta. Commit all'uscita
+        (rollback in caso di eccezione); i blocchi annidati nello stesso
+        thread condividono la transazione del blocco più esterno.
+        """
+        with self._write_lock:
+            conn = self._writer_connection()
+            self._write_depth += 1
+            try:
+                yield conn
+                if self._write_depth == 1:
+                    conn.commit()
+            except BaseException:
+                if self._write_depth == 1 and conn.in_transaction:
+                    conn.rollback()
+                raise
+            finally:
+                self._write_depth -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'active_readers': len(self._readers),
+                'idle_readers': len(self._idle),
+                'readers_opened': self.readers_opened,
+                'readers_reused': self.readers_reused,
+            }
+
+    def close(self):
+        """Chiude tutte le connessioni (i thread le riaprono al bisogno)"""
+        with self._write_lock, self._lock:
+            for conn in list(self._readers.values()) + self._idle:
+                conn.close()
+            self._readers.clear()
+            self._idle.clear()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str, config=None) -> ConnectionPool:
+    """
+    Pool condiviso per file di database (tutti i manager dello stesso file)
+    """
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool.from_config(db_path, config)
+        return pool
+
+
+@atexit.register
+def close_all_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+🔎 CSV SNIFFER - ExcelTools
+===========================
+
+Rileva da un campione limitato di byte codifica, BOM, separatore,
+carattere di quoting, separatore decimale (virgola negli export italiani)
+e riga di intestazione, così che il file venga letto con un solo parse.
+Il risultato è memorizzato per file (percorso, dimensione, mtime).
+"""
+
+import codecs
+import csv
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+SAMPLE_BYTES = 1024 * 1024
+SAMPLE_LINES = 200
+DELIMITERS = [',', ';', '\t', '|']
+
+# BOM riconosciuti -> codifica da passare a pandas
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+DECIMAL_COMMA = re.compile(r'^[-+]?(\d{1,3}(\.\d{3})+|\d+),\d+$')
+DECIMAL_POINT = re.compile(r'^[-+]?(\d{1,3}(,\d{3})+|\d+)\.\d+$')
+THOUSANDS_POINT = re.compile(r'^[-+]?\d{1,3}(\.\d{3})+(,\d+)?$')
+
+# Opzioni già rilevate: (percorso, dimensione, mtime) -> opzioni read_csv
+_sniff_cache: Dict[tuple, Dict[str, Any]] = {}
+
+
+def detect_encoding(sample: bytes) -> str:
+    """Codifica del campione: BOM, poi UTF-8 stretto, poi cp1252/latin-1"""
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        sample.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # Carattere multibyte troncato alla fine del campione
+        if e.start >= len(sample) - 3:
+            try:
+                sample[:e.start].decode('utf-8')
+                return 'utf-8'
+            except UnicodeDecodeError:
+                pass
+    try:
+        sample.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+def _sample_lines(sample: bytes, encoding: str, complete: bool) -> List[str]:
+    text = sample.decode(encoding, errors='replace')
+    if text.startswith('\ufeff'):
+        text = text[1:]
+    lines = text.splitlines()
+    if not complete and len(lines) > 1:
+        lines = lines[:-1]  # Ultima riga probabilmente troncata
+    return lines[:SAMPLE_LINES]
+
+
+def detect_dialect(lines: List[str]) -> csv.Dialect:
+    """Separatore e quoting con csv.Sniffer, con ripiego sul conteggio"""
+    try:
+        return csv.Sniffer().sniff('\n'.join(lines),
+                                   delimiters=''.join(DELIMITERS))
+    except csv.Error:
+        pass
+
+    # Separatore presente con lo stesso numero di occorrenze nel maggior
+    # numero di righe
+    best, best_score = ',', 0
+    for delimiter in DELIMITERS:
+        counts = Counter(line.count(delimiter) for line in lines)
+        count, frequency = counts.most_common(1)[0] if counts else (0, 0)
+        if count and frequency > best_score:
+            best, best_score = delimiter, frequency
+
+    class Dialect(csv.excel):
+        delimiter = best
+    return Dialect
+
+
+def detect_header_row(rows: List[List[str]]) -> int:
+    """Prima riga con il numero di campi prevalente (salta titoli iniziali)"""
+    widths = Counter(len(row) for row in rows if row)
+    if not widths:
+        return 0
+    width = widths.most_common(1)[0][0]
+    for i, row in enumerate(rows):
+        if len(row) == width:
+            return i
+    return 0
+
+
+def detect_decimal(rows: List[List[str]], delimiter: str) -> Dict[str, Any]:
+    """Separatore decimale e delle migliaia dai valori numerici del campione"""
+    if delimiter == ',':
+        return {'decimal': '.'}
+    comma = point = thousands = 0
+    for row in rows:
+        for value in row:
+            value = value.strip()
+            if DECIMAL_COMMA.match(value):
+                comma += 1
+            elif DECIMAL_POINT.match(value):
+                point += 1
+            if THOUSANDS_POINT.match(value):
+                thousands += 1
+    if comma > point:
+        options = {'decimal': ','}
+        if thousands:
+            options['thousands'] = '.'
+        return options
+    return {'decimal': '.'}
+
+
+def sniff_csv(file_path: str,
+              sample_bytes: int = SAMPLE_BYTES) -> Dict[str, Any]:
+    """Opzioni di pd.read_csv per il file, dal campione iniziale (con cache)"""
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if key in _sniff_cache:
+        return dict(_sniff_cache[key])
+
+    with open(file_path, 'rb') as f:
+        sample = f.read(sample_bytes)
+
+    encoding = detect_encoding(sample)
+    lines = _sample_lines(sample, encoding,
+                          complete=stat.st_size <= sample_bytes)
+    dialect = detect_dialect([line for line in lines if line.strip()])
+    rows = list(csv.reader(lines, delimiter=dialect.delimiter,
+                           quotechar=dialect.quotechar or '"'))
+    header_row = detect_header_row(rows)
+
+    options = {
+        'encoding': encoding,
+        'sep': dialect.delimiter,
+        'quotechar': dialect.quotechar or '"',
+        'skiprows': header_row,
+    }
+    options.update(detect_decimal(rows[header_row + 1:], dialect.delimiter))
+    _sniff_cache[key] = options
+    return dict(options)
+
+
+def read_csv_sniffed(file_path: str, **kwargs):
+    """Legge il CSV con un solo parse usando le opzioni rilevate"""
+    import pandas as pd
+
+    options = sniff_csv(file_path)
+    options.update(kwargs)
+    try:
+        return pd.read_csv(file_path, **options)
+    except UnicodeDecodeError:
+        if options['encoding'] != 'utf-8':
+            raise
+        # Byte non UTF-8 oltre il campione: codifica Windows occidentale
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        _sniff_cache[key]['encoding'] = 'cp1252'
+        options['encoding'] = 'cp1252'
+        return pd.read_csv(file_path, **options)
@@ -32,6 +32,15 @@ except ImportError:
     HAS_CUSTOMTKINTER = False
 
 from database_manager_enterprise import DatabaseManager, QueryBuilder
+from query_builder import inline_params
+from query_runner import QueryRunner
+
+# Operatori dei filtri rapidi -> operatori SQL del QueryBuilder
+FILTER_OPERATORS = {'contiene': 'LIKE', 'non contiene': 'NOT LIKE'}
+
+# Righe mostrate nella tabella risultati (il risultato completo resta in
+# current_data)
+DISPLAY_ROWS = 1000
 
 
 class DatabaseExplorerGUI:
@@ -40,6 +49,9 @@ class DatabaseExplorerGUI:
     def __init__(self):
         self.db_manager = DatabaseManager()
         self.query_builder = QueryBuilder(self.db_manager)
+        self.query_runner = QueryRunner.from_config(self.db_manager.pool)
+        self.current_job = None
+        self.filter_query = None  # query generata dai filtri (sql, params)
         self.current_data = None
         self.current_query = ""
         self.setup_gui()
@@ -292,6 +304,19 @@ class DatabaseExplorerGUI:
             command=self.rewrite_query, width=180
         ).pack(side="right", padx=5, pady=(0, 2))
 
+        # Esecuzione e annullamento della query in corso
+        ctk.CTkButton(
+            btn_frame, text="▶️ Esegui", command=self.execute_query,
+            width=100
+        ).pack(side="left", padx=5, pady=(0, 2))
+        self.cancel_button = ctk.CTkButton(
+            btn_frame, text="⏹️ Annulla", command=self.cancel_query,
+            width=100, state="disabled"
+        )
+        self.cancel_button.pack(side="left", padx=5, pady=(0, 2))
+
+        self.create_results_table(parent)
+
     def rewrite_query(self):
         """Riscrive automaticamente la query corrente con funzioni aggregate"""
         sql = self.sql_text.get("1.0", "end").strip()
@@ -606,36 +631,22 @@ class DatabaseExplorerGUI:
         )
 
     def apply_filters_to_query(self):
-        # Genera la WHERE clause SQL dai filtri attivi e aggiorna la query
+        # Genera la query parametrizzata dai filtri attivi; l'editor
+        # mostra i valori come letterali, così il testo resta eseguibile
+        # anche se modificato o salvato
         if not hasattr(self, 'table_var') or not self.table_var.get():
             return
         table = self.table_var.get()
-        base_query = f"SELECT * FROM {table}"
-        where_clauses = []
-        logic_ops = []
-        for idx, (col, op, val, logic) in enumerate(self.active_filters):
-            clause = ""
-            if op == 'contiene':
-                clause = f"{col} LIKE '%{val}%'"
-            elif op == 'non contiene':
-                clause = f"{col} NOT LIKE '%{val}%'"
-            elif op in ['=', '!=', '>', '<', '>=', '<=']:
-                if val.replace('.', '', 1).isdigit():
-                    clause = f"{col} {op} {val}"
-                else:
-                    clause = f"{col} {op} '{val}'"
-            if idx > 0:
-                logic_ops.append(logic)
-            where_clauses.append(clause)
-        where_sql = ''
-        if where_clauses:
-            # Combina i filtri con AND/OR
-            combined = where_clauses[0]
-            for i, clause in enumerate(where_clauses[1:]):
-                combined = f"({combined}) {logic_ops[i]} ({clause})"
-            where_sql = ' WHERE ' + combined
+        where_conditions = [
+            {'column': col, 'operator': FILTER_OPERATORS.get(op, op),
+             'value': val, 'logic': logic}
+            for col, op, val, logic in self.active_filters
+        ]
         limit = self.limit_var.get() if hasattr(self, 'limit_var') else '100'
-        query = base_query + where_sql + f' LIMIT {limit}'
+        self.filter_query = self.query_builder.build_select_query(
+            table, where_conditions=where_conditions, limit=int(limit)
+        )
+        query = inline_params(self.filter_query)
         self.sql_text.delete("1.0", "end")
         self.sql_text.insert("1.0", query)
         # Aggiorna colonne disponibili e valori unici per i filtri
@@ -870,30 +881,92 @@ class DatabaseExplorerGUI:
         self.execute_query()
 
     def execute_query(self):
-        """Esegue query SQL"""
+        """Esegue query SQL in background (annullabile, con timeout)"""
         query = self.sql_text.get(1.0, tk.END).strip()
         if not query:
             messagebox.showwarning("Attenzione", "Inserisci una query SQL")
             return
 
+        # Una sola query alla volta: la nuova sostituisce quella in corso
+        if self.current_job is not None:
+            self.query_runner.cancel(self.current_job.id)
+
+        # Testo dell'editor (con i valori letterali) per salvarla; se è
+        # ancora la query dei filtri si esegue la versione parametrizzata
         self.current_query = query
-        self.update_status("⚡ Eseguendo query...")
+        params = ()
+        if (self.filter_query is not None
+                and query == inline_params(self.filter_query)):
+            query, params = self.filter_query
+        self.current_job = self.query_runner.submit(
+            query, params,
+            on_progress=lambda job: self.root.after(
+                0, self.show_query_progress, job),
+            on_done=lambda job: self.root.after(
+                0, self.query_finished, job))
+        self.update_status(
+            f"⚡ Query #{self.current_job.id} in esecuzione...")
+        if hasattr(self, 'cancel_button'):
+            self.cancel_button.configure(state="normal")
+
+    def cancel_query(self):
+        """Annulla la query in corso"""
+        if self.current_job is not None:
+            self.query_runner.cancel(self.current_job.id)
+            self.update_status(
+                f"⏹️ Annullamento query #{self.current_job.id}...")
+
+    def show_query_progress(self, job):
+        """Tempo trascorso e righe lette della query in corso"""
+        if job is self.current_job and job.running:
+            self.update_status(
+                f"⚡ Query #{job.id}: {job.elapsed:.1f}s, "
+                f"{job.rows:,} righe lette")
+
+    def query_finished(self, job):
+        """Esito di una query: risultati, annullamento, timeout o errore"""
+        if job is not self.current_job:
+            return  # Sostituita da una query più recente
+        self.current_job = None
+        if hasattr(self, 'cancel_button'):
+            self.cancel_button.configure(state="disabled")
+
+        if job.status == "done":
+            self.display_results(job.result)
+            message = (f"✅ Query #{job.id} completata: {job.rows:,} "
+                       f"risultati in {job.elapsed:.2f}s")
+            if job.truncated:
+                message += (f" (limite di {self.query_runner.max_rows:,} "
+                            f"righe raggiunto)")
+            self.update_status(message)
+        elif job.status == "cancelled":
+            self.update_status(
+                f"⏹️ Query #{job.id} annullata dopo {job.elapsed:.1f}s")
+        elif job.status == "timeout":
+            self.update_status(
+                f"⏱️ Query #{job.id} interrotta: superato il timeout di "
+                f"{self.query_runner.timeout_seconds:g}s")
+        else:
+            self.update_status(f"❌ Errore query #{job.id}: {job.error}")
 
-        def query_thread():
-            try:
-                result = self.db_manager.execute_query(query)
-                if result is not None:
-                    self.root.after(0, lambda: self.display_results(result))
-                    self.root.after(0, lambda: self.update_status(
-                        f"✅ Query completata: {len(result)} risultati"))
-                else:
-                    self.root.after(0, lambda: self.update_status(
-                        "❌ Errore nell'esecuzione della query"))
-            except Exception:
-                self.root.after(0, lambda: self.update_status(
-                    "❌ Errore durante esecuzione query"))
+    def display_results(self, result):
+        """Mostra i risultati (prime DISPLAY_ROWS righe) nella tabella"""
+        self.current_data = result
+        self.update_record_count(len(result))
+        if not hasattr(self, 'results_tree'):
+            return
 
-        threading.Thread(target=query_thread, daemon=True).start()
+        self.results_tree.delete(*self.results_tree.get_children())
+        columns = [str(col) for col in result.columns]
+        self.results_tree["columns"] = columns
+        self.results_tree["show"] = "headings"
+        for col in columns:
+            self.results_tree.heading(col, text=col)
+            self.results_tree.column(col, width=120, minwidth=50)
+
+        for row in result.head(DISPLAY_ROWS).itertuples(index=False):
+            self.results_tree.insert(
+                "", "end", values=["" if v is None else str(v) for v in row])
 
     def save_current_query(self):
         """Salva query corrente"""
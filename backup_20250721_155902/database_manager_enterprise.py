@@ -12,12 +12,17 @@ Versione: Enterprise 2.0
 """
 
 import os
-import sqlite3
 import logging
 from typing import List, Dict, Optional, Any
 
+from connection_pool import get_pool
+from query_builder import BuiltQuery, OrderBy, build_select
+
 try:
     import pandas as pd
+    from bulk_loader import BulkLoader
+    from parse_cache import ParseCache
+    from sheet_reader import iter_excel_sheets
     HAS_PANDAS = True
 except ImportError:
     HAS_PANDAS = False
@@ -26,8 +31,18 @@ except ImportError:
 class DatabaseManager:
     """Manager database professionale con funzionalità avanzate"""
 
+    # Conteggi dell'ultimo import (aggiunti anche ai database esistenti)
+    METADATA_DELTA_COLUMNS = {
+        'import_mode': 'TEXT',
+        'rows_inserted': 'INTEGER DEFAULT 0',
+        'rows_updated': 'INTEGER DEFAULT 0',
+        'rows_deleted': 'INTEGER DEFAULT 0',
+    }
+
     def __init__(self, db_path="exceltools_enterprise.db"):
         self.db_path = db_path
+        self.pool = get_pool(db_path)
+        self.parse_cache = ParseCache() if HAS_PANDAS else None
         self.setup_logging()
         self.setup_database()
 
@@ -46,44 +61,62 @@ class DatabaseManager:
     def setup_database(self):
         """Inizializza database con tabelle enterprise"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Tabella metadata per tracking
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS metadata (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    table_name TEXT UNIQUE,
-                    source_file TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    total_rows INTEGER,
-                    total_columns INTEGER,
-                    description TEXT
-                )
-            """)
-
-            # Tabella per query salvate
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS saved_queries (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE,
-                    query_sql TEXT,
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    is_favorite BOOLEAN DEFAULT 0
-                )
-            """)
-
-            conn.commit()
-            conn.close()
+            with self.pool.write() as conn:
+                cursor = conn.cursor()
+
+                # Tabella metadata per tracking
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS metadata (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        table_name TEXT UNIQUE,
+                        source_file TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        total_rows INTEGER,
+                        total_columns INTEGER,
+                        description TEXT,
+                        import_mode TEXT,
+                        rows_inserted INTEGER DEFAULT 0,
+                        rows_updated INTEGER DEFAULT 0,
+                        rows_deleted INTEGER DEFAULT 0
+                    )
+                """)
+
+                # Database creati da versioni precedenti: aggiungi colonne
+                # delta
+                cursor.execute("PRAGMA table_info(metadata)")
+                existing = {row[1] for row in cursor.fetchall()}
+                for column, definition in self.METADATA_DELTA_COLUMNS.items():
+                    if column not in existing:
+                        cursor.execute(
+                            f"ALTER TABLE metadata "
+                            f"ADD COLUMN {column} {definition}")
+
+                # Tabella per query salvate
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS saved_queries (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        name TEXT UNIQUE,
+                        query_sql TEXT,
+                        description TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        is_favorite BOOLEAN DEFAULT 0
+                    )
+                """)
             self.logger.info("Database enterprise inizializzato")
         except Exception as e:
             self.logger.error(f"Errore setup database: {e}")
 
     def import_excel_data(self, file_path: str, table_name: str = None,
-                          sheet_names: List[str] = None) -> bool:
-        """Importa dati Excel con gestione multi-sheet"""
+                          sheet_names: List[str] = None,
+                          incremental: bool = False,
+                          key_column: str = None) -> bool:
+        """
+        Importa dati Excel con gestione multi-sheet.
+        incremental=True applica solo le differenze rispetto alle tabelle
+        esistenti (per key_column, con lo stesso nome pulito delle
+        colonne, o confrontando le righe intere).
+        """
         try:
             if not HAS_PANDAS:
                 raise Exception("Pandas non disponibile")
@@ -101,12 +134,16 @@ class DatabaseManager:
             excel_file = pd.ExcelFile(file_path)
             sheets_to_import = sheet_names or excel_file.sheet_names
 
-            conn = sqlite3.connect(self.db_path)
             total_imported = 0
 
 
-            for sheet_name in sheets_to_import:
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
+            # Una sola apertura del file, fogli letti in parallelo
+            sheets = iter_excel_sheets(excel_file, file_path,
+                                       sheets_to_import,
+                                       parse_cache=self.parse_cache)
+            for sheet_name, df, read_error in sheets:
+                if read_error is not None:
+                    raise read_error
 
                 # Nome tabella con sheet, SQL-safe
                 if len(sheets_to_import) > 1:
@@ -117,12 +154,8 @@ class DatabaseManager:
                     sheet_table_name = table_name
 
                 # Pulisci nomi colonne
-                df.columns = [
-                    str(col).strip().replace(" ", "_").replace(
-                        "(", "").replace(")", "").replace(
-                        "/", "_").replace("-", "_")
-                    for col in df.columns
-                ]
+                df.columns = [self.clean_column_name(col)
+                              for col in df.columns]
 
                 # Rimuovi righe completamente vuote
                 df = df.dropna(how='all')
@@ -134,19 +167,35 @@ class DatabaseManager:
                     else:
                         df[col] = df[col].fillna(0)
 
-                # Salva nel database
-                df.to_sql(sheet_table_name, conn, if_exists='replace',
-                          index=False)
-
-                # Aggiorna metadata
+                # Salva nel database (caricamento massivo o incrementale)
+                with self.pool.write() as conn:
+                    loader = BulkLoader(conn)
+                    if incremental:
+                        key_columns = ([self.clean_column_name(key_column)]
+                                       if key_column else None)
+                        load_stats = loader.upsert_dataframe(
+                            df, sheet_table_name, key_columns)
+                    else:
+                        load_stats = loader.load_dataframe(
+                            df, sheet_table_name, if_exists='replace')
+                if incremental:
+                    self.logger.info(
+                        f"Delta {sheet_table_name}: "
+                        f"{load_stats['inserted']} inseriti, "
+                        f"{load_stats['updated']} aggiornati, "
+                        f"{load_stats['deleted']} eliminati")
+
+                # Aggiorna metadata (con i conteggi delta dell'import)
                 self.update_metadata(sheet_table_name, file_path,
-                                     len(df), len(df.columns))
+                                     len(df), len(df.columns),
+                                     delta=load_stats)
 
                 total_imported += len(df)
                 self.logger.info(
-                    f"Importati {len(df)} record in {sheet_table_name}")
+                    f"Importati {len(df)} record in {sheet_table_name} "
+                    f"({load_stats['rows_per_second']:,.0f} righe/s)")
 
-            conn.close()
+            excel_file.close()
             self.logger.info(
                 f"Import completato: {total_imported} record totali")
             return True
@@ -155,29 +204,38 @@ class DatabaseManager:
             self.logger.error(f"Errore import Excel: {e}")
             return False
 
+    @staticmethod
+    def clean_column_name(name) -> str:
+        """Nome colonna come salvato nelle tabelle importate"""
+        return (str(name).strip().replace(" ", "_").replace("(", "")
+                .replace(")", "").replace("/", "_").replace("-", "_"))
+
     def update_metadata(self, table_name: str, source_file: str,
-                        rows: int, columns: int):
-        """Aggiorna metadata tabella"""
+                        rows: int, columns: int,
+                        delta: Optional[Dict[str, Any]] = None):
+        """Aggiorna metadata tabella e conteggi delta dell'ultimo import"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                INSERT OR REPLACE INTO metadata
-                (table_name, source_file, total_rows, total_columns,
-                 updated_at)
-                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (table_name, source_file, rows, columns))
-
-            conn.commit()
-            conn.close()
+            with self.pool.write() as conn:
+                cursor = conn.cursor()
+
+                delta = delta or {}
+                cursor.execute("""
+                    INSERT OR REPLACE INTO metadata
+                    (table_name, source_file, total_rows, total_columns,
+                     updated_at, import_mode, rows_inserted, rows_updated,
+                     rows_deleted)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, ?, ?, ?, ?)
+                """, (table_name, source_file, rows, columns,
+                      delta.get('mode', 'replace'),
+                      delta.get('inserted', rows), delta.get('updated', 0),
+                      delta.get('deleted', 0)))
         except Exception as e:
             self.logger.error(f"Errore aggiornamento metadata: {e}")
 
     def get_all_tables(self) -> List[Dict[str, Any]]:
         """Ottiene lista completa tabelle con metadata"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.pool.reader()
             cursor = conn.cursor()
 
             query = """
@@ -216,7 +274,6 @@ class DatabaseManager:
 
                 tables.append(table_info)
 
-            conn.close()
             return tables
 
         except Exception as e:
@@ -226,9 +283,8 @@ class DatabaseManager:
     def execute_query(self, query: str) -> Optional[pd.DataFrame]:
         """Esegue query SQL con gestione errori avanzata"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.pool.reader()
             result = pd.read_sql_query(query, conn)
-            conn.close()
             self.logger.info(f"Query eseguita: {len(result)} risultati")
             return result
         except Exception as e:
@@ -239,18 +295,16 @@ class DatabaseManager:
                        where_clause: str = None) -> bool:
         """Elimina record con clausola WHERE opzionale"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self.pool.write() as conn:
+                cursor = conn.cursor()
 
-            if where_clause:
-                query = f"DELETE FROM {table_name} WHERE {where_clause}"
-            else:
-                query = f"DELETE FROM {table_name}"
+                if where_clause:
+                    query = f"DELETE FROM {table_name} WHERE {where_clause}"
+                else:
+                    query = f"DELETE FROM {table_name}"
 
-            cursor.execute(query)
-            deleted_count = cursor.rowcount
-            conn.commit()
-            conn.close()
+                cursor.execute(query)
+                deleted_count = cursor.rowcount
 
             msg = f"Eliminati {deleted_count} record da {table_name}"
             self.logger.info(msg)
@@ -285,17 +339,14 @@ class DatabaseManager:
                    description: str = "") -> bool:
         """Salva query per riutilizzo futuro"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                INSERT OR REPLACE INTO saved_queries
-                (name, query_sql, description)
-                VALUES (?, ?, ?)
-            """, (name, query_sql, description))
-
-            conn.commit()
-            conn.close()
+            with self.pool.write() as conn:
+                cursor = conn.cursor()
+
+                cursor.execute("""
+                    INSERT OR REPLACE INTO saved_queries
+                    (name, query_sql, description)
+                    VALUES (?, ?, ?)
+                """, (name, query_sql, description))
             self.logger.info(f"Query salvata: {name}")
             return True
 
@@ -306,7 +357,7 @@ class DatabaseManager:
     def get_saved_queries(self) -> List[Dict[str, Any]]:
         """Ottiene lista query salvate"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.pool.reader()
             cursor = conn.cursor()
 
             cursor.execute("""
@@ -327,7 +378,6 @@ class DatabaseManager:
                     'is_favorite': bool(row[5])
                 })
 
-            conn.close()
             return queries
 
         except Exception as e:
@@ -343,43 +393,15 @@ class QueryBuilder:
 
     def build_select_query(self, table_name: str, columns: List[str] = None,
                            where_conditions: List[Dict] = None,
-                           order_by: str = None, limit: int = None) -> str:
-        """Costruisce query SELECT"""
-        # Seleziona colonne
-        if columns:
-            cols = ", ".join(columns)
-        else:
-            cols = "*"
-
-        query = f"SELECT {cols} FROM {table_name}"
-
-        # Clausole WHERE
-        if where_conditions:
-            where_parts = []
-            for condition in where_conditions:
-                column = condition.get('column')
-                operator = condition.get('operator', '=')
-                value = condition.get('value')
-
-                if isinstance(value, str):
-                    part = f"{column} {operator} '{value}'"
-                    where_parts.append(part)
-                else:
-                    part = f"{column} {operator} {value}"
-                    where_parts.append(part)
-
-            if where_parts:
-                query += " WHERE " + " AND ".join(where_parts)
-
-        # ORDER BY
-        if order_by:
-            query += f" ORDER BY {order_by}"
-
-        # LIMIT
-        if limit:
-            query += f" LIMIT {limit}"
-
-        return query
+                           order_by: OrderBy = None,
+                           limit: int = None) -> BuiltQuery:
+        """
+        Costruisce query SELECT parametrizzata: (sql, params) con i valori
+        delle condizioni come segnaposto '?'; order_by è una colonna o
+        (colonna, 'ASC'/'DESC')
+        """
+        return build_select(table_name, columns, where_conditions,
+                            order_by, limit)
 
     def build_aggregation_query(self, table_name: str, group_by: str,
                                 aggregations: List[Dict]) -> str:
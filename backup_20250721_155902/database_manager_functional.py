@@ -11,15 +11,22 @@ Autore: Senior DB IT Manager Developer & DevOps Analyst
 Data: 2025-07-21
 """
 
-import sqlite3
 import json
 import os
-from typing import Dict, List, Optional, Any
+import threading
+from typing import Any, Dict, List, Optional, Sequence
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 
+from connection_pool import get_pool
+from query_builder import BuiltQuery, build_select, inline_params
+
 try:
     import pandas as pd
+    from bulk_loader import BulkLoader
+    from paged_query import PAGE_SIZE, PagedResult
+    from parse_cache import ParseCache
+    from stream_export import export_csv, export_xlsx
     HAS_PANDAS = True
 except ImportError:
     HAS_PANDAS = False
@@ -38,89 +45,91 @@ class ResponsiveAdvancedDatabaseManager:
 
     def __init__(self, db_path="exceltools_advanced.db"):
         self.db_path = db_path
+        self.pool = get_pool(db_path)
+        self.parse_cache = ParseCache() if HAS_PANDAS else None
         self.setup_database()
 
     def setup_database(self):
         """Inizializza database con tabelle avanzate"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Tabella per viste salvate
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS saved_views (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                description TEXT,
-                table_name TEXT,
-                selected_columns TEXT,
-                filters TEXT,
-                query TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_used TIMESTAMP,
-                is_favorite BOOLEAN DEFAULT 0,
-                view_type TEXT DEFAULT 'custom'
-            )
-        """)
-
-        # Tabella per configurazioni merge
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS merge_configs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                description TEXT,
-                source_tables TEXT,
-                join_conditions TEXT,
-                merge_type TEXT,
-                output_columns TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        # Tabella per filtri predefiniti
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS filter_presets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                table_name TEXT,
-                filter_conditions TEXT,
-                description TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_active BOOLEAN DEFAULT 1
-            )
-        """)
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
 
-        conn.commit()
-        conn.close()
+            # Tabella per viste salvate
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS saved_views (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT UNIQUE NOT NULL,
+                    description TEXT,
+                    table_name TEXT,
+                    selected_columns TEXT,
+                    filters TEXT,
+                    query TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_used TIMESTAMP,
+                    is_favorite BOOLEAN DEFAULT 0,
+                    view_type TEXT DEFAULT 'custom'
+                )
+            """)
 
-    def import_csv_file(self, file_path: str, table_name: str = None) -> bool:
+            # Tabella per configurazioni merge
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS merge_configs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT UNIQUE NOT NULL,
+                    description TEXT,
+                    source_tables TEXT,
+                    join_conditions TEXT,
+                    merge_type TEXT,
+                    output_columns TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            # Tabella per filtri predefiniti
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS filter_presets (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT UNIQUE NOT NULL,
+                    table_name TEXT,
+                    filter_conditions TEXT,
+                    description TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    is_active BOOLEAN DEFAULT 1
+                )
+            """)
+
+    def import_csv_file(self, file_path: str, table_name: str = None,
+                        incremental: bool = False,
+                        key_column: str = None) -> bool:
         """Importa file CSV nel database - IMPLEMENTAZIONE COMPLETA"""
         try:
             if not HAS_PANDAS:
                 messagebox.showerror("Errore", "Pandas richiesto per import CSV")
                 return False
 
-            # Leggi CSV
-            df = pd.read_csv(file_path)
+            # Leggi CSV (dalla cache su disco se già letto)
+            df = self.parse_cache.load(
+                file_path, lambda: pd.read_csv(file_path)
+            )
 
             # Nome tabella automatico se non specificato
             if not table_name:
                 table_name = os.path.splitext(os.path.basename(file_path))[0]
                 table_name = table_name.replace(" ", "_").replace("-", "_")
 
-            # Connessione database
-            conn = sqlite3.connect(self.db_path)
-
-            # Salva nel database
-            df.to_sql(table_name, conn, if_exists='replace', index=False)
-
-            conn.close()
+            # Salva nel database (caricamento massivo o solo differenze)
+            with self.pool.write() as conn:
+                self._write_table(conn, df, table_name, incremental,
+                                  key_column)
             return True
 
         except Exception as e:
             messagebox.showerror("Errore Import", f"Errore importazione CSV: {e}")
             return False
 
-    def import_excel_file(self, file_path: str, sheet_name: str = None) -> bool:
+    def import_excel_file(self, file_path: str, sheet_name: str = None,
+                          incremental: bool = False,
+                          key_column: str = None) -> bool:
         """Importa file Excel nel database - IMPLEMENTAZIONE COMPLETA"""
         try:
             if not HAS_PANDAS:
@@ -129,27 +138,38 @@ class ResponsiveAdvancedDatabaseManager:
 
             # Leggi Excel
             if sheet_name:
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
+                df = self.parse_cache.load(
+                    file_path,
+                    lambda: pd.read_excel(file_path, sheet_name=sheet_name),
+                    extra=f"sheet={sheet_name}")
                 table_name = f"{os.path.splitext(os.path.basename(file_path))[0]}_{sheet_name}"
             else:
-                df = pd.read_excel(file_path)
+                df = self.parse_cache.load(
+                    file_path, lambda: pd.read_excel(file_path)
+                )
                 table_name = os.path.splitext(os.path.basename(file_path))[0]
 
             table_name = table_name.replace(" ", "_").replace("-", "_")
 
-            # Connessione database
-            conn = sqlite3.connect(self.db_path)
-
-            # Salva nel database
-            df.to_sql(table_name, conn, if_exists='replace', index=False)
-
-            conn.close()
+            # Salva nel database (caricamento massivo o solo differenze)
+            with self.pool.write() as conn:
+                self._write_table(conn, df, table_name, incremental,
+                                  key_column)
             return True
 
         except Exception as e:
             messagebox.showerror("Errore Import", f"Errore importazione Excel: {e}")
             return False
 
+    def _write_table(self, conn, df, table_name: str, incremental: bool,
+                     key_column: str = None):
+        """Ricrea la tabella oppure applica il delta (per chiave o per riga)"""
+        loader = BulkLoader(conn)
+        if incremental:
+            key_columns = [key_column] if key_column else None
+            return loader.upsert_dataframe(df, table_name, key_columns)
+        return loader.load_dataframe(df, table_name, if_exists='replace')
+
     def execute_query(self, query: str) -> Optional[pd.DataFrame]:
         """Esegue query SQL - IMPLEMENTAZIONE COMPLETA"""
         try:
@@ -157,9 +177,8 @@ class ResponsiveAdvancedDatabaseManager:
                 messagebox.showerror("Errore", "Pandas richiesto per query")
                 return None
 
-            conn = sqlite3.connect(self.db_path)
+            conn = self.pool.reader()
             df = pd.read_sql_query(query, conn)
-            conn.close()
 
             return df
 
@@ -167,29 +186,47 @@ class ResponsiveAdvancedDatabaseManager:
             messagebox.showerror("Errore Query", f"Errore esecuzione query: {e}")
             return None
 
+    def execute_paged_query(self, query: str, params: Sequence[Any] = (),
+                            page_size: int = None) -> Optional["PagedResult"]:
+        """
+        Esegue query SQL leggendo solo la prima pagina (le altre su
+        richiesta)
+        """
+        try:
+            if not HAS_PANDAS:
+                messagebox.showerror("Errore", "Pandas richiesto per query")
+                return None
+
+            return PagedResult(self.pool, query, params,
+                               page_size=page_size or PAGE_SIZE)
+
+        except Exception as e:
+            messagebox.showerror("Errore Query",
+                                 f"Errore esecuzione query: {e}")
+            return None
+
     def save_view(self, name: str, table_name: str, selected_columns: List[str],
                   filters: List[Dict], description: str = "", is_favorite: bool = False) -> bool:
         """Salva una vista personalizzata - IMPLEMENTAZIONE COMPLETA"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self.pool.write() as conn:
+                cursor = conn.cursor()
 
-            # Genera query dalla configurazione
-            query = self.build_query_from_config(table_name, selected_columns, filters)
+                # Genera query dalla configurazione, con i valori come
+                # letterali: il testo salvato si esegue senza parametri
+                query = inline_params(self.build_query_from_config(
+                    table_name, selected_columns, filters))
 
-            cursor.execute("""
-                INSERT OR REPLACE INTO saved_views
-                (name, description, table_name, selected_columns, filters,
-                 query, is_favorite, last_used)
-                VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (
-                name, description, table_name,
-                json.dumps(selected_columns), json.dumps(filters),
-                query, is_favorite
-            ))
-
-            conn.commit()
-            conn.close()
+                cursor.execute("""
+                    INSERT OR REPLACE INTO saved_views
+                    (name, description, table_name, selected_columns, filters,
+                     query, is_favorite, last_used)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                """, (
+                    name, description, table_name,
+                    json.dumps(selected_columns), json.dumps(filters),
+                    query, is_favorite
+                ))
             return True
 
         except Exception as e:
@@ -199,33 +236,30 @@ class ResponsiveAdvancedDatabaseManager:
     def load_view(self, view_name: str) -> Optional[Dict[str, Any]]:
         """Carica vista salvata - IMPLEMENTAZIONE COMPLETA"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT table_name, selected_columns, filters, query, description
-                FROM saved_views WHERE name = ?
-            """, (view_name,))
+            with self.pool.write() as conn:
+                cursor = conn.cursor()
 
-            row = cursor.fetchone()
-            if row:
-                # Aggiorna last_used
                 cursor.execute("""
-                    UPDATE saved_views SET last_used = CURRENT_TIMESTAMP
-                    WHERE name = ?
+                    SELECT table_name, selected_columns, filters, query,
+                           description
+                    FROM saved_views WHERE name = ?
                 """, (view_name,))
-                conn.commit()
-
-                conn.close()
-                return {
-                    'table_name': row[0],
-                    'selected_columns': json.loads(row[1] or '[]'),
-                    'filters': json.loads(row[2] or '[]'),
-                    'query': row[3],
-                    'description': row[4]
-                }
-
-            conn.close()
+
+                row = cursor.fetchone()
+                if row:
+                    # Aggiorna last_used
+                    cursor.execute("""
+                        UPDATE saved_views SET last_used = CURRENT_TIMESTAMP
+                        WHERE name = ?
+                    """, (view_name,))
+
+                    return {
+                        'table_name': row[0],
+                        'selected_columns': json.loads(row[1] or '[]'),
+                        'filters': json.loads(row[2] or '[]'),
+                        'query': row[3],
+                        'description': row[4]
+                    }
             return None
 
         except Exception as e:
@@ -235,7 +269,7 @@ class ResponsiveAdvancedDatabaseManager:
     def get_saved_views(self) -> List[Dict[str, Any]]:
         """Ottiene tutte le viste salvate - IMPLEMENTAZIONE COMPLETA"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.pool.reader()
             cursor = conn.cursor()
 
             cursor.execute("""
@@ -257,7 +291,6 @@ class ResponsiveAdvancedDatabaseManager:
                     'is_favorite': bool(row[6])
                 })
 
-            conn.close()
             return views
 
         except Exception as e:
@@ -265,46 +298,17 @@ class ResponsiveAdvancedDatabaseManager:
             return []
 
     def build_query_from_config(self, table_name: str, selected_columns: List[str],
-                               filters: List[Dict]) -> str:
-        """Costruisce query SQL da configurazione visuale - IMPLEMENTAZIONE COMPLETA"""
-        # Seleziona colonne
-        if selected_columns:
-            cols = ", ".join(f"[{col}]" for col in selected_columns)
-        else:
-            cols = "*"
-
-        query = f"SELECT {cols} FROM [{table_name}]"
-
-        # Applica filtri
-        if filters:
-            conditions = []
-            for f in filters:
-                column = f['column']
-                operator = f['operator']
-                value = f['value']
-
-                if operator == 'LIKE':
-                    conditions.append(f"[{column}] LIKE '%{value}%'")
-                elif operator == 'IN':
-                    if isinstance(value, list):
-                        values_str = "','".join(str(v) for v in value)
-                        conditions.append(f"[{column}] IN ('{values_str}')")
-                elif operator in ['IS NULL', 'IS NOT NULL']:
-                    conditions.append(f"[{column}] {operator}")
-                elif isinstance(value, str):
-                    conditions.append(f"[{column}] {operator} '{value}'")
-                else:
-                    conditions.append(f"[{column}] {operator} {value}")
-
-            if conditions:
-                query += " WHERE " + " AND ".join(conditions)
-
-        return query
+                               filters: List[Dict]) -> BuiltQuery:
+        """
+        Costruisce query SQL parametrizzata (sql, params) da configurazione
+        visuale
+        """
+        return build_select(table_name, selected_columns, filters)
 
     def get_all_tables_with_details(self) -> List[Dict[str, Any]]:
         """Ottiene dettagli completi di tutte le tabelle - IMPLEMENTAZIONE COMPLETA"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.pool.reader()
             cursor = conn.cursor()
 
             # Lista tabelle utente
@@ -340,7 +344,6 @@ class ResponsiveAdvancedDatabaseManager:
                     'row_count': row_count
                 })
 
-            conn.close()
             return tables
 
         except Exception as e:
@@ -351,7 +354,7 @@ class ResponsiveAdvancedDatabaseManager:
                                 limit: int = 100) -> List[str]:
         """Ottiene valori unici di una colonna per filtri - IMPLEMENTAZIONE COMPLETA"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.pool.reader()
             cursor = conn.cursor()
 
             cursor.execute(f"""
@@ -363,22 +366,20 @@ class ResponsiveAdvancedDatabaseManager:
             """)
 
             values = [str(row[0]) for row in cursor.fetchall()]
-            conn.close()
             return values
 
         except Exception as e:
             messagebox.showerror("Errore", f"Errore get unique values: {e}")
             return []
 
-    def export_to_excel(self, data: pd.DataFrame, file_path: str) -> bool:
-        """Esporta dati in Excel - IMPLEMENTAZIONE COMPLETA"""
+    def export_to_excel(self, data, file_path: str) -> bool:
+        """Esporta in Excel un DataFrame o un PagedResult, a blocchi"""
         try:
             if not HAS_PANDAS:
                 messagebox.showerror("Errore", "Pandas richiesto per export Excel")
                 return False
 
-            with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                data.to_excel(writer, index=False)
+            export_xlsx(data, file_path, sheet_name='Sheet1')
 
             messagebox.showinfo("Successo", f"Dati esportati in: {file_path}")
             return True
@@ -387,14 +388,14 @@ class ResponsiveAdvancedDatabaseManager:
             messagebox.showerror("Errore Export", f"Errore esportazione Excel: {e}")
             return False
 
-    def export_to_csv(self, data: pd.DataFrame, file_path: str) -> bool:
-        """Esporta dati in CSV - IMPLEMENTAZIONE COMPLETA"""
+    def export_to_csv(self, data, file_path: str) -> bool:
+        """Esporta in CSV un DataFrame o un PagedResult, a blocchi"""
         try:
             if not HAS_PANDAS:
                 messagebox.showerror("Errore", "Pandas richiesto per export CSV")
                 return False
 
-            data.to_csv(file_path, index=False)
+            export_csv(data, file_path)
             messagebox.showinfo("Successo", f"Dati esportati in: {file_path}")
             return True
 
@@ -412,6 +413,7 @@ class ResponsiveDataSelectorGUI:
         self.selected_columns = []
         self.active_filters = []
         self.current_data = None
+        self.current_result = None  # PagedResult della query mostrata
 
         self.setup_main_window()
         self.create_responsive_interface()
@@ -619,8 +621,11 @@ class ResponsiveDataSelectorGUI:
         # Scrollbars
         v_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.data_tree.yview)
         h_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=self.data_tree.xview)
+        self.data_vscroll = v_scrollbar
 
-        self.data_tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        # Scorrendo in fondo viene letta la pagina successiva
+        self.data_tree.configure(yscrollcommand=self.on_data_scroll,
+                                 xscrollcommand=h_scrollbar.set)
 
         # Grid scrollbars
         self.data_tree.grid(row=0, column=0, sticky="nsew")
@@ -668,9 +673,19 @@ class ResponsiveDataSelectorGUI:
             else:
                 messagebox.showerror("Errore", "Errore durante l'importazione del file Excel")
 
+    def export_source(self):
+        """
+        Dati da esportare: la query mostrata (riletta a blocchi) o i dati
+        caricati
+        """
+        if self.current_result is not None:
+            return self.current_result
+        return self.current_data
+
     def export_excel(self):
         """Esporta in Excel - IMPLEMENTAZIONE COMPLETA"""
-        if self.current_data is None or self.current_data.empty:
+        if self.current_result is None and (
+                self.current_data is None or self.current_data.empty):
             messagebox.showwarning("Attenzione", "Nessun dato da esportare")
             return
 
@@ -681,11 +696,12 @@ class ResponsiveDataSelectorGUI:
         )
 
         if file_path:
-            self.db_manager.export_to_excel(self.current_data, file_path)
+            self.db_manager.export_to_excel(self.export_source(), file_path)
 
     def export_csv(self):
         """Esporta in CSV - IMPLEMENTAZIONE COMPLETA"""
-        if self.current_data is None or self.current_data.empty:
+        if self.current_result is None and (
+                self.current_data is None or self.current_data.empty):
             messagebox.showwarning("Attenzione", "Nessun dato da esportare")
             return
 
@@ -696,7 +712,7 @@ class ResponsiveDataSelectorGUI:
         )
 
         if file_path:
-            self.db_manager.export_to_csv(self.current_data, file_path)
+            self.db_manager.export_to_csv(self.export_source(), file_path)
 
     def execute_query(self):
         """Esegue query SQL - IMPLEMENTAZIONE COMPLETA"""
@@ -705,11 +721,12 @@ class ResponsiveDataSelectorGUI:
             messagebox.showwarning("Attenzione", "Inserisci una query SQL")
             return
 
-        result = self.db_manager.execute_query(query)
+        result = self.db_manager.execute_paged_query(query)
         if result is not None:
-            self.current_data = result
-            self.update_data_display()
-            messagebox.showinfo("Successo", f"Query eseguita: {len(result)} righe")
+            self.show_result(result)
+            messagebox.showinfo(
+                "Successo",
+                f"Query eseguita: {self.describe_rows(result)} righe")
 
     def refresh_tables(self):
         """Aggiorna lista tabelle - IMPLEMENTAZIONE COMPLETA"""
@@ -818,15 +835,58 @@ class ResponsiveDataSelectorGUI:
             self.current_table, self.selected_columns, self.active_filters
         )
 
-        result = self.db_manager.execute_query(query)
+        result = self.db_manager.execute_paged_query(query.sql, query.params)
         if result is not None:
-            self.current_data = result
-            self.update_data_display()
-            messagebox.showinfo("Successo", f"Selezione applicata: {len(result)} righe")
+            self.show_result(result)
+            messagebox.showinfo(
+                "Successo",
+                f"Selezione applicata: {self.describe_rows(result)} righe")
+
+    def describe_rows(self, result) -> str:
+        """
+        Righe del risultato: totale se noto, altrimenti righe lette finora
+        """
+        if result.total is not None:
+            return f"{result.total:,}"
+        return f"{result.fetched:,}+"
+
+    def show_result(self, result):
+        """Mostra la prima pagina; il totale viene contato in background"""
+        if self.current_result is not None:
+            self.current_result.close()
+        self.current_result = result
+        self.current_data = None
+        self.update_data_display()
+
+        if result.total is None:
+            def count_thread():
+                try:
+                    result.total_count()
+                except Exception:
+                    return  # Totale non disponibile: resta "N+"
+                self.root.after(0, self.update_data_info)
+
+            threading.Thread(target=count_thread, daemon=True).start()
+
+    def on_data_scroll(self, first, last):
+        """Scrollbar della tabella; in fondo legge la pagina successiva"""
+        self.data_vscroll.set(first, last)
+        result = self.current_result
+        if result is not None and not result.exhausted and float(last) >= 1.0:
+            page_start = result.fetched
+            result.fetch_next()
+            self.insert_rows(result.rows[page_start:])
+            self.update_data_info()
+
+    def insert_rows(self, rows):
+        for row in rows:
+            values = ["" if val is None else str(val) for val in row]
+            self.data_tree.insert("", "end", values=values)
 
     def update_data_display(self):
         """Aggiorna visualizzazione dati - IMPLEMENTAZIONE COMPLETA"""
-        if self.current_data is None or self.current_data.empty:
+        result = self.current_result
+        if result is None or not result.columns:
             return
 
         # Pulisci treeview
@@ -834,7 +894,7 @@ class ResponsiveDataSelectorGUI:
             self.data_tree.delete(item)
 
         # Configura colonne
-        columns = list(self.current_data.columns)
+        columns = result.columns
         self.data_tree["columns"] = columns
         self.data_tree["show"] = "headings"
 
@@ -842,16 +902,19 @@ class ResponsiveDataSelectorGUI:
             self.data_tree.heading(col, text=col)
             self.data_tree.column(col, width=120, minwidth=50)
 
-        # Inserisci dati (massimo 1000 righe per performance)
-        display_data = self.current_data.head(1000)
-        for _, row in display_data.iterrows():
-            values = [str(val) if pd.notna(val) else "" for val in row]
-            self.data_tree.insert("", "end", values=values)
+        # Righe lette finora (la prima pagina; le altre scorrendo)
+        self.insert_rows(result.rows)
+        self.update_data_info()
 
-        # Aggiorna info
-        total_rows = len(self.current_data)
-        displayed_rows = len(display_data)
-        info_text = f"Righe: {total_rows:,} (visualizzate: {displayed_rows:,}) | Colonne: {len(columns)}"
+    def update_data_info(self):
+        """Aggiorna info righe totali/visualizzate"""
+        result = self.current_result
+        if result is None:
+            return
+        total = (f"{result.total:,}" if result.total is not None
+                 else "conteggio...")
+        info_text = (f"Righe: {total} (visualizzate: {result.fetched:,}) | "
+                     f"Colonne: {len(result.columns)}")
         self.data_info_label.config(text=info_text)
 
     def refresh_views(self):
@@ -951,7 +1014,8 @@ class FunctionalFilterDialog:
         self.operator_var = tk.StringVar(value="=")
         operator_combo = ttk.Combobox(self.dialog, textvariable=self.operator_var,
                                      values=["=", "!=", ">", "<", ">=", "<=",
-                                            "LIKE", "IN", "IS NULL", "IS NOT NULL"],
+                                            "LIKE", "LIKE_PATTERN", "IN",
+                                            "IS NULL", "IS NOT NULL"],
                                      state="readonly")
         operator_combo.pack(pady=5, padx=20, fill=tk.X)
 
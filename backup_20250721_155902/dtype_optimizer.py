@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+🗜️ DTYPE OPTIMIZER - ExcelTools
+===============================
+
+Riduzione della memoria dei DataFrame caricati: riesporta
+modules/dtype_optimizer.py.
+"""
+
+import shared_modules  # noqa: F401
+from modules.dtype_optimizer import (  # noqa: F401
+    CATEGORY_RATIO, format_memory_report, optimize_dtypes, optimize_series
+)
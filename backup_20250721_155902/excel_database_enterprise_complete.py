@@ -13,15 +13,23 @@ Versione: Enterprise Complete 3.0
 """
 
 import os
-import sqlite3
 import threading
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 
+from connection_pool import get_pool
+from query_builder import BuiltQuery, OrderBy, build_select
+
 try:
     import pandas as pd
+    from bulk_loader import BulkLoader
+    from paged_query import PAGE_SIZE, PagedResult
+    from parse_cache import ParseCache
+    from sheet_reader import iter_excel_sheets
+    from stream_export import export_csv, export_xlsx, to_frame
+    from workbook_inspector import inspect_file
     HAS_PANDAS = True
 except ImportError:
     HAS_PANDAS = False
@@ -40,6 +48,8 @@ class ExcelDatabaseEnterprise:
 
     def __init__(self, db_path="exceltools_enterprise.db"):
         self.db_path = db_path
+        self.pool = get_pool(db_path)
+        self.parse_cache = ParseCache() if HAS_PANDAS else None
         self.setup_logging()
         self.setup_database()
         self.current_table = None
@@ -57,49 +67,89 @@ class ExcelDatabaseEnterprise:
         )
         self.logger = logging.getLogger("DatabaseEnterprise")
 
+    # Colonne di table_metadata con l'esito dell'ultimo import
+    METADATA_DELTA_COLUMNS = {
+        'last_import_at': 'TIMESTAMP',
+        'import_mode': 'TEXT',
+        'rows_inserted': 'INTEGER DEFAULT 0',
+        'rows_updated': 'INTEGER DEFAULT 0',
+        'rows_deleted': 'INTEGER DEFAULT 0',
+    }
+
     def setup_database(self):
         """Inizializza database enterprise"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Tabella metadata
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS table_metadata (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    table_name TEXT UNIQUE,
-                    source_file TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    total_rows INTEGER,
-                    total_columns INTEGER,
-                    description TEXT
-                )
-            """)
-
-            # Tabella query salvate
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS saved_queries (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE,
-                    sql_query TEXT,
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_used TIMESTAMP,
-                    is_favorite BOOLEAN DEFAULT 0
-                )
-            """)
-
-            conn.commit()
-            conn.close()
+            with self.pool.write() as conn:
+                cursor = conn.cursor()
+
+                # Tabella metadata
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS table_metadata (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        table_name TEXT UNIQUE,
+                        source_file TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        total_rows INTEGER,
+                        total_columns INTEGER,
+                        description TEXT,
+                        last_import_at TIMESTAMP,
+                        import_mode TEXT,
+                        rows_inserted INTEGER DEFAULT 0,
+                        rows_updated INTEGER DEFAULT 0,
+                        rows_deleted INTEGER DEFAULT 0
+                    )
+                """)
+
+                # Database creati da versioni precedenti: aggiungi colonne
+                # delta
+                cursor.execute("PRAGMA table_info(table_metadata)")
+                existing = {row[1] for row in cursor.fetchall()}
+                for column, definition in self.METADATA_DELTA_COLUMNS.items():
+                    if column not in existing:
+                        cursor.execute(
+                            f"ALTER TABLE table_metadata "
+                            f"ADD COLUMN {column} {definition}")
+
+                # Tabella query salvate
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS saved_queries (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        name TEXT UNIQUE,
+                        sql_query TEXT,
+                        description TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        last_used TIMESTAMP,
+                        is_favorite BOOLEAN DEFAULT 0
+                    )
+                """)
             self.logger.info("Database enterprise inizializzato con successo")
 
         except Exception as e:
             self.logger.error(f"Errore setup database: {e}")
             raise
 
+    def inspect_excel(self, file_path: str) -> List[Dict[str, Any]]:
+        """Fogli, dimensioni, intestazioni e dtype stimati (senza i dati)"""
+        if not HAS_PANDAS:
+            raise Exception("Pandas richiesto per import Excel")
+        return inspect_file(file_path)
+
     def import_excel_comprehensive(self, file_path: str,
-                                  table_prefix: str = None) -> Dict[str, Any]:
-        """Import Excel completo con gestione multi-sheet"""
+                                   table_prefix: str = None,
+                                   incremental: bool = False,
+                                   key_column: Optional[str] = None,
+                                   sheets: Optional[List[str]] = None,
+                                   columns: Optional[
+                                       Dict[str, Optional[List[str]]]] = None
+                                   ) -> Dict[str, Any]:
+        """
+        Import Excel completo con gestione multi-sheet.
+        Con incremental=True le tabelle esistenti non vengono ricreate: si
+        applicano solo le righe inserite/aggiornate/eliminate, identificate
+        da key_column o, se assente, dall'intera riga.
+        sheets e columns (foglio -> colonne, None = tutte) limitano cosa
+        viene letto, tipicamente scelti dall'utente dopo inspect_excel.
+        """
         if not HAS_PANDAS:
             raise Exception("Pandas richiesto per import Excel")
 
@@ -116,14 +166,20 @@ class ExcelDatabaseEnterprise:
                 base_name = os.path.splitext(os.path.basename(file_path))[0]
                 table_prefix = f"excel_{base_name}".replace(" ", "_").lower()
 
-            # Leggi tutti i sheet
+            # Leggi i sheet scelti: una sola apertura del file,
+            # fogli letti in parallelo (o dalla cache su disco)
             excel_file = pd.ExcelFile(file_path)
-            conn = sqlite3.connect(self.db_path)
 
-            for sheet_name in excel_file.sheet_names:
+            sheet_names = [name for name in excel_file.sheet_names
+                           if sheets is None or name in sheets]
+            sheet_frames = iter_excel_sheets(excel_file, file_path,
+                                             sheet_names,
+                                             parse_cache=self.parse_cache,
+                                             usecols=columns)
+            for sheet_name, df, read_error in sheet_frames:
                 try:
-                    # Leggi sheet
-                    df = pd.read_excel(file_path, sheet_name=sheet_name)
+                    if read_error is not None:
+                        raise read_error
 
                     # Pulisci e prepara dati
                     df = self.clean_dataframe(df)
@@ -139,32 +195,49 @@ class ExcelDatabaseEnterprise:
 
                     table_name = self.clean_table_name(table_name)
 
-                    # Salva nel database
-                    df.to_sql(table_name, conn, if_exists='replace',
-                             index=False, method='multi')
+                    # Salva nel database (caricamento massivo o incrementale);
+                    # lo scrittore condiviso è occupato solo per il foglio
+                    # corrente
+                    with self.pool.write() as conn:
+                        loader = BulkLoader(conn)
+                        if incremental:
+                            key_columns = ([self.clean_column_name(key_column)]
+                                           if key_column else None)
+                            load_stats = loader.upsert_dataframe(
+                                df, table_name, key_columns)
+                        else:
+                            load_stats = loader.load_dataframe(
+                                df, table_name, if_exists='replace')
 
                     # Aggiorna metadata
                     self.update_table_metadata(table_name, file_path,
-                                              len(df), len(df.columns))
+                                               len(df), len(df.columns),
+                                               delta=load_stats)
 
-                    results['tables_created'].append({
+                    table_info = {
                         'name': table_name,
                         'sheet': sheet_name,
                         'rows': len(df),
                         'columns': len(df.columns)
-                    })
+                    }
+                    if incremental:
+                        table_info.update(inserted=load_stats['inserted'],
+                                          updated=load_stats['updated'],
+                                          deleted=load_stats['deleted'])
+                    results['tables_created'].append(table_info)
                     results['total_rows'] += len(df)
 
                     self.logger.info(
                         f"Sheet '{sheet_name}' -> Tabella '{table_name}' "
-                        f"({len(df)} righe)")
+                        f"({len(df)} righe, "
+                        f"{load_stats['rows_per_second']:,.0f} righe/s)")
 
                 except Exception as e:
                     error_msg = f"Errore sheet '{sheet_name}': {str(e)}"
                     results['errors'].append(error_msg)
                     self.logger.error(error_msg)
 
-            conn.close()
+            excel_file.close()
             results['success'] = len(results['tables_created']) > 0
 
             self.logger.info(
@@ -219,20 +292,33 @@ class ExcelDatabaseEnterprise:
         return clean_name[:50]  # Limita lunghezza
 
     def update_table_metadata(self, table_name: str, source_file: str,
-                             rows: int, columns: int):
-        """Aggiorna metadata tabella"""
+                              rows: int, columns: int,
+                              delta: Optional[Dict[str, Any]] = None):
+        """Aggiorna metadata tabella e conteggi delta dell'ultimo import"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                INSERT OR REPLACE INTO table_metadata
-                (table_name, source_file, total_rows, total_columns)
-                VALUES (?, ?, ?, ?)
-            """, (table_name, source_file, rows, columns))
-
-            conn.commit()
-            conn.close()
+            with self.pool.write() as conn:
+                cursor = conn.cursor()
+
+                delta = delta or {}
+                cursor.execute("""
+                    INSERT INTO table_metadata
+                    (table_name, source_file, total_rows, total_columns,
+                     last_import_at, import_mode, rows_inserted,
+                     rows_updated, rows_deleted)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, ?, ?, ?, ?)
+                    ON CONFLICT(table_name) DO UPDATE SET
+                        source_file = excluded.source_file,
+                        total_rows = excluded.total_rows,
+                        total_columns = excluded.total_columns,
+                        last_import_at = excluded.last_import_at,
+                        import_mode = excluded.import_mode,
+                        rows_inserted = excluded.rows_inserted,
+                        rows_updated = excluded.rows_updated,
+                        rows_deleted = excluded.rows_deleted
+                """, (table_name, source_file, rows, columns,
+                      delta.get('mode', 'replace'),
+                      delta.get('inserted', rows), delta.get('updated', 0),
+                      delta.get('deleted', 0)))
 
         except Exception as e:
             self.logger.error(f"Errore aggiornamento metadata: {e}")
@@ -240,7 +326,7 @@ class ExcelDatabaseEnterprise:
     def get_all_tables_info(self) -> List[Dict[str, Any]]:
         """Ottiene informazioni complete su tutte le tabelle"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.pool.reader()
             cursor = conn.cursor()
 
             # Query per ottenere tabelle con metadata
@@ -284,15 +370,18 @@ class ExcelDatabaseEnterprise:
 
                 tables_info.append(table_info)
 
-            conn.close()
             return tables_info
 
         except Exception as e:
             self.logger.error(f"Errore get tables info: {e}")
             return []
 
-    def execute_advanced_query(self, query: str) -> Optional[pd.DataFrame]:
-        """Esegue query con gestione avanzata errori"""
+    def execute_advanced_query(self, query: str, params: Sequence[Any] = ()
+                               ) -> Optional[pd.DataFrame]:
+        """
+        Esegue query con gestione avanzata errori (params per i segnaposto
+        '?')
+        """
         try:
             # Validazione base query
             if not query.strip():
@@ -302,9 +391,8 @@ class ExcelDatabaseEnterprise:
             query_log = query[:100] + "..." if len(query) > 100 else query
             self.logger.info(f"Eseguendo query: {query_log}")
 
-            conn = sqlite3.connect(self.db_path)
-            result = pd.read_sql_query(query, conn)
-            conn.close()
+            conn = self.pool.reader()
+            result = pd.read_sql_query(query, conn, params=tuple(params))
 
             self.logger.info(f"Query completata: {len(result)} risultati")
             return result
@@ -313,57 +401,48 @@ class ExcelDatabaseEnterprise:
             self.logger.error(f"Errore query: {e}")
             return None
 
+    def execute_paged_query(self, query: str, params: Sequence[Any] = (),
+                            page_size: int = None) -> Optional["PagedResult"]:
+        """
+        Esegue la query restituendo subito la prima pagina: le successive
+        si leggono con fetch_next() e il totale con total_count(), senza
+        materializzare l'intero risultato come execute_advanced_query.
+        """
+        try:
+            if not query.strip():
+                raise ValueError("Query vuota")
+
+            query_log = query[:100] + "..." if len(query) > 100 else query
+            self.logger.info(f"Eseguendo query a pagine: {query_log}")
+
+            result = PagedResult(self.pool, query, params,
+                                 page_size=page_size or PAGE_SIZE)
+            more = "" if result.complete else "+"
+            self.logger.info(f"Prima pagina: {result.fetched}{more} risultati")
+            return result
+
+        except Exception as e:
+            self.logger.error(f"Errore query: {e}")
+            return None
+
     def build_filtered_query(self, table_name: str,
-                           columns: List[str] = None,
-                           filters: List[Dict[str, Any]] = None,
-                           order_by: str = None,
-                           limit: int = None) -> str:
-        """Costruisce query con filtri avanzati"""
-        # Seleziona colonne
-        if columns:
-            cols_str = ", ".join(f"[{col}]" for col in columns)
-        else:
-            cols_str = "*"
-
-        query = f"SELECT {cols_str} FROM [{table_name}]"
-
-        # Applica filtri
-        if filters:
-            conditions = []
-            for f in filters:
-                column = f['column']
-                operator = f.get('operator', '=')
-                value = f['value']
-
-                if operator.upper() == 'LIKE':
-                    conditions.append(f"[{column}] LIKE '%{value}%'")
-                elif operator.upper() == 'IN':
-                    if isinstance(value, list):
-                        value_list = "','".join(str(v) for v in value)
-                        conditions.append(f"[{column}] IN ('{value_list}')")
-                elif isinstance(value, str):
-                    conditions.append(f"[{column}] {operator} '{value}'")
-                else:
-                    conditions.append(f"[{column}] {operator} {value}")
-
-            if conditions:
-                query += " WHERE " + " AND ".join(conditions)
-
-        # ORDER BY
-        if order_by:
-            query += f" ORDER BY [{order_by}]"
-
-        # LIMIT
-        if limit and limit > 0:
-            query += f" LIMIT {limit}"
-
-        return query
+                             columns: List[str] = None,
+                             filters: List[Dict[str, Any]] = None,
+                             order_by: OrderBy = None,
+                             limit: int = None) -> BuiltQuery:
+        """
+        Costruisce query con filtri avanzati: SQL con segnaposto '?' e
+        parametri, da passare insieme a execute_advanced_query o
+        execute_paged_query. order_by è una colonna o (colonna,
+        'ASC'/'DESC').
+        """
+        return build_select(table_name, columns, filters, order_by, limit)
 
     def get_column_statistics(self, table_name: str,
                             column_name: str) -> Dict[str, Any]:
         """Ottiene statistiche per una colonna"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.pool.reader()
 
             # Statistiche base
             query = f"""
@@ -404,7 +483,6 @@ class ExcelDatabaseEnterprise:
             except Exception:
                 pass  # Non è una colonna numerica
 
-            conn.close()
             return stats
 
         except Exception as e:
@@ -418,28 +496,26 @@ class ExcelDatabaseEnterprise:
             if not conditions:
                 raise ValueError("Condizioni richieste per eliminazione")
 
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self.pool.write() as conn:
+                cursor = conn.cursor()
 
-            # Costruisci WHERE clause
-            where_parts = []
-            for condition in conditions:
-                column = condition['column']
-                operator = condition.get('operator', '=')
-                value = condition['value']
+                # Costruisci WHERE clause
+                where_parts = []
+                for condition in conditions:
+                    column = condition['column']
+                    operator = condition.get('operator', '=')
+                    value = condition['value']
 
-                if isinstance(value, str):
-                    where_parts.append(f"[{column}] {operator} '{value}'")
-                else:
-                    where_parts.append(f"[{column}] {operator} {value}")
+                    if isinstance(value, str):
+                        where_parts.append(f"[{column}] {operator} '{value}'")
+                    else:
+                        where_parts.append(f"[{column}] {operator} {value}")
 
-            where_clause = " AND ".join(where_parts)
-            query = f"DELETE FROM [{table_name}] WHERE {where_clause}"
+                where_clause = " AND ".join(where_parts)
+                query = f"DELETE FROM [{table_name}] WHERE {where_clause}"
 
-            cursor.execute(query)
-            deleted_count = cursor.rowcount
-            conn.commit()
-            conn.close()
+                cursor.execute(query)
+                deleted_count = cursor.rowcount
 
             self.logger.info(f"Eliminati {deleted_count} record da {table_name}")
             return deleted_count
@@ -448,48 +524,44 @@ class ExcelDatabaseEnterprise:
             self.logger.error(f"Errore eliminazione: {e}")
             return 0
 
-    def export_flexible(self, data: pd.DataFrame, file_path: str,
+    def export_flexible(self, data, file_path: str,
                        export_format: str = "excel",
                        options: Dict[str, Any] = None) -> bool:
-        """Esportazione flessibile in vari formati"""
+        """
+        Esportazione flessibile in vari formati. data può essere un
+        DataFrame, un PagedResult o un iterabile di DataFrame: Excel e CSV
+        vengono scritti a blocchi, JSON e HTML richiedono il risultato intero.
+        """
         try:
             options = options or {}
 
             if export_format.lower() == "excel":
-                # Excel con opzioni avanzate
-                with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                    data.to_excel(writer, sheet_name='Data', index=False)
-
-                    # Aggiungi formattazione se richiesta
-                    if options.get('add_formatting', False):
-                        workbook = writer.book
-                        worksheet = writer.sheets['Data']
-
-                        # Header formatting
-                        header_format = workbook.create_format({
-                            'bold': True,
-                            'bg_color': '#4F81BD',
-                            'font_color': 'white'
-                        })
-
-                        for col_num, value in enumerate(data.columns.values):
-                            worksheet.write(0, col_num, value, header_format)
+                # Excel a memoria costante, nuovo foglio oltre il limite di
+                # righe
+                rows = export_xlsx(
+                    data, file_path, sheet_name='Data',
+                    add_formatting=options.get('add_formatting', False))
 
             elif export_format.lower() == "csv":
                 separator = options.get('separator', ',')
-                data.to_csv(file_path, index=False, sep=separator)
+                rows = export_csv(data, file_path, sep=separator)
 
             elif export_format.lower() == "json":
+                data = to_frame(data)
                 orient = options.get('orient', 'records')
                 data.to_json(file_path, orient=orient, indent=2)
+                rows = len(data)
 
             elif export_format.lower() == "html":
+                data = to_frame(data)
                 data.to_html(file_path, index=False, escape=False)
+                rows = len(data)
 
             else:
                 raise ValueError(f"Formato non supportato: {export_format}")
 
-            self.logger.info(f"Esportazione completata: {file_path}")
+            self.logger.info(
+                f"Esportazione completata: {file_path} ({rows} righe)")
             return True
 
         except Exception as e:
@@ -501,17 +573,14 @@ class ExcelDatabaseEnterprise:
                           is_favorite: bool = False) -> bool:
         """Salva query con opzioni avanzate"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                INSERT OR REPLACE INTO saved_queries
-                (name, sql_query, description, is_favorite, last_used)
-                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (name, query, description, is_favorite))
+            with self.pool.write() as conn:
+                cursor = conn.cursor()
 
-            conn.commit()
-            conn.close()
+                cursor.execute("""
+                    INSERT OR REPLACE INTO saved_queries
+                    (name, sql_query, description, is_favorite, last_used)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                """, (name, query, description, is_favorite))
 
             self.logger.info(f"Query salvata: {name}")
             return True
@@ -523,7 +592,7 @@ class ExcelDatabaseEnterprise:
     def get_saved_queries(self) -> List[Dict[str, Any]]:
         """Ottiene query salvate con informazioni complete"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.pool.reader()
             cursor = conn.cursor()
 
             cursor.execute("""
@@ -545,7 +614,6 @@ class ExcelDatabaseEnterprise:
                     'is_favorite': bool(row[6])
                 })
 
-            conn.close()
             return queries
 
         except Exception as e:
@@ -555,25 +623,23 @@ class ExcelDatabaseEnterprise:
     def optimize_database(self) -> Dict[str, Any]:
         """Ottimizza database e restituisce statistiche"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # VACUUM per ottimizzare spazio
-            cursor.execute("VACUUM")
+            with self.pool.write() as conn:
+                cursor = conn.cursor()
 
-            # ANALYZE per aggiornare statistiche
-            cursor.execute("ANALYZE")
+                # VACUUM per ottimizzare spazio
+                cursor.execute("VACUUM")
 
-            # Ottieni statistiche post-ottimizzazione
-            cursor.execute("PRAGMA page_count")
-            page_count = cursor.fetchone()[0]
+                # ANALYZE per aggiornare statistiche
+                cursor.execute("ANALYZE")
 
-            cursor.execute("PRAGMA page_size")
-            page_size = cursor.fetchone()[0]
+                # Ottieni statistiche post-ottimizzazione
+                cursor.execute("PRAGMA page_count")
+                page_count = cursor.fetchone()[0]
 
-            database_size = page_count * page_size
+                cursor.execute("PRAGMA page_size")
+                page_size = cursor.fetchone()[0]
 
-            conn.close()
+                database_size = page_count * page_size
 
             stats = {
                 'success': True,
@@ -22,6 +22,9 @@ import json
 import os
 from datetime import datetime
 
+# Oltre questo numero di colonne si propone di scegliere cosa caricare
+PROJECTION_PROMPT_COLUMNS = 50
+
 
 class QueryManager:
     """Gestore query salvate con database SQLite"""
@@ -319,10 +322,13 @@ class AdvancedFilter:
 class ColumnSelector:
     """Selettore colonne grafico avanzato"""
 
-    def __init__(self, parent, data, callback):
+    def __init__(self, parent, data, callback, all_columns=None):
         self.parent = parent
         self.data = data
         self.callback = callback
+        # Colonne del file: possono includerne di non caricate (vista ridotta)
+        self.all_columns = (list(all_columns) if all_columns is not None
+                            else list(data.columns))
         self.column_vars = {}
 
     def show_selector_dialog(self):
@@ -345,7 +351,8 @@ class ColumnSelector:
         # Info
         info_label = tk.Label(
             self.selector_window,
-            text=f"Seleziona le colonne da visualizzare ({len(self.data.columns)} totali)",
+            text=(f"Seleziona le colonne da visualizzare "
+                  f"({len(self.all_columns)} totali)"),
             font=("Arial", 11),
             fg='#cccccc',
             bg='#2b2b2b'
@@ -400,8 +407,8 @@ class ColumnSelector:
         canvas.configure(yscrollcommand=scrollbar.set)
 
         # Crea checkbox per ogni colonna
-        for i, col in enumerate(self.data.columns):
-            var = tk.BooleanVar(value=True)
+        for i, col in enumerate(self.all_columns):
+            var = tk.BooleanVar(value=col in self.data.columns)
             self.column_vars[col] = var
 
             # Frame per ogni colonna
@@ -423,11 +430,15 @@ class ColumnSelector:
 
             # Info colonna
             try:
-                dtype = str(self.data[col].dtype)
-                null_count = self.data[col].isnull().sum()
-                unique_count = self.data[col].nunique()
+                if col in self.data.columns:
+                    dtype = str(self.data[col].dtype)
+                    null_count = self.data[col].isnull().sum()
+                    unique_count = self.data[col].nunique()
 
-                info_text = f"({dtype} | {null_count} nulli | {unique_count} unici)"
+                    info_text = (f"({dtype} | {null_count} nulli | "
+                                 f"{unique_count} unici)")
+                else:
+                    info_text = "(non caricata)"
 
                 info_label = tk.Label(
                     col_frame,
@@ -491,16 +502,20 @@ class ColumnSelector:
             messagebox.showwarning("Avviso", "Seleziona almeno una colonna!")
             return
 
-        # Applica selezione
-        filtered_data = self.data[selected_cols]
-        self.callback(filtered_data, selected_columns=selected_cols)
+        # Applica selezione: None se servono colonne non ancora caricate,
+        # che il chiamante rilegge dal file
+        if all(col in self.data.columns for col in selected_cols):
+            filtered_data = self.data[selected_cols]
+        else:
+            filtered_data = None
         self.selector_window.destroy()
+        self.callback(filtered_data, selected_columns=selected_cols)
 
         messagebox.showinfo(
             "Selezione Applicata",
             f"✅ Selezione colonne applicata!\n\n"
             f"Colonne selezionate: {len(selected_cols)}\n"
-            f"Colonne totali: {len(self.data.columns)}\n\n"
+            f"Colonne totali: {len(self.all_columns)}\n\n"
             f"Prime colonne: {', '.join(selected_cols[:3])}{'...' if len(selected_cols) > 3 else ''}"
         )
 
@@ -518,6 +533,8 @@ class ExcelToolsProComplete:
         self.original_data = None
         self.current_data = None
         self.current_file = None
+        self.current_path = None
+        self.file_columns = None
         self.selected_columns = None
 
         # Managers
@@ -843,17 +860,22 @@ al caricamento del file!
         functions_grid.grid_columnconfigure(0, weight=1)
         functions_grid.grid_columnconfigure(1, weight=1)
 
-    def load_file(self):
-        """Carica file Excel/CSV - IMPLEMENTATO"""
+    def load_file(self, file_path=None, columns=None):
+        """
+        Carica file Excel/CSV - IMPLEMENTATO
+        Con columns vengono lette solo le colonne indicate (vista salvata
+        o selezione): le altre non sono mai caricate in memoria.
+        """
         try:
-            file_path = filedialog.askopenfilename(
-                title="Seleziona file Excel o CSV",
-                filetypes=[
-                    ("File Excel", "*.xlsx *.xls"),
-                    ("File CSV", "*.csv"),
-                    ("Tutti i file", "*.*")
-                ]
-            )
+            if not file_path:
+                file_path = filedialog.askopenfilename(
+                    title="Seleziona file Excel o CSV",
+                    filetypes=[
+                        ("File Excel", "*.xlsx *.xls"),
+                        ("File CSV", "*.csv"),
+                        ("Tutti i file", "*.*")
+                    ]
+                )
 
             if not file_path:
                 return
@@ -868,31 +890,47 @@ al caricamento del file!
                 )
                 return
 
+            from projection import read_columns
+            from workbook_inspector import inspect_file
+
+            # Intestazioni e campione senza leggere i dati
+            sheets_info = inspect_file(file_path)
+            file_columns = sheets_info[0]['headers'] if sheets_info else None
+
+            if (columns is None and file_columns
+                    and len(file_columns) > PROJECTION_PROMPT_COLUMNS
+                    and messagebox.askyesno(
+                        "Molte Colonne",
+                        f"Il file contiene {len(file_columns)} colonne.\n\n"
+                        f"Scegliere quali caricare? "
+                        f"Le altre non verranno lette.")):
+                selector = ColumnSelector(
+                    self.root, sheets_info[0]['sample'],
+                    lambda _data, selected_columns=None: self.load_file(
+                        file_path, selected_columns))
+                selector.show_selector_dialog()
+                return
+
             # Progress
             self.status_label.config(text="🔄 Caricamento file in corso...")
             self.root.update()
 
-            # Carica dati
-            if file_path.lower().endswith('.csv'):
-                # Prova diverse codifiche
-                for encoding in ['utf-8', 'latin-1', 'cp1252']:
-                    try:
-                        data = pd.read_csv(file_path, encoding=encoding)
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                else:
-                    raise Exception("Impossibile decodificare file CSV")
-            else:
-                data = pd.read_excel(file_path)
+            # Carica dati: solo le colonne scelte; per i CSV codifica,
+            # separatore, decimali e intestazione rilevati da un campione
+            data = read_columns(file_path, columns)
 
             # Salva dati
             self.original_data = data.copy()
             self.current_data = data.copy()
             self.current_file = os.path.basename(file_path)
-            self.selected_columns = None
+            self.current_path = file_path
+            self.file_columns = (list(file_columns) if file_columns
+                                 else list(data.columns))
+            self.selected_columns = list(data.columns) if columns else None
 
             # Aggiorna interfaccia
+            if hasattr(self, 'data_tree'):
+                self.data_tree.master.destroy()
             self.update_interface_with_data()
 
             # Messaggio successo
@@ -901,7 +939,8 @@ al caricamento del file!
                 f"✅ File caricato con successo!\n\n"
                 f"📄 {self.current_file}\n"
                 f"📊 {len(data):,} righe\n"
-                f"📋 {len(data.columns)} colonne\n"
+                f"📋 {len(data.columns)} di {len(self.file_columns)} "
+                f"colonne\n"
                 f"💾 {data.memory_usage(deep=True).sum() / 1024 / 1024:.1f} MB"
             )
 
@@ -944,7 +983,8 @@ al caricamento del file!
         info_text = f"📊 Mostrando {rows_shown:,} di {len(self.current_data):,} righe"
 
         if self.selected_columns:
-            info_text += f" | {len(self.selected_columns)} di {len(self.original_data.columns)} colonne"
+            info_text += (f" | {len(self.selected_columns)} di "
+                          f"{len(self.file_columns)} colonne")
 
         info_label = tk.Label(
             info_frame,
@@ -1097,6 +1137,11 @@ al caricamento del file!
 
         # Callback per selezione colonne
         def selection_callback(filtered_data, selected_columns=None):
+            if filtered_data is None:
+                # Colonne non caricate: rilettura del file con la nuova
+                # selezione
+                self.load_file(self.current_path, selected_columns)
+                return
             self.current_data = filtered_data
             self.selected_columns = selected_columns
             # Ricrea treeview con nuove colonne
@@ -1108,7 +1153,9 @@ al caricamento del file!
             self.update_statistics()
 
         # Mostra dialog selezione
-        selector = ColumnSelector(self.root, self.original_data, selection_callback)
+        selector = ColumnSelector(self.root, self.original_data,
+                                  selection_callback,
+                                  all_columns=self.file_columns)
         selector.show_selector_dialog()
 
     def show_saved_queries(self):
@@ -1121,6 +1168,11 @@ al caricamento del file!
             messagebox.showwarning("Avviso", "Nessun file caricato!")
             return
 
+        if len(self.original_data.columns) < len(self.file_columns):
+            # Caricate solo alcune colonne: rilettura completa del file
+            self.load_file(self.current_path)
+            return
+
         self.current_data = self.original_data.copy()
         self.selected_columns = None
 
@@ -1185,7 +1237,8 @@ al caricamento del file!
             'filters_applied': True if len(self.current_data) != len(self.original_data) else False,
             'selected_columns': self.selected_columns,
             'row_count': len(self.current_data),
-            'original_file': self.current_file
+            'original_file': self.current_file,
+            'file_path': self.current_path
         }
 
         if self.query_manager.save_query(name, "vista_dati", query_data):
@@ -1220,7 +1273,18 @@ al caricamento del file!
         query_id = item['values'][0]
         query_name = item['values'][1]
 
-        messagebox.showinfo("Query Caricata", f"Funzione caricamento query '{query_name}' implementata!")
+        query = next((q for q in self.query_manager.load_queries()
+                      if q['id'] == query_id), None)
+        if query is None or query['type'] != "vista_dati":
+            return
+
+        # Vista salvata: rilettura del file con le sole colonne della vista
+        file_path = query['data'].get('file_path')
+        if not file_path or not os.path.exists(file_path):
+            messagebox.showwarning(
+                "Avviso", f"File della vista '{query_name}' non trovato!")
+            return
+        self.load_file(file_path, query['data'].get('selected_columns'))
 
     def delete_selected_queries(self):
         """Elimina query selezionate"""
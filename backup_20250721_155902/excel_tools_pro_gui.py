@@ -16,6 +16,8 @@ import threading
 from tkinter import filedialog, messagebox, ttk
 import tkinter as tk
 from excel_database_enterprise_complete import ExcelDatabaseEnterprise
+from query_builder import inline_params
+from sheet_picker import SheetPickerDialog
 
 try:
     import customtkinter as ctk
@@ -33,8 +35,10 @@ class ExcelToolsProGUI:
         self.db_enterprise = ExcelDatabaseEnterprise()
         self.current_table = None
         self.current_data = None
+        self.current_result = None  # PagedResult della query mostrata
         self.current_query = ""
         self.filter_conditions = []
+        self.filter_query = None  # query generata dai filtri (sql, params)
         self.setup_main_window()
 
     def setup_main_window(self):
@@ -307,7 +311,9 @@ class ExcelToolsProGUI:
             tree_frame, orient="vertical", command=self.results_tree.yview
         )
         v_scrollbar.pack(side="right", fill="y")
-        self.results_tree.configure(yscrollcommand=v_scrollbar.set)
+        self.results_vscroll = v_scrollbar
+        # Scorrendo in fondo viene letta la pagina successiva
+        self.results_tree.configure(yscrollcommand=self.on_results_scroll)
 
         h_scrollbar = ttk.Scrollbar(
             tree_frame, orient="horizontal", command=self.results_tree.xview
@@ -428,6 +434,7 @@ class ExcelToolsProGUI:
 
         self.results_tree = ttk.Treeview(results_frame)
         self.results_tree.pack(fill="both", expand=True, padx=5, pady=5)
+        self.results_tree.configure(yscrollcommand=self.on_results_scroll)
 
     def create_query_tab_content(self):
         """Contenuto tab query builder"""
@@ -468,12 +475,24 @@ class ExcelToolsProGUI:
         )
 
         if file_path:
+            # Ispezione rapida (senza leggere i dati) e scelta di
+            # fogli/colonne prima dell'import
+            try:
+                sheets_info = self.db_enterprise.inspect_excel(file_path)
+            except Exception as e:
+                self.update_status(f"❌ Errore lettura file: {str(e)}")
+                return
+
+            selection = SheetPickerDialog(self.root, sheets_info).show()
+            if not selection:
+                return
+
             self.update_status("📥 Importando file Excel...")
 
             def import_task():
                 try:
                     result = self.db_enterprise.import_excel_comprehensive(
-                        file_path)
+                        file_path, sheets=list(selection), columns=selection)
 
                     if result['success']:
                         msg = (f"✅ Import completato: "
@@ -597,17 +616,33 @@ class ExcelToolsProGUI:
             messagebox.showwarning("Attenzione", "Inserisci una query SQL")
             return
 
+        # Testo dell'editor (con i valori letterali) per salvarla; se è
+        # ancora la query dei filtri si esegue la versione parametrizzata
         self.current_query = query
+        params = ()
+        if (self.filter_query is not None
+                and query == inline_params(self.filter_query)):
+            query, params = self.filter_query
         self.update_status("⚡ Eseguendo query...")
 
         def query_task():
             try:
-                result = self.db_enterprise.execute_advanced_query(query)
+                # Solo la prima pagina: le altre si leggono scorrendo
+                result = self.db_enterprise.execute_paged_query(query, params)
 
                 if result is not None:
                     self.root.after(0, lambda: self.display_query_results(result))
-                    msg = f"✅ Query completata: {len(result)} risultati"
+                    more = "" if result.complete else "+"
+                    msg = (f"✅ Query completata: {result.fetched:,}{more} "
+                           f"risultati")
                     self.root.after(0, lambda: self.update_status(msg))
+                    # Totale calcolato dopo aver mostrato la prima pagina
+                    try:
+                        total = result.total_count()
+                    except Exception:
+                        return  # Totale non disponibile: resta il parziale
+                    self.root.after(
+                        0, lambda: self.show_result_total(result, total))
                 else:
                     self.root.after(0, lambda: self.update_status(
                         "❌ Errore nell'esecuzione della query"))
@@ -618,20 +653,22 @@ class ExcelToolsProGUI:
 
         threading.Thread(target=query_task, daemon=True).start()
 
-    def display_query_results(self, df):
-        """Visualizza risultati query nella tabella"""
-        self.current_data = df
+    def display_query_results(self, result):
+        """Visualizza la prima pagina dei risultati nella tabella"""
+        if self.current_result is not None:
+            self.current_result.close()
+        self.current_result = result
 
         # Pulisci tabella esistente
         for item in self.results_tree.get_children():
             self.results_tree.delete(item)
 
-        if df.empty:
+        if not result.rows:
             self.update_records_count(0)
             return
 
         # Configura colonne
-        columns = list(df.columns)
+        columns = result.columns
         self.results_tree["columns"] = columns
         self.results_tree["show"] = "headings"
 
@@ -640,9 +677,12 @@ class ExcelToolsProGUI:
             self.results_tree.heading(col, text=col)
             self.results_tree.column(col, width=120, minwidth=80)
 
-        # Inserisci dati (limita per performance)
-        max_display = 2000
-        for index, row in df.head(max_display).iterrows():
+        self.insert_result_rows(result.rows)
+        self.update_records_count(result.total or result.fetched)
+
+    def insert_result_rows(self, rows):
+        """Aggiunge righe del risultato alla tabella"""
+        for row in rows:
             values = []
             for val in row:
                 if val is None:
@@ -654,16 +694,31 @@ class ExcelToolsProGUI:
 
             self.results_tree.insert("", "end", values=values)
 
-        self.update_records_count(len(df))
-
-        # Mostra messaggio se i dati sono stati limitati
-        if len(df) > max_display:
-            msg = f"⚠️ Visualizzati {max_display} di {len(df)} risultati"
-            self.update_status(msg)
+    def on_results_scroll(self, first, last):
+        """Scrollbar dei risultati; in fondo legge la pagina successiva"""
+        if hasattr(self, 'results_vscroll'):
+            self.results_vscroll.set(first, last)
+        result = self.current_result
+        if result is not None and not result.exhausted and float(last) >= 1.0:
+            page_start = result.fetched
+            result.fetch_next()
+            self.insert_result_rows(result.rows[page_start:])
+            if result.total is not None:
+                self.update_status(
+                    f"📄 Visualizzati {result.fetched:,} di "
+                    f"{result.total:,} risultati")
+
+    def show_result_total(self, result, total):
+        """Totale righe calcolato in background"""
+        if result is self.current_result:
+            self.update_records_count(total)
+            self.update_status(
+                f"✅ Query completata: {total:,} risultati "
+                f"(visualizzati {result.fetched:,})")
 
     def export_results(self):
         """Esporta risultati correnti"""
-        if self.current_data is None or self.current_data.empty:
+        if self.current_result is None or not self.current_result.rows:
             messagebox.showwarning("Attenzione", "Nessun dato da esportare")
             return
 
@@ -694,7 +749,7 @@ class ExcelToolsProGUI:
                     export_format = format_map.get(ext, 'excel')
 
                     success = self.db_enterprise.export_flexible(
-                        self.current_data, file_path, export_format)
+                        self.current_result, file_path, export_format)
 
                     if success:
                         msg = f"✅ Esportazione completata: {file_path}"
@@ -900,17 +955,18 @@ class ExcelToolsProGUI:
         if not self.current_table or not self.filter_conditions:
             return
 
-        # Costruisci query con filtri
-        query = self.db_enterprise.build_filtered_query(
+        # Costruisci query con filtri (valori come parametri)
+        self.filter_query = self.db_enterprise.build_filtered_query(
             self.current_table,
             filters=self.filter_conditions,
             limit=int(self.limit_var.get())
         )
 
-        # Aggiorna editor SQL
+        # Aggiorna editor SQL (valori come letterali: il testo resta
+        # eseguibile anche se modificato o salvato)
         if hasattr(self, 'sql_text'):
             self.sql_text.delete(1.0, tk.END)
-            self.sql_text.insert(1.0, query)
+            self.sql_text.insert(1.0, inline_params(self.filter_query))
 
         # Esegui query automaticamente
         self.execute_query()
@@ -20,6 +20,8 @@ import threading
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
+from settings import load_config
+
 try:
     import pandas as pd
     HAS_PANDAS = True
@@ -27,6 +29,20 @@ except ImportError:
     HAS_PANDAS = False
     print("⚠️ Pandas not available - limited functionality")
 
+if HAS_PANDAS:
+    from streaming_loader import load_csv_streaming
+    from batch_reader import DATA_EXTENSIONS, data_file_jobs, iter_data_files
+    from dtype_optimizer import format_memory_report, optimize_dtypes
+    from frame_view import FilteredView, RowSelection, enable_copy_on_write
+    from memory_governor import GovernedAttribute, GovernedDict, MemoryGovernor
+    from sheet_picker import SheetPickerDialog
+    from sheet_reader import default_max_workers
+    from stream_export import CHUNK_ROWS, export_csv, export_xlsx
+    from workbook_inspector import inspect_file
+
+    # Dati caricati condivisi tra le viste senza copie
+    enable_copy_on_write()
+
 try:
     import customtkinter as ctk
     ctk.set_appearance_mode("dark")
@@ -40,12 +56,38 @@ except ImportError:
 class ExcelToolsUnified:
     """Strumento unificato per gestione Excel e Database"""
 
+    if HAS_PANDAS:
+        # DataFrame conservati nel governor della memoria; i dati filtrati
+        # sono una selezione di righe su current_data (nessuna copia)
+        current_data = GovernedAttribute()
+        filtered_data = FilteredView('current_data')
+
     def __init__(self):
         self.db_path = "exceltools_unified.db"
+
+        # Configurazione (config.ini)
+        self.config = load_config()
+
+        # Limite di memoria [PERFORMANCE] memory_limit_mb: i DataFrame meno
+        # usati vanno su disco
+        if HAS_PANDAS:
+            self.memory_governor = MemoryGovernor.from_config(self.config)
+            self.imported_files = GovernedDict(
+                self.memory_governor, "imported", field="data"
+            )
+        else:
+            self.memory_governor = None
+            self.imported_files = {}  # Dictionary per file multipli
         self.current_data = None
         self.filtered_data = None
-        self.imported_files = {}  # Dictionary per file multipli
         self.saved_views = {}  # Dictionary per viste salvate
+        self.chunk_size = self.config.getint(
+            "DEFAULT", "chunk_size", fallback=10000
+        )
+        self.optimize_dtypes = self.config.getboolean(
+            "PERFORMANCE", "optimize_dtypes", fallback=True
+        )
+        self._load_token = 0  # Identifica il caricamento in corso
 
         # Inizializza database
         self.setup_database()
@@ -465,13 +507,18 @@ class ExcelToolsUnified:
             self.progress.start()
 
             # Carica in thread separato per non bloccare GUI
-            threading.Thread(target=self._load_file_thread, args=(filepath,), daemon=True).start()
+            self._load_token += 1
+            threading.Thread(
+                target=self._load_file_thread,
+                args=(filepath, self._load_token),
+                daemon=True
+            ).start()
 
         except Exception as e:
             self.update_status(f"❌ Errore: {e}")
             messagebox.showerror("Errore", f"Impossibile caricare il file:\n{e}")
 
-    def _load_file_thread(self, filepath):
+    def _load_file_thread(self, filepath, token=None):
         """Thread per caricamento file"""
         try:
             filename = os.path.basename(filepath)
@@ -483,7 +530,18 @@ class ExcelToolsUnified:
                     raise ImportError("pandas non disponibile per file Excel")
             elif filepath.endswith('.csv'):
                 if HAS_PANDAS:
-                    data = pd.read_csv(filepath)
+                    # Lettura a blocchi: il primo blocco viene mostrato subito
+                    data = load_csv_streaming(
+                        filepath, self.chunk_size,
+                        on_first_chunk=lambda chunk: self.root.after(
+                            0, self._file_preview_callback,
+                            chunk, filename, token
+                        ),
+                        progress_callback=lambda rows, frac: self.root.after(
+                            0, self._file_progress_callback,
+                            rows, frac, token
+                        )
+                    )
                 else:
                     # Fallback per CSV senza pandas
                     import csv
@@ -493,17 +551,50 @@ class ExcelToolsUnified:
             else:
                 raise ValueError("Formato file non supportato")
 
+            # Riduzione memoria (dtype compatti), ancora nel thread di
+            # caricamento
+            memory_report = None
+            if HAS_PANDAS and self.optimize_dtypes:
+                data, memory_report = optimize_dtypes(data)
+
             # Aggiorna GUI dal thread principale
-            self.root.after(0, self._file_loaded_callback, data, filename, filepath)
+            self.root.after(
+                0, self._file_loaded_callback,
+                data, filename, filepath, token, memory_report
+            )
 
         except Exception as e:
             self.root.after(0, self._file_error_callback, str(e))
 
-    def _file_loaded_callback(self, data, filename, filepath):
+    def _file_preview_callback(self, chunk, filename, token=None):
+        """Callback con il primo blocco di un CSV ancora in caricamento"""
+        if token is not None and token != self._load_token:
+            return
+        self.current_data = chunk
+        self.filtered_data = chunk
+        self.file_label.config(text=filename, foreground="black")
+        self.rows_label.config(text=f"{len(chunk)}+", foreground="black")
+        self.update_tree_view()
+        self.update_status(
+            f"⏳ Anteprima: {len(chunk)} righe, caricamento in corso..."
+        )
+
+    def _file_progress_callback(self, rows, fraction, token=None):
+        """Callback di avanzamento del caricamento a blocchi"""
+        if token is not None and token != self._load_token:
+            return
+        self.rows_label.config(text=f"{rows}+")
+        self.update_status(f"⏳ Caricamento: {rows} righe ({fraction:.0%})")
+
+    def _file_loaded_callback(self, data, filename, filepath, token=None,
+                              memory_report=None):
         """Callback quando file è caricato"""
+        if token is not None and token != self._load_token:
+            # Nel frattempo è stato avviato un altro caricamento
+            return
         try:
             self.current_data = data
-            self.filtered_data = data.copy() if HAS_PANDAS and hasattr(data, 'copy') else data
+            self.filtered_data = data
 
             # Aggiorna info file
             self.file_label.config(text=filename, foreground="black")
@@ -528,7 +619,13 @@ class ExcelToolsUnified:
             self.save_file_info(filename, filepath, row_count, columns)
 
             self.progress.stop()
-            self.update_status(f"✅ File caricato: {row_count} righe")
+            if memory_report:
+                self.update_status(
+                    f"✅ File caricato: {row_count} righe | "
+                    f"{format_memory_report(memory_report)}"
+                )
+            else:
+                self.update_status(f"✅ File caricato: {row_count} righe")
 
         except Exception as e:
             self.progress.stop()
@@ -540,19 +637,56 @@ class ExcelToolsUnified:
         self.update_status(f"❌ Errore: {error_msg}")
         messagebox.showerror("Errore", f"Impossibile caricare il file:\n{error_msg}")
 
+    def _filtered_selection(self):
+        """
+        RowSelection dei dati filtrati su current_data (None se sono una
+        lista)
+        """
+        if not HAS_PANDAS:
+            return None
+        return type(self).filtered_data.selection(self)
+
+    def filtered_count(self) -> int:
+        """Numero di righe filtrate senza materializzare la vista"""
+        selection = self._filtered_selection()
+        if selection is not None and self.current_data is not None:
+            return selection.count(self.current_data)
+        data = self.filtered_data
+        return len(data) if hasattr(data, '__len__') else 0
+
+    def filtered_preview(self, rows: int):
+        """Prime righe dei dati filtrati senza materializzare la vista"""
+        selection = self._filtered_selection()
+        if selection is not None and self.current_data is not None:
+            return selection.head(self.current_data, rows)
+        data = self.filtered_data
+        return data.head(rows) if hasattr(data, 'head') else data
+
+    def filtered_chunks(self):
+        """
+        Dati filtrati a blocchi per l'esportazione, senza materializzare la
+        vista
+        """
+        selection = self._filtered_selection()
+        if selection is not None and self.current_data is not None:
+            return selection.chunks(self.current_data, CHUNK_ROWS)
+        return self.filtered_data
+
     def update_tree_view(self):
         """Aggiorna la visualizzazione del treeview"""
         # Pulisci treeview
         for item in self.tree.get_children():
             self.tree.delete(item)
 
-        if self.filtered_data is None:
+        # Solo le righe mostrate vengono estratte dalla sorgente
+        preview = self.filtered_preview(1000)
+        if preview is None:
             return
 
         try:
-            if HAS_PANDAS and hasattr(self.filtered_data, 'columns'):
+            if HAS_PANDAS and hasattr(preview, 'columns'):
                 # DataFrame pandas
-                columns = list(self.filtered_data.columns)
+                columns = list(preview.columns)
                 self.tree["columns"] = columns
                 self.tree["show"] = "headings"
 
@@ -562,14 +696,14 @@ class ExcelToolsUnified:
                     self.tree.column(col, width=100, minwidth=50)
 
                 # Aggiungi dati (max 1000 righe per performance)
-                for i, row in self.filtered_data.head(1000).iterrows():
+                for i, row in preview.iterrows():
                     values = [str(row[col]) for col in columns]
                     self.tree.insert("", "end", values=values)
 
-            elif isinstance(self.filtered_data, list) and self.filtered_data:
+            elif isinstance(preview, list) and preview:
                 # Lista di dizionari
-                if isinstance(self.filtered_data[0], dict):
-                    columns = list(self.filtered_data[0].keys())
+                if isinstance(preview[0], dict):
+                    columns = list(preview[0].keys())
                     self.tree["columns"] = columns
                     self.tree["show"] = "headings"
 
@@ -579,7 +713,7 @@ class ExcelToolsUnified:
                         self.tree.column(col, width=100, minwidth=50)
 
                     # Aggiungi dati (max 1000 righe)
-                    for i, row in enumerate(self.filtered_data[:1000]):
+                    for i, row in enumerate(preview[:1000]):
                         values = [str(row.get(col, "")) for col in columns]
                         self.tree.insert("", "end", values=values)
 
@@ -593,7 +727,7 @@ class ExcelToolsUnified:
             if search_term:
                 self.filter_data_by_search(search_term)
             else:
-                self.filtered_data = self.current_data.copy() if HAS_PANDAS and hasattr(self.current_data, 'copy') else self.current_data
+                self.filtered_data = self.current_data
                 self.update_tree_view()
 
     def filter_data_by_search(self, search_term):
@@ -604,7 +738,7 @@ class ExcelToolsUnified:
                 mask = self.current_data.astype(str).apply(
                     lambda x: x.str.lower().str.contains(search_term, na=False)
                 ).any(axis=1)
-                self.filtered_data = self.current_data[mask]
+                self.filtered_data = RowSelection.from_mask(mask)
             else:
                 # Lista di dizionari
                 filtered = []
@@ -615,7 +749,7 @@ class ExcelToolsUnified:
                 self.filtered_data = filtered
 
             self.update_tree_view()
-            count = len(self.filtered_data) if hasattr(self.filtered_data, '__len__') else 0
+            count = self.filtered_count()
             self.update_status(f"🔍 Filtro applicato: {count} righe trovate")
 
         except Exception as e:
@@ -684,13 +818,14 @@ class ExcelToolsUnified:
         """Applica filtro per colonna specifica"""
         try:
             if HAS_PANDAS and hasattr(self.current_data, 'columns'):
-                self.filtered_data = self.current_data[self.current_data[column].astype(str).isin(values)]
+                self.filtered_data = RowSelection.from_mask(
+                    self.current_data[column].astype(str).isin(values))
             else:
                 self.filtered_data = [row for row in self.current_data
                                     if isinstance(row, dict) and str(row.get(column, "")) in values]
 
             self.update_tree_view()
-            count = len(self.filtered_data) if hasattr(self.filtered_data, '__len__') else 0
+            count = self.filtered_count()
             self.update_status(f"🔍 Filtro '{column}' applicato: {count} righe")
 
         except Exception as e:
@@ -754,11 +889,11 @@ class ExcelToolsUnified:
     def show_all_data(self):
         """Mostra tutti i dati rimuovendo filtri"""
         if self.current_data is not None:
-            self.filtered_data = self.current_data.copy() if HAS_PANDAS and hasattr(self.current_data, 'copy') else self.current_data
+            self.filtered_data = self.current_data
             self.search_var.set("")
             self.column_combo.set('Tutte le colonne')
             self.update_tree_view()
-            count = len(self.filtered_data) if hasattr(self.filtered_data, '__len__') else 0
+            count = self.filtered_count()
             self.update_status(f"📊 Tutti i dati mostrati: {count} righe")
 
     def copy_selection(self):
@@ -784,7 +919,11 @@ class ExcelToolsUnified:
 
     def export_data(self):
         """Esporta dati correnti"""
-        if self.filtered_data is None:
+        # Vista filtrata non materializzata: Excel e CSV la leggono a blocchi
+        selection = self._filtered_selection()
+        data = (self.current_data if selection is not None
+                else self.filtered_data)
+        if data is None:
             messagebox.showwarning("Attenzione", "Nessun dato da esportare")
             return
 
@@ -803,31 +942,34 @@ class ExcelToolsUnified:
         if filepath:
             try:
                 if filepath.endswith('.xlsx') and HAS_PANDAS:
-                    if hasattr(self.filtered_data, 'to_excel'):
-                        self.filtered_data.to_excel(filepath, index=False)
+                    if hasattr(data, 'to_excel'):
+                        export_xlsx(self.filtered_chunks(), filepath,
+                                    sheet_name='Sheet1')
                     else:
                         # Converti lista in DataFrame
-                        df = pd.DataFrame(self.filtered_data)
+                        df = pd.DataFrame(data)
                         df.to_excel(filepath, index=False)
 
                 elif filepath.endswith('.csv'):
-                    if HAS_PANDAS and hasattr(self.filtered_data, 'to_csv'):
-                        self.filtered_data.to_csv(filepath, index=False)
+                    if HAS_PANDAS and hasattr(data, 'to_csv'):
+                        export_csv(self.filtered_chunks(), filepath)
                     else:
                         # Fallback CSV
                         import csv
                         with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                            if isinstance(self.filtered_data, list) and self.filtered_data:
-                                writer = csv.DictWriter(f, fieldnames=self.filtered_data[0].keys())
+                            if isinstance(data, list) and data:
+                                writer = csv.DictWriter(
+                                    f, fieldnames=data[0].keys())
                                 writer.writeheader()
-                                writer.writerows(self.filtered_data)
+                                writer.writerows(data)
 
                 elif filepath.endswith('.json'):
-                    if hasattr(self.filtered_data, 'to_json'):
-                        self.filtered_data.to_json(filepath, orient='records', indent=2)
+                    data = self.filtered_data
+                    if hasattr(data, 'to_json'):
+                        data.to_json(filepath, orient='records', indent=2)
                     else:
                         with open(filepath, 'w', encoding='utf-8') as f:
-                            json.dump(self.filtered_data, f, indent=2, ensure_ascii=False)
+                            json.dump(data, f, indent=2, ensure_ascii=False)
 
                 messagebox.showinfo("Successo", f"Dati esportati in:\n{filepath}")
 
@@ -870,31 +1012,33 @@ class ExcelToolsUnified:
 
     def show_statistics(self):
         """Mostra statistiche dei dati"""
-        if self.filtered_data is None:
+        data = self.filtered_data
+        if data is None:
             messagebox.showwarning("Attenzione", "Nessun dato disponibile per le statistiche")
             return
 
         try:
             stats_text = f"📊 Statistiche Dataset\n{'='*30}\n\n"
 
-            row_count = len(self.filtered_data) if hasattr(self.filtered_data, '__len__') else 0
+            row_count = len(data) if hasattr(data, '__len__') else 0
             stats_text += f"Righe totali: {row_count}\n"
 
-            if HAS_PANDAS and hasattr(self.filtered_data, 'columns'):
-                stats_text += f"Colonne: {len(self.filtered_data.columns)}\n"
-                stats_text += f"Memoria utilizzata: {self.filtered_data.memory_usage(deep=True).sum() / 1024:.1f} KB\n\n"
+            if HAS_PANDAS and hasattr(data, 'columns'):
+                stats_text += f"Colonne: {len(data.columns)}\n"
+                memory_kb = data.memory_usage(deep=True).sum() / 1024
+                stats_text += f"Memoria utilizzata: {memory_kb:.1f} KB\n\n"
 
                 # Statistiche per colonne numeriche
-                numeric_cols = self.filtered_data.select_dtypes(include=['number']).columns
+                numeric_cols = data.select_dtypes(include=['number']).columns
                 if len(numeric_cols) > 0:
                     stats_text += "Colonne numeriche:\n"
                     for col in numeric_cols:
-                        mean_val = self.filtered_data[col].mean()
+                        mean_val = data[col].mean()
                         stats_text += f"  {col}: media = {mean_val:.2f}\n"
 
-            elif isinstance(self.filtered_data, list) and self.filtered_data:
-                if isinstance(self.filtered_data[0], dict):
-                    stats_text += f"Colonne: {len(self.filtered_data[0].keys())}\n"
+            elif isinstance(data, list) and data:
+                if isinstance(data[0], dict):
+                    stats_text += f"Colonne: {len(data[0].keys())}\n"
 
             messagebox.showinfo("Statistiche", stats_text)
 
@@ -2095,7 +2239,8 @@ class ExcelToolsUnified:
             try:
                 if HAS_PANDAS and hasattr(self.current_data, 'sort_values'):
                     ascending = order == "asc"
-                    self.filtered_data = self.current_data.sort_values(column, ascending=ascending)
+                    self.filtered_data = RowSelection.sorted_by(
+                        self.current_data, column, ascending)
                     self.update_tree_view()
                     self.update_status(f"📊 Data sorted by {column} ({order})")
                     dialog.destroy()
@@ -2276,8 +2421,44 @@ class ExcelToolsUnified:
             scrollbar.pack(side="right", fill="y")
             listbox.configure(yscrollcommand=scrollbar.set)
 
+            # Ispezione rapida: fogli e righe senza leggere i dati
+            inspections = {}
             for filepath in filepaths:
-                listbox.insert("end", os.path.basename(filepath))
+                label = os.path.basename(filepath)
+                if HAS_PANDAS and filepath.endswith(DATA_EXTENSIONS):
+                    try:
+                        inspections[filepath] = inspect_file(filepath)
+                        label += " — " + self._describe_sheets(
+                            inspections[filepath])
+                    except Exception:
+                        pass
+                listbox.insert("end", label)
+
+            # Fogli/colonne scelti per file (default: primo foglio, tutte
+            # le colonne)
+            selections = {}
+
+            def pick_sheets():
+                selected = listbox.curselection()
+                if not selected:
+                    messagebox.showwarning("Attenzione", "Seleziona un file",
+                                           parent=dialog)
+                    return
+                filepath = filepaths[selected[0]]
+                if filepath not in inspections:
+                    messagebox.showwarning("Attenzione",
+                                           "File non ispezionabile",
+                                           parent=dialog)
+                    return
+                selection = SheetPickerDialog(
+                    dialog, inspections[filepath]).show()
+                if selection:
+                    selections[filepath] = selection
+                    listbox.delete(selected[0])
+                    chosen = ', '.join(map(str, selection))
+                    listbox.insert(selected[0],
+                                   f"{os.path.basename(filepath)} — "
+                                   f"{len(selection)} fogli scelti: {chosen}")
 
             # Pulsanti
             button_frame = ttk.Frame(dialog)
@@ -2287,53 +2468,90 @@ class ExcelToolsUnified:
                 self.update_status("📂 Importazione multipla in corso...")
                 self.progress.start()
                 threading.Thread(target=self._import_multiple_thread,
-                               args=(filepaths,), daemon=True).start()
+                                 args=(filepaths, selections),
+                                 daemon=True).start()
                 dialog.destroy()
 
+            if HAS_PANDAS:
+                ttk.Button(button_frame, text="📑 Fogli/Colonne...",
+                          command=pick_sheets).pack(side="left", padx=5)
             ttk.Button(button_frame, text="📁 Importa Tutti",
                       command=import_all).pack(side="left", padx=5)
             ttk.Button(button_frame, text="❌ Annulla",
                       command=dialog.destroy).pack(side="left", padx=5)
 
-    def _import_multiple_thread(self, filepaths):
-        """Thread per importazione multipla"""
-        try:
-            for filepath in filepaths:
-                filename = os.path.basename(filepath)
+    def _describe_sheets(self, sheets_info: List[Dict[str, Any]]) -> str:
+        """Riepilogo dell'ispezione per la lista file: fogli e righe"""
+        rows = [info['rows'] for info in sheets_info]
+        if None in rows:
+            return f"{len(sheets_info)} fogli"
+        return f"{len(sheets_info)} fogli, {sum(rows):,} righe"
 
-                if filepath.endswith(('.xlsx', '.xls')):
-                    if HAS_PANDAS:
-                        data = pd.read_excel(filepath)
-                    else:
+    def _import_multiple_thread(self, filepaths, selections=None):
+        """Thread per importazione multipla: file o fogli letti in parallelo"""
+        errors = []
+        try:
+            if HAS_PANDAS:
+                filepaths = [
+                    f for f in filepaths if f.endswith(DATA_EXTENSIONS)
+                ]
+                total = len(data_file_jobs(filepaths, selections))
+                results = iter_data_files(
+                    filepaths, max_workers=default_max_workers(),
+                    selections=selections
+                )
+                for done, result in enumerate(results, start=1):
+                    filepath, sheet_name, data, error = result
+                    self.root.after(0, self._multiple_file_done,
+                                    done, total, filepath, sheet_name,
+                                    data, error)
+                    if error is not None:
+                        errors.append(f"{os.path.basename(filepath)}: {error}")
+            else:
+                import csv
+                for filepath in filepaths:
+                    if not filepath.endswith('.csv'):
                         continue
-                elif filepath.endswith('.csv'):
-                    if HAS_PANDAS:
-                        data = pd.read_csv(filepath)
-                    else:
-                        import csv
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            reader = csv.DictReader(f)
-                            data = list(reader)
-                else:
-                    continue
-
-                # Salva nel dizionario dei file importati
-                self.imported_files[filename] = {
-                    'data': data,
-                    'filepath': filepath,
-                    'import_date': pd.Timestamp.now() if HAS_PANDAS else None
-                }
-
-            self.root.after(0, self._multiple_import_complete)
+                    with open(filepath, 'r', encoding='utf-8') as f:
+                        data = list(csv.DictReader(f))
+                    self.root.after(0, self._multiple_file_done,
+                                    0, 0, filepath, None, data, None)
 
         except Exception as e:
-            self.root.after(0, lambda: self.update_status(f"❌ Errore importazione: {e}"))
+            # Importazione interrotta: il riepilogo viene mostrato comunque
+            errors.append(f"Errore importazione: {e}")
+
+        self.root.after(0, self._multiple_import_complete, errors)
+
+    def _multiple_file_done(self, done, total, filepath, sheet_name, data,
+                            error):
+        """Callback per ogni file (o foglio scelto) completato (thread UI)"""
+        filename = os.path.basename(filepath)
+        if sheet_name is not None:
+            filename = f"{filename} [{sheet_name}]"
+        if error is not None:
+            self.update_status(f"⚠️ [{done}/{total}] Errore {filename}")
+            return
 
-    def _multiple_import_complete(self):
+        # Salva nel dizionario dei file importati
+        self.imported_files[filename] = {
+            'data': data,
+            'filepath': filepath,
+            'import_date': pd.Timestamp.now() if HAS_PANDAS else None
+        }
+        if total:
+            self.update_status(f"📂 [{done}/{total}] Importato {filename}")
+
+    def _multiple_import_complete(self, errors=None):
         """Callback per completamento importazione multipla"""
         self.progress.stop()
         count = len(self.imported_files)
         self.update_status(f"✅ Importati {count} file")
+        if errors:
+            messagebox.showwarning(
+                "Importazione Multipla",
+                f"{len(errors)} file non importati:\n" + "\n".join(errors)
+            )
 
         # Mostra dialog di selezione file
         self.show_file_selector()
@@ -2382,7 +2600,7 @@ class ExcelToolsUnified:
         if filename in self.imported_files:
             file_info = self.imported_files[filename]
             self.current_data = file_info['data']
-            self.filtered_data = self.current_data.copy() if HAS_PANDAS and hasattr(self.current_data, 'copy') else self.current_data
+            self.filtered_data = self.current_data
 
             # Aggiorna interfaccia
             self.file_label.config(text=filename, foreground="black")
@@ -2508,7 +2726,7 @@ class ExcelToolsUnified:
                     return
 
             self.current_data = merged_data
-            self.filtered_data = merged_data.copy() if HAS_PANDAS and hasattr(merged_data, 'copy') else merged_data
+            self.filtered_data = merged_data
 
             # Aggiorna interfaccia
             self.file_label.config(text=f"Merge di {len(selected_files)} file", foreground="blue")
@@ -2575,7 +2793,7 @@ class ExcelToolsUnified:
 
     def save_current_view(self):
         """Salva vista corrente"""
-        if self.filtered_data is None:
+        if self.current_data is None:
             messagebox.showwarning("Attenzione", "Nessun dato da salvare")
             return
 
@@ -2589,8 +2807,11 @@ class ExcelToolsUnified:
                         'selected_column': self.column_var.get()
                     },
                     'data_info': {
-                        'row_count': len(self.filtered_data) if hasattr(self.filtered_data, '__len__') else 0,
-                        'columns': list(self.filtered_data.columns) if HAS_PANDAS and hasattr(self.filtered_data, 'columns') else []
+                        'row_count': self.filtered_count(),
+                        'columns': (list(self.current_data.columns)
+                                    if HAS_PANDAS and hasattr(
+                                        self.current_data, 'columns')
+                                    else [])
                     }
                 }
 
@@ -2678,7 +2899,7 @@ class ExcelToolsUnified:
             # Mantieni filtro colonna attuale
             pass
         else:
-            self.filtered_data = self.current_data.copy() if HAS_PANDAS and hasattr(self.current_data, 'copy') else self.current_data
+            self.filtered_data = self.current_data
             self.update_tree_view()
 
         self.update_status("✅ Filtro rapido applicato")
@@ -2688,7 +2909,7 @@ class ExcelToolsUnified:
         self.search_var.set("")
         self.column_var.set('Tutte le colonne')
         if self.current_data is not None:
-            self.filtered_data = self.current_data.copy() if HAS_PANDAS and hasattr(self.current_data, 'copy') else self.current_data
+            self.filtered_data = self.current_data
             self.update_tree_view()
         self.update_status("❌ Filtri rimossi")
 
@@ -2852,14 +3073,14 @@ class ExcelToolsUnified:
         """Applica filtro numerico"""
         try:
             if HAS_PANDAS and hasattr(self.current_data, 'columns'):
-                mask = pd.Series([True] * len(self.current_data))
+                mask = pd.Series(True, index=self.current_data.index)
 
                 if min_val:
                     mask = mask & (self.current_data[column] >= float(min_val))
                 if max_val:
                     mask = mask & (self.current_data[column] <= float(max_val))
 
-                self.filtered_data = self.current_data[mask]
+                self.filtered_data = RowSelection.from_mask(mask)
             else:
                 filtered = []
                 for row in self.current_data:
@@ -2876,7 +3097,7 @@ class ExcelToolsUnified:
                 self.filtered_data = filtered
 
             self.update_tree_view()
-            count = len(self.filtered_data) if hasattr(self.filtered_data, '__len__') else 0
+            count = self.filtered_count()
             self.update_status(f"🔢 Filtro numerico applicato: {count} righe")
 
         except Exception as e:
@@ -2970,7 +3191,8 @@ class ExcelToolsUnified:
 
                 # Applica filtro
                 if HAS_PANDAS and hasattr(self.current_data, 'columns'):
-                    filtered = self.current_data[self.current_data[column].astype(str) == value]
+                    filtered = RowSelection.from_mask(
+                        self.current_data[column].astype(str) == value)
                 else:
                     filtered = [row for row in self.current_data
                               if isinstance(row, dict) and str(row.get(column, "")) == value]
@@ -2978,7 +3200,7 @@ class ExcelToolsUnified:
                 self.filtered_data = filtered
                 self.update_tree_view()
 
-                count = len(filtered) if hasattr(filtered, '__len__') else 0
+                count = self.filtered_count()
                 messagebox.showinfo("Query Risultato", f"Query eseguita. Trovate {count} righe.")
 
         except Exception as e:
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+📂 FOLDER WATCHER - ExcelTools
+==============================
+
+Servizio senza interfaccia che controlla periodicamente una cartella
+(config.ini [WATCHER]) e importa in ExcelDatabaseEnterprise le cartelle
+di lavoro nuove o modificate:
+- un file è importato solo quando dimensione e data di modifica restano
+  invariate per settle_seconds (scrittura completata);
+- i file con la stessa impronta del contenuto già importata vengono saltati
+  (registro nella tabella ingested_files);
+- per ogni file sono registrate nel log durata dell'import e latenza
+  dall'ultima modifica.
+
+Uso: python folder_watcher.py [cartella] [--once]
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import threading
+import time
+import zipfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from excel_database_enterprise_complete import ExcelDatabaseEnterprise
+from settings import load_config
+
+WATCH_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def content_fingerprint(file_path: str) -> str:
+    """SHA-1 dell'intero contenuto: indipendente da nome e data di modifica"""
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FolderWatcher:
+    """
+    Importazione automatica (incrementale) dei file depositati in una
+    cartella
+    """
+
+    def __init__(self, db: ExcelDatabaseEnterprise, watch_dir: str,
+                 poll_interval: float = 5, settle_seconds: float = 10,
+                 incremental: bool = True, key_column: Optional[str] = None,
+                 table_prefix: Optional[str] = None):
+        self.db = db
+        self.watch_dir = watch_dir
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.incremental = incremental
+        self.key_column = key_column or None
+        self.table_prefix = table_prefix or None
+        self.logger = logging.getLogger("FolderWatcher")
+        self._stop = threading.Event()
+        # percorso -> ((dimensione, mtime_ns), istante da cui è stabile)
+        self._pending: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        # percorso -> (dimensione, mtime_ns) già elaborati
+        self._done: Dict[str, Tuple[int, int]] = {}
+        self.setup_ledger()
+
+    @classmethod
+    def from_config(cls, config=None,
+                    watch_dir: Optional[str] = None) -> "FolderWatcher":
+        """Watcher con i parametri di config.ini [WATCHER]"""
+        config = config or load_config()
+        section = "WATCHER"
+        db = ExcelDatabaseEnterprise(
+            config.get(section, "db_path",
+                       fallback="exceltools_enterprise.db"))
+        return cls(
+            db,
+            watch_dir or config.get(section, "watch_dir",
+                                    fallback="incoming"),
+            poll_interval=config.getfloat(section, "poll_interval",
+                                          fallback=5),
+            settle_seconds=config.getfloat(section, "settle_seconds",
+                                           fallback=10),
+            incremental=config.getboolean(section, "incremental",
+                                          fallback=True),
+            key_column=config.get(section, "key_column", fallback=None),
+            table_prefix=config.get(section, "table_prefix", fallback=None),
+        )
+
+    def setup_ledger(self):
+        """Registro dei file importati, nello stesso database delle tabelle"""
+        with self.db.pool.write() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ingested_files (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_path TEXT,
+                    fingerprint TEXT UNIQUE,
+                    ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    tables TEXT,
+                    total_rows INTEGER,
+                    seconds REAL
+                )
+            """)
+
+    def is_ingested(self, fingerprint: str) -> bool:
+        row = self.db.pool.reader().execute(
+            "SELECT 1 FROM ingested_files WHERE fingerprint = ?",
+            (fingerprint,)).fetchone()
+        return row is not None
+
+    def record_ingestion(self, file_path: str, fingerprint: str,
+                         result: Dict[str, Any], seconds: float):
+        with self.db.pool.write() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO ingested_files
+                (file_path, fingerprint, tables, total_rows, seconds)
+                VALUES (?, ?, ?, ?, ?)
+            """, (file_path, fingerprint,
+                  ", ".join(t['name'] for t in result['tables_created']),
+                  result['total_rows'], seconds))
+
+    def scan(self) -> List[str]:
+        """
+        File pronti: estensione supportata e invariati da almeno
+        settle_seconds
+        """
+        now = time.monotonic()
+        ready = []
+        seen = set()
+        with os.scandir(self.watch_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if (not entry.is_file() or name.startswith(('~$', '.'))
+                        or not name.lower().endswith(WATCH_EXTENSIONS)):
+                    continue
+                stat = entry.stat()
+                signature = (stat.st_size, stat.st_mtime_ns)
+                seen.add(entry.path)
+                if self._done.get(entry.path) == signature:
+                    continue
+                previous = self._pending.get(entry.path)
+                if previous is None or previous[0] != signature:
+                    self._pending[entry.path] = (signature, now)
+                elif now - previous[1] >= self.settle_seconds:
+                    ready.append(entry.path)
+        for path in list(self._pending):
+            if path not in seen:
+                del self._pending[path]
+        return sorted(ready)
+
+    def ingest(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Importa un file stabile; None se saltato o ancora incompleto"""
+        start = time.perf_counter()
+        stat = os.stat(file_path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        filename = os.path.basename(file_path)
+
+        if (not file_path.lower().endswith('.xls')
+                and not zipfile.is_zipfile(file_path)):
+            # ZIP incompleto o non valido: riconsiderato alla prossima modifica
+            self.logger.warning(f"{filename}: file incompleto o non valido, "
+                                f"in attesa di modifiche")
+            self._done[file_path] = signature
+            self._pending.pop(file_path, None)
+            return None
+
+        fingerprint = content_fingerprint(file_path)
+        if self.is_ingested(fingerprint):
+            self._done[file_path] = signature
+            self._pending.pop(file_path, None)
+            self.logger.info(
+                f"{filename}: già importato (stessa impronta), saltato")
+            return None
+
+        result = self.db.import_excel_comprehensive(
+            file_path, table_prefix=self.table_prefix,
+            incremental=self.incremental, key_column=self.key_column)
+        seconds = time.perf_counter() - start
+
+        stat = os.stat(file_path)
+        if (stat.st_size, stat.st_mtime_ns) != signature:
+            # Modificato durante l'import: verrà rielaborato
+            self.logger.warning(
+                f"{filename}: modificato durante l'import, verrà reimportato")
+            return result
+
+        self._done[file_path] = signature
+        self._pending.pop(file_path, None)
+        latency = time.time() - stat.st_mtime
+        if result['success']:
+            self.record_ingestion(file_path, fingerprint, result, seconds)
+            self.logger.info(
+                f"{filename}: {len(result['tables_created'])} tabelle, "
+                f"{result['total_rows']:,} righe in {seconds:.2f}s "
+                f"(latenza dall'ultima modifica {latency:.1f}s)")
+        else:
+            self.logger.error(f"{filename}: import fallito in {seconds:.2f}s: "
+                              f"{'; '.join(result['errors'])}")
+        return result
+
+    def run_once(self) -> List[Dict[str, Any]]:
+        """Un ciclo: scansione e import dei file pronti"""
+        results = []
+        for file_path in self.scan():
+            try:
+                result = self.ingest(file_path)
+            except Exception as e:
+                self.logger.error(f"{os.path.basename(file_path)}: {e}")
+                continue
+            if result is not None:
+                results.append(result)
+        return results
+
+    def run(self):
+        """Ciclo di polling fino a stop()"""
+        os.makedirs(self.watch_dir, exist_ok=True)
+        self.logger.info(
+            f"Controllo di '{os.path.abspath(self.watch_dir)}' ogni "
+            f"{self.poll_interval:g}s (stabilità {self.settle_seconds:g}s)")
+        self._stop.clear()
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.poll_interval)
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Importazione automatica da cartella")
+    parser.add_argument("watch_dir", nargs="?",
+                        help="cartella da controllare (default: config.ini)")
+    parser.add_argument("--once", action="store_true",
+                        help="importa i file presenti e termina")
+    args = parser.parse_args()
+
+    watcher = FolderWatcher.from_config(watch_dir=args.watch_dir)
+    if args.once:
+        # Nessuna attesa di stabilità: i file sono già presenti
+        watcher.settle_seconds = 0
+        watcher.scan()
+        watcher.run_once()
+        return
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.stop()
+
+
+if __name__ == "__main__":
+    main()
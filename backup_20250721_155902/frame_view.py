@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+🪟 FRAME VIEW - ExcelTools
+==========================
+
+Dati caricati tenuti in un'unica copia: con Copy-on-Write i buffer delle
+colonne non vengono mai modificati sul posto, quindi le viste filtrate o
+ordinate sono solo vettori di posizioni sulle righe del DataFrame
+sorgente, materializzati quando servono.
+"""
+
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def enable_copy_on_write():
+    """
+    Buffer condivisi immutabili: Copy-on-Write (sempre attivo da pandas 3)
+    """
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option('mode.copy_on_write', True)
+
+
+class RowSelection:
+    """
+    Posizioni delle righe visibili di un DataFrame sorgente (None = tutte,
+    in ordine)
+    """
+
+    __slots__ = ('positions',)
+
+    def __init__(self, positions: Optional[np.ndarray] = None):
+        if positions is not None:
+            positions = np.asarray(positions)
+            # int32 basta fino a 2 miliardi di righe: metà memoria
+            if len(positions) == 0 or positions.max() < np.iinfo(np.int32).max:
+                positions = positions.astype(np.int32, copy=False)
+            positions.flags.writeable = False
+        self.positions = positions
+
+    @classmethod
+    def from_mask(cls, mask) -> "RowSelection":
+        """
+        Righe per cui la maschera booleana (allineata alla sorgente) è vera
+        """
+        return cls(np.flatnonzero(np.asarray(mask, dtype=bool)))
+
+    @classmethod
+    def sorted_by(cls, base: pd.DataFrame, column,
+                  ascending: bool = True) -> "RowSelection":
+        """
+        Ordinamento per colonna come sort_values (stabile, valori mancanti
+        in fondo)
+        """
+        order = base[column].reset_index(drop=True).sort_values(
+            ascending=ascending, kind='stable')
+        return cls(order.index.to_numpy())
+
+    def count(self, base: pd.DataFrame) -> int:
+        return len(base) if self.positions is None else len(self.positions)
+
+    def frame(self, base: pd.DataFrame) -> pd.DataFrame:
+        """
+        Vista materializzata (la sorgente stessa se sono selezionate tutte
+        le righe)
+        """
+        return base if self.positions is None else base.take(self.positions)
+
+    def head(self, base: pd.DataFrame, rows: int) -> pd.DataFrame:
+        """Prime righe della vista senza materializzarla tutta"""
+        if self.positions is None:
+            return base.iloc[:rows]
+        return base.take(self.positions[:rows])
+
+    def chunks(self, base: pd.DataFrame, rows: int) -> Iterator[pd.DataFrame]:
+        """
+        Vista a blocchi di rows righe (esportazione senza materializzarla
+        tutta)
+        """
+        total = self.count(base)
+        if total == 0:
+            yield base.iloc[:0]
+            return
+        for start in range(0, total, rows):
+            if self.positions is None:
+                yield base.iloc[start:start + rows]
+            else:
+                yield base.take(self.positions[start:start + rows])
+
+    @property
+    def nbytes(self) -> int:
+        return 0 if self.positions is None else self.positions.nbytes
+
+
+class FilteredView:
+    """
+    Attributo di istanza (es. filtered_data) definito come RowSelection su un
+    altro attributo (source, es. current_data). Assegnando la sorgente stessa
+    o una RowSelection resta in memoria solo il vettore delle posizioni;
+    altri valori (ad es. liste senza pandas) sono conservati nel
+    MemoryGovernor dell'oggetto come per GovernedAttribute.
+    """
+
+    def __init__(self, source: str = 'current_data'):
+        self.source = source
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.key = f'_{name}_selection'
+
+    def selection(self, obj) -> Optional[RowSelection]:
+        return obj.__dict__.get(self.key)
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        selection = self.selection(obj)
+        if selection is None:
+            return obj.memory_governor.get(self.name)
+        base = getattr(obj, self.source)
+        return None if base is None else selection.frame(base)
+
+    def __set__(self, obj, value):
+        if isinstance(value, RowSelection):
+            selection = value
+        elif value is not None and value is getattr(obj, self.source):
+            selection = RowSelection()
+        else:
+            selection = None
+        obj.__dict__[self.key] = selection
+        obj.memory_governor.put(self.name,
+                                value if selection is None else None)
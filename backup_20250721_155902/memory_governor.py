@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+🧮 MEMORY GOVERNOR - ExcelTools
+===============================
+
+Scarico su disco dei DataFrame oltre memory_limit_mb: riesporta
+modules/memory_governor.py.
+"""
+
+import shared_modules  # noqa: F401
+from modules.memory_governor import (  # noqa: F401
+    DEFAULT_SPILL_DIR, GovernedAttribute, GovernedDict, MemoryGovernor
+)
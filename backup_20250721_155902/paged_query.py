@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+📄 PAGED QUERY - ExcelTools
+===========================
+
+Risultati di query letti a pagine da un cursore aperto su una connessione
+dedicata: la prima pagina è disponibile subito, le successive vengono
+lette su richiesta (scorrimento della tabella) e il numero totale di righe
+è calcolato solo quando serve. Un SELECT * su milioni di righe non viene
+mai materializzato per intero.
+"""
+
+import threading
+from typing import Any, Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+from connection_pool import ConnectionPool
+from stream_export import cursor_chunks
+
+PAGE_SIZE = 1000
+
+
+class PagedResult:
+    """Cursore di una query con le righe lette finora"""
+
+    def __init__(self, pool: ConnectionPool, sql: str,
+                 params: Sequence[Any] = (), page_size: int = PAGE_SIZE):
+        self.pool = pool
+        self.sql = sql
+        self.params = tuple(params)
+        self.page_size = page_size
+        self.rows: List[tuple] = []
+        self.exhausted = False  # nessuna altra pagina leggibile
+        self.complete = False  # cursore letto fino in fondo
+        self._total = None
+        self._lock = threading.Lock()
+
+        # Connessione propria: il cursore resta aperto tra una pagina e l'altra
+        self._conn = pool.open_reader()
+        try:
+            self._cursor = self._conn.execute(sql, self.params)
+        except Exception:
+            self._conn.close()
+            raise
+        description = self._cursor.description
+        self.columns = [d[0] for d in description] if description else []
+        self.fetch_next()
+
+    @property
+    def fetched(self) -> int:
+        return len(self.rows)
+
+    @property
+    def total(self) -> Optional[int]:
+        """Totale se già noto (senza eseguire COUNT)"""
+        return self._total
+
+    def fetch_next(self) -> pd.DataFrame:
+        """Legge la pagina successiva (vuota se il cursore è esaurito)"""
+        with self._lock:
+            if self.exhausted:
+                return pd.DataFrame(columns=self.columns)
+            page = (self._cursor.fetchmany(self.page_size)
+                    if self.columns else [])
+            self.rows.extend(page)
+            if len(page) < self.page_size:
+                self._finish()
+        return pd.DataFrame.from_records(page, columns=self.columns)
+
+    def page(self, number: int) -> pd.DataFrame:
+        """Pagina number (da 0), leggendo dal cursore le pagine mancanti"""
+        end = (number + 1) * self.page_size
+        while len(self.rows) < end and not self.exhausted:
+            self.fetch_next()
+        start = number * self.page_size
+        return pd.DataFrame.from_records(self.rows[start:end],
+                                         columns=self.columns)
+
+    def total_count(self) -> int:
+        """
+        Numero totale di righe: COUNT(*) eseguito solo alla prima richiesta
+        """
+        if self._total is None:
+            if self.complete:
+                self._total = len(self.rows)
+            else:
+                inner = self.sql.strip().rstrip(';')
+                count_sql = f"SELECT COUNT(*) FROM ({inner})"
+                self._total = self.pool.reader().execute(
+                    count_sql, self.params).fetchone()[0]
+        return self._total
+
+    def frame(self) -> pd.DataFrame:
+        """Righe lette finora"""
+        return pd.DataFrame.from_records(self.rows, columns=self.columns)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Risultato completo (legge tutte le pagine rimanenti)"""
+        while not self.exhausted:
+            self.fetch_next()
+        return self.frame()
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """
+        Risultato completo a blocchi, da un nuovo cursore: le righe non
+        vengono accumulate in rows (esportazione di query grandi).
+        """
+        conn = self.pool.open_reader()
+        try:
+            yield from cursor_chunks(conn.execute(self.sql, self.params),
+                                     chunk_size)
+        finally:
+            conn.close()
+
+    def _finish(self):
+        self.exhausted = self.complete = True
+        self._total = len(self.rows)
+        self._cursor.close()
+        self._conn.close()
+
+    def close(self):
+        """Rilascia il cursore senza leggere le pagine rimanenti"""
+        with self._lock:
+            if not self.exhausted:
+                self.exhausted = True
+                self._cursor.close()
+                self._conn.close()
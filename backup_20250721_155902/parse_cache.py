@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+🗄️ PARSE CACHE - ExcelTools
+===========================
+
+Cache su disco dei file Excel/CSV già letti: riesporta
+modules/parse_cache.py.
+"""
+
+import shared_modules  # noqa: F401
+from modules.parse_cache import (  # noqa: F401
+    DEFAULT_CACHE_DIR, ParseCache, file_fingerprint, read_frame, write_frame
+)
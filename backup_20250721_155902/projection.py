@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+🎯 PROJECTION - ExcelTools
+==========================
+
+Lettura dei file con le sole colonne selezionate in una vista: le colonne
+escluse non vengono mai analizzate né materializzate (usecols per i CSV,
+celle saltate durante la lettura XML per gli .xlsx/.xlsm).
+"""
+
+import xml.etree.ElementTree as ET
+import zipfile
+from typing import List, Optional
+
+import pandas as pd
+
+from csv_sniffer import read_csv_sniffed
+from workbook_inspector import XLSX_EXTENSIONS, read_xlsx_columns
+
+
+def read_columns(file_path: str, columns: Optional[List[str]] = None,
+                 sheet_name=None) -> pd.DataFrame:
+    """Legge il file limitandosi a columns (tutte se None)"""
+    lower = file_path.lower()
+    if lower.endswith('.csv'):
+        return read_csv_sniffed(file_path, usecols=columns)
+    if columns and lower.endswith(XLSX_EXTENSIONS):
+        try:
+            return read_xlsx_columns(file_path, columns, sheet_name)
+        except (KeyError, zipfile.BadZipFile, ET.ParseError):
+            pass  # Struttura non standard: lettura tramite pandas
+    return pd.read_excel(file_path, sheet_name=sheet_name or 0,
+                         usecols=columns)
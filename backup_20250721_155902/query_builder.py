@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+🧱 QUERY BUILDER - ExcelTools
+=============================
+
+SELECT costruiti dalle specifiche di filtro dei manager ({'column',
+'operator', 'value'}) con i valori passati come parametri '?': il testo
+SQL dipende solo da tabella, colonne e operatori, quindi filtri con valori
+diversi riusano la stessa istruzione preparata (cached_statements del
+pool) e gli apostrofi nei valori non richiedono quoting.
+
+Colonne, tabella e ORDER BY sono sempre identificatori tra [ ]: per
+l'ordinamento decrescente si passa (colonna, 'DESC'). LIKE cerca il
+valore come testo contenuto (%valore%, con % e _ alla lettera);
+LIKE_PATTERN usa il valore come pattern LIKE così com'è.
+"""
+
+import math
+import numbers
+from typing import (Any, Dict, List, NamedTuple, Optional, Sequence, Tuple,
+                    Union)
+
+COMPARISON_OPERATORS = {'=', '==', '!=', '<>', '<', '>', '<=', '>='}
+LIKE_OPERATORS = {'LIKE', 'NOT LIKE'}
+# Pattern scritto dall'utente (jolly % e _ attivi)
+PATTERN_OPERATORS = {'LIKE_PATTERN': 'LIKE', 'NOT LIKE_PATTERN': 'NOT LIKE'}
+LIST_OPERATORS = {'IN', 'NOT IN'}
+NULL_OPERATORS = {'IS NULL', 'IS NOT NULL'}
+LOGIC_OPERATORS = {'AND', 'OR'}
+ORDER_DIRECTIONS = {'ASC', 'DESC'}
+
+LIKE_ESCAPE = '\\'
+
+# Colonna, oppure (colonna, 'ASC' | 'DESC')
+OrderBy = Union[str, Tuple[str, str]]
+
+
+class BuiltQuery(NamedTuple):
+    """Testo SQL con segnaposto '?' e valori nello stesso ordine"""
+    sql: str
+    params: Tuple[Any, ...]
+
+
+def quote_identifier(name: Any) -> str:
+    """[nome] come nel resto del codice; "nome" se contiene ']'"""
+    name = str(name)
+    if ']' in name:
+        return '"' + name.replace('"', '""') + '"'
+    return f"[{name}]"
+
+
+def escape_like(value: Any) -> str:
+    """Testo cercato alla lettera: % e _ nel valore non fanno da jolly"""
+    text = str(value)
+    for char in (LIKE_ESCAPE, '%', '_'):
+        text = text.replace(char, LIKE_ESCAPE + char)
+    return text
+
+
+def list_slots(count: int) -> int:
+    """
+    Segnaposto per IN arrotondati alla potenza di 2 successiva: liste di
+    lunghezza simile condividono la stessa istruzione preparata.
+    """
+    slots = 1
+    while slots < count:
+        slots *= 2
+    return slots
+
+
+def filter_condition(spec: Dict[str, Any]
+                     ) -> Tuple[Optional[str], List[Any]]:
+    """
+    Condizione SQL e parametri di un filtro (None se il filtro non si
+    applica)
+    """
+    column = quote_identifier(spec['column'])
+    operator = " ".join(str(spec.get('operator', '=')).upper().split())
+    value = spec.get('value')
+
+    if operator in NULL_OPERATORS:
+        return f"{column} {operator}", []
+    if operator in LIKE_OPERATORS:
+        return (f"{column} {operator} ? ESCAPE '{LIKE_ESCAPE}'",
+                [f"%{escape_like(value)}%"])
+    if operator in PATTERN_OPERATORS:
+        return f"{column} {PATTERN_OPERATORS[operator]} ?", [value]
+    if operator in LIST_OPERATORS:
+        if isinstance(value, str):
+            # Valori scritti nella casella di testo: "a, b, c"
+            value = [item.strip() for item in value.split(',') if item.strip()]
+        if not isinstance(value, (list, tuple, set)):
+            return None, []
+        values = list(value)
+        if not values:
+            # Lista vuota: IN non trova nulla, NOT IN non esclude nulla
+            return ("0" if operator == 'IN' else "1"), []
+        # Valori ripetuti per riempire i segnaposto: il risultato non cambia
+        values += [values[-1]] * (list_slots(len(values)) - len(values))
+        return f"{column} {operator} ({', '.join('?' * len(values))})", values
+    if operator in COMPARISON_OPERATORS:
+        return f"{column} {operator} ?", [value]
+    raise ValueError(f"Operatore non supportato: {operator}")
+
+
+def where_clause(filters: Optional[Sequence[Dict[str, Any]]]
+                 ) -> Tuple[str, List[Any]]:
+    """
+    WHERE (senza la parola chiave) e parametri. I filtri sono uniti in AND;
+    con 'logic': 'OR' in un filtro le condizioni sono combinate da sinistra
+    a destra: ((f1) OR (f2)) AND (f3).
+    """
+    conditions, params = [], []
+    for spec in filters or []:
+        condition, values = filter_condition(spec)
+        if condition is None:
+            continue
+        logic = str(spec.get('logic', 'AND')).upper()
+        if logic not in LOGIC_OPERATORS:
+            raise ValueError(f"Operatore logico non supportato: {logic}")
+        conditions.append((logic, condition))
+        params.extend(values)
+
+    if not conditions:
+        return "", []
+    if all(logic == 'AND' for logic, _ in conditions[1:]):
+        return " AND ".join(condition for _, condition in conditions), params
+    combined = conditions[0][1]
+    for logic, condition in conditions[1:]:
+        combined = f"({combined}) {logic} ({condition})"
+    return combined, params
+
+
+def order_clause(order_by: OrderBy) -> str:
+    """ORDER BY (senza la parola chiave): colonna e direzione facoltativa"""
+    if isinstance(order_by, (tuple, list)):
+        column, direction = order_by
+        direction = str(direction).upper()
+        if direction not in ORDER_DIRECTIONS:
+            raise ValueError(
+                f"Direzione di ordinamento non supportata: {direction}")
+        return f"{quote_identifier(column)} {direction}"
+    return quote_identifier(order_by)
+
+
+def build_select(table_name: str, columns: Optional[Sequence[str]] = None,
+                 filters: Optional[Sequence[Dict[str, Any]]] = None,
+                 order_by: Optional[OrderBy] = None,
+                 limit: Optional[int] = None) -> BuiltQuery:
+    """SELECT parametrizzato: anche LIMIT è un parametro"""
+    cols = (", ".join(quote_identifier(col) for col in columns)
+            if columns else "*")
+    sql = f"SELECT {cols} FROM {quote_identifier(table_name)}"
+
+    where, params = where_clause(filters)
+    if where:
+        sql += f" WHERE {where}"
+
+    if order_by:
+        sql += f" ORDER BY {order_clause(order_by)}"
+
+    if limit and int(limit) > 0:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+
+    return BuiltQuery(sql, tuple(params))
+
+
+def sql_literal(value: Any) -> str:
+    """Valore come letterale SQLite (stringhe tra apici, NULL, X'..')"""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, numbers.Integral):
+        return str(int(value))
+    if isinstance(value, numbers.Real):
+        value = float(value)
+        if math.isnan(value):
+            return "NULL"
+        if math.isinf(value):
+            return "9e999" if value > 0 else "-9e999"
+        return repr(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"X'{bytes(value).hex()}'"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def inline_params(query: BuiltQuery) -> str:
+    """
+    Testo SQL con i parametri scritti come letterali, per l'editor e le
+    query salvate: si esegue senza parametri anche dopo una modifica.
+    I '?' dentro identificatori e stringhe restano invariati.
+    """
+    params = iter(query.params)
+    parts = []
+    closing = None
+    for char in query.sql:
+        if closing is not None:
+            if char == closing:
+                closing = None
+        elif char in ("'", '"'):
+            # Apici raddoppiati: chiusura e riapertura, stesso risultato
+            closing = char
+        elif char == '[':
+            closing = ']'
+        elif char == '?':
+            try:
+                char = sql_literal(next(params))
+            except StopIteration:
+                raise ValueError("Parametri insufficienti per la query")
+        parts.append(char)
+    if next(params, parts) is not parts:
+        raise ValueError("Parametri in eccesso per la query")
+    return "".join(parts)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+⏱️ QUERY RUNNER - ExcelTools
+============================
+
+Esecuzione asincrona e annullabile delle query SQL: ogni query è un job
+con id, eseguito in un thread su una connessione del pool. Il progress
+handler di SQLite riporta tempo trascorso e righe lette, interrompe la
+query allo scadere del timeout e risponde all'annullamento; le righe
+lette si fermano al limite configurato (config.ini [DATABASE]).
+"""
+
+import itertools
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from connection_pool import ConnectionPool
+from settings import load_config
+
+try:
+    import pandas as pd
+    HAS_PANDAS = True
+except ImportError:
+    HAS_PANDAS = False
+
+# Istruzioni della VM SQLite tra due chiamate del progress handler
+PROGRESS_OPCODES = 10000
+FETCH_BATCH = 5000
+
+
+class QueryJob:
+    """Stato di una query: running, done, cancelled, timeout o error"""
+
+    def __init__(self, job_id: int, sql: str, params: Sequence[Any] = ()):
+        self.id = job_id
+        self.sql = sql
+        self.params = tuple(params)
+        self.status = "running"
+        self.started = time.monotonic()
+        self.finished = None
+        self.rows = 0
+        self.truncated = False
+        self.result = None
+        self.error = None
+        self.conn = None
+        self.cancel_requested = threading.Event()
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def running(self) -> bool:
+        return self.status == "running"
+
+
+class QueryRunner:
+    """
+    Esegue query in background con timeout, limite di righe e annullamento
+    """
+
+    def __init__(self, pool: ConnectionPool, timeout_seconds: float = 60,
+                 max_rows: int = 100000, progress_interval: float = 0.25):
+        self.pool = pool
+        self.timeout_seconds = timeout_seconds
+        self.max_rows = max_rows
+        self.progress_interval = progress_interval
+        self.jobs: Dict[int, QueryJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, pool: ConnectionPool, config=None) -> "QueryRunner":
+        """Runner con timeout e limite di righe di config.ini [DATABASE]"""
+        config = config or load_config()
+        return cls(
+            pool,
+            timeout_seconds=config.getfloat(
+                "DATABASE", "query_timeout_seconds", fallback=60),
+            max_rows=config.getint("DATABASE", "query_max_rows",
+                                   fallback=100000),
+        )
+
+    def submit(self, sql: str, params: Sequence[Any] = (),
+               on_progress: Optional[Callable[[QueryJob], Any]] = None,
+               on_done: Optional[Callable[[QueryJob], Any]] = None
+               ) -> QueryJob:
+        """
+        Avvia la query (params per i segnaposto '?') e restituisce subito
+        il job. on_progress e on_done sono chiamati dal thread della query
+        (con la GUI usare root.after).
+        """
+        job = QueryJob(next(self._ids), sql, params)
+        with self._lock:
+            self.jobs[job.id] = job
+        threading.Thread(target=self._run, args=(job, on_progress, on_done),
+                         name=f"query-{job.id}", daemon=True).start()
+        return job
+
+    def cancel(self, job_id: int) -> bool:
+        """Annulla una query in corso interrompendo la sua connessione"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or not job.running:
+                return False
+            job.cancel_requested.set()
+            if job.conn is not None:
+                job.conn.interrupt()
+        return True
+
+    def _run(self, job: QueryJob, on_progress, on_done):
+        conn = self.pool.reader()
+        last_report = [job.started]
+
+        def progress():
+            # Valore diverso da zero: SQLite interrompe la query
+            if (job.cancel_requested.is_set()
+                    or job.elapsed > self.timeout_seconds):
+                return 1
+            now = time.monotonic()
+            if (on_progress is not None
+                    and now - last_report[0] >= self.progress_interval):
+                last_report[0] = now
+                on_progress(job)
+            return 0
+
+        with self._lock:
+            job.conn = conn
+        conn.set_progress_handler(progress, PROGRESS_OPCODES)
+        try:
+            cursor = conn.execute(job.sql, job.params)
+            columns = ([d[0] for d in cursor.description]
+                       if cursor.description else [])
+            rows = []
+            while len(rows) < self.max_rows:
+                batch = cursor.fetchmany(
+                    min(FETCH_BATCH, self.max_rows - len(rows)))
+                if not batch:
+                    break
+                rows.extend(batch)
+                job.rows = len(rows)
+            else:
+                job.truncated = cursor.fetchone() is not None
+            cursor.close()
+            job.result = (pd.DataFrame.from_records(rows, columns=columns)
+                          if HAS_PANDAS else rows)
+            job.status = "done"
+        except sqlite3.OperationalError as e:
+            if job.cancel_requested.is_set():
+                job.status = "cancelled"
+            elif job.elapsed > self.timeout_seconds:
+                job.status = "timeout"
+            else:
+                job.status, job.error = "error", str(e)
+        except Exception as e:
+            job.status, job.error = "error", str(e)
+        finally:
+            conn.set_progress_handler(None, 0)
+            with self._lock:
+                # Dopo questo punto cancel() non tocca più la connessione
+                job.conn = None
+                job.finished = time.monotonic()
+                self.jobs.pop(job.id, None)
+        if on_done is not None:
+            on_done(job)
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+⚙️ SETTINGS - ExcelTools
+========================
+
+Lettura centralizzata del config.ini di questa cartella (chunk_size,
+[PERFORMANCE], [DATABASE], [UI]) con modules/settings.py.
+"""
+
+import configparser
+import os
+
+import shared_modules  # noqa: F401
+from modules import settings
+
+CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "config.ini"
+)
+
+
+def load_config(path: str = None) -> configparser.ConfigParser:
+    """Legge config.ini; se manca il parser è vuoto e valgono i fallback"""
+    return settings.load_config(path or CONFIG_PATH)
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+🔗 SHARED MODULES - ExcelTools
+==============================
+
+Rende importabile il package modules/ della cartella principale, che
+contiene l'unica implementazione di dtype_optimizer, parse_cache,
+memory_governor, stream_export e load_config. I moduli omonimi di questa
+cartella la riesportano per gli script che li importano senza package.
+"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# In coda: i moduli di questa cartella restano prioritari
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
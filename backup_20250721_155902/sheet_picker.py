@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+📑 SHEET PICKER - ExcelTools
+============================
+
+Dialog modale per scegliere fogli e colonne da importare a partire
+dall'ispezione rapida del file (workbook_inspector.inspect_file),
+prima di leggere i dati.
+"""
+
+import tkinter as tk
+from tkinter import messagebox, ttk
+from typing import Any, Dict, List, Optional
+
+
+class SheetPickerDialog:
+    """
+    Scelta di fogli e colonne: show() restituisce
+    {foglio: colonne o None (tutte)} o None se annullato
+    """
+
+    def __init__(self, parent, sheets_info: List[Dict[str, Any]],
+                 title: str = "📑 Seleziona Fogli e Colonne"):
+        self.sheets_info = {info['name']: info for info in sheets_info}
+        self.selected_columns = {
+            info['name']: set(info['headers']) for info in sheets_info
+        }
+        self.current_sheet = None
+        self.result = None
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title(title)
+        self.dialog.geometry("700x500")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+
+        ttk.Label(self.dialog, text="Fogli (selezione multipla):",
+                  font=("Arial", 10, "bold")).pack(anchor="w", padx=10,
+                                                   pady=(10, 0))
+
+        self.sheet_tree = ttk.Treeview(
+            self.dialog, columns=("rows", "columns", "range"),
+            height=6, selectmode="extended"
+        )
+        self.sheet_tree.heading("#0", text="Foglio")
+        self.sheet_tree.heading("rows", text="Righe")
+        self.sheet_tree.heading("columns", text="Colonne")
+        self.sheet_tree.heading("range", text="Intervallo")
+        for info in sheets_info:
+            rows = f"{info['rows']:,}" if info['rows'] is not None else "?"
+            self.sheet_tree.insert(
+                "", "end", iid=info['name'], text=info['name'],
+                values=(rows, info['columns'], info['dimension'] or "")
+            )
+        self.sheet_tree.selection_set(list(self.sheets_info))
+        self.sheet_tree.pack(fill="x", padx=10, pady=5)
+        self.sheet_tree.bind("<<TreeviewSelect>>", self.on_sheet_select)
+
+        self.columns_label = ttk.Label(self.dialog, text="Colonne:",
+                                       font=("Arial", 10, "bold"))
+        self.columns_label.pack(anchor="w", padx=10)
+
+        frame = ttk.Frame(self.dialog)
+        frame.pack(fill="both", expand=True, padx=10, pady=5)
+        self.columns_listbox = tk.Listbox(frame, selectmode="multiple",
+                                          exportselection=False)
+        self.columns_listbox.pack(side="left", fill="both", expand=True)
+        scrollbar = ttk.Scrollbar(frame, orient="vertical",
+                                  command=self.columns_listbox.yview)
+        scrollbar.pack(side="right", fill="y")
+        self.columns_listbox.configure(yscrollcommand=scrollbar.set)
+        self.columns_listbox.bind("<<ListboxSelect>>", self.on_columns_change)
+
+        button_frame = ttk.Frame(self.dialog)
+        button_frame.pack(pady=10)
+        buttons = [
+            ("☑️ Tutte", lambda: self.select_all(True)),
+            ("☐ Nessuna", lambda: self.select_all(False)),
+            ("✅ Importa", self.confirm),
+            ("❌ Annulla", self.dialog.destroy),
+        ]
+        for text, command in buttons:
+            ttk.Button(button_frame, text=text,
+                       command=command).pack(side="left", padx=5)
+
+        if sheets_info:
+            self.show_columns(sheets_info[0]['name'])
+
+    def on_sheet_select(self, event=None):
+        """Mostra le colonne del foglio attivo"""
+        focus = self.sheet_tree.focus()
+        if focus and focus != self.current_sheet:
+            self.show_columns(focus)
+
+    def show_columns(self, sheet_name: str):
+        info = self.sheets_info[sheet_name]
+        self.current_sheet = sheet_name
+        self.columns_label.config(
+            text=f"Colonne di '{sheet_name}' (tipo stimato dalle prime righe):"
+        )
+        self.columns_listbox.delete(0, "end")
+        for i, header in enumerate(info['headers']):
+            dtype = info['dtypes'].get(header, '')
+            self.columns_listbox.insert("end", f"{header}  ({dtype})")
+            if header in self.selected_columns[sheet_name]:
+                self.columns_listbox.selection_set(i)
+
+    def on_columns_change(self, event=None):
+        """Memorizza le colonne scelte per il foglio attivo"""
+        if self.current_sheet is None:
+            return
+        headers = self.sheets_info[self.current_sheet]['headers']
+        self.selected_columns[self.current_sheet] = {
+            headers[i] for i in self.columns_listbox.curselection()
+        }
+
+    def select_all(self, selected: bool):
+        if selected:
+            self.columns_listbox.selection_set(0, "end")
+        else:
+            self.columns_listbox.selection_clear(0, "end")
+        self.on_columns_change()
+
+    def confirm(self):
+        result = {}
+        for sheet_name in self.sheet_tree.selection():
+            headers = self.sheets_info[sheet_name]['headers']
+            selected = self.selected_columns[sheet_name]
+            chosen = [header for header in headers if header in selected]
+            if not chosen:
+                messagebox.showwarning(
+                    "Attenzione", f"Nessuna colonna scelta per '{sheet_name}'",
+                    parent=self.dialog
+                )
+                return
+            # None = tutte le colonne
+            result[sheet_name] = (
+                None if len(chosen) == len(headers) else chosen
+            )
+        if not result:
+            messagebox.showwarning("Attenzione", "Seleziona almeno un foglio",
+                                   parent=self.dialog)
+            return
+        self.result = result
+        self.dialog.destroy()
+
+    def show(self) -> Optional[Dict[str, Optional[List[str]]]]:
+        """Attende la chiusura del dialog e restituisce la scelta"""
+        self.dialog.wait_window()
+        return self.result
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+📑 SHEET READER - ExcelTools
+============================
+
+Lettura multi-foglio di una cartella Excel con un'unica apertura del file:
+i fogli vengono letti dall'ExcelFile già aperto oppure, se più di uno,
+in parallelo in un pool di processi (ogni processo apre il file una volta).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from projection import read_columns
+from settings import load_config
+
+# ExcelFile aperto una sola volta in ciascun processo del pool
+_worker_excel_file = None
+_worker_file_path = None
+
+# (foglio, DataFrame, errore)
+SheetResult = Tuple[object, Optional[pd.DataFrame], Optional[Exception]]
+
+
+def default_max_workers() -> int:
+    """Processi da usare secondo config.ini [PERFORMANCE]"""
+    config = load_config()
+    if not config.getboolean("PERFORMANCE", "parallel_processing",
+                             fallback=True):
+        return 1
+    return max(1, config.getint("PERFORMANCE", "max_threads", fallback=4))
+
+
+def _init_worker(file_path: str):
+    global _worker_excel_file, _worker_file_path
+    _worker_excel_file = pd.ExcelFile(file_path)
+    _worker_file_path = file_path
+
+
+def parse_sheet(excel_file: pd.ExcelFile, file_path: str, sheet_name,
+                usecols=None) -> pd.DataFrame:
+    """
+    Legge un foglio; con usecols le altre colonne non vengono analizzate
+    (projection.read_columns)
+    """
+    if usecols:
+        return read_columns(file_path, usecols, sheet_name)
+    return excel_file.parse(sheet_name)
+
+
+def _parse_sheet(sheet_name, usecols=None) -> pd.DataFrame:
+    return parse_sheet(_worker_excel_file, _worker_file_path, sheet_name,
+                       usecols)
+
+
+def cache_key(sheet_name, usecols: Optional[List] = None) -> str:
+    """Chiave aggiuntiva di parse_cache per foglio e colonne lette"""
+    if not usecols:
+        return f"sheet={sheet_name}"
+    columns = '|'.join(str(col) for col in usecols)
+    return f"sheet={sheet_name}|usecols={columns}"
+
+
+def iter_excel_sheets(excel_file: pd.ExcelFile, file_path: str,
+                      sheet_names: List,
+                      max_workers: Optional[int] = None, parse_cache=None,
+                      usecols: Optional[Dict[object, List]] = None
+                      ) -> Iterator[SheetResult]:
+    """
+    Restituisce (foglio, DataFrame, errore) nell'ordine di sheet_names.
+    usecols limita per foglio le colonne lette; i fogli già presenti in
+    parse_cache non vengono riletti.
+    """
+    if max_workers is None:
+        max_workers = default_max_workers()
+    usecols = usecols or {}
+
+    frames = {}
+    missing = []
+    for sheet_name in sheet_names:
+        key = cache_key(sheet_name, usecols.get(sheet_name))
+        cached = parse_cache.get(file_path, key) if parse_cache else None
+        if cached is None:
+            missing.append(sheet_name)
+        else:
+            frames[sheet_name] = cached
+
+    def finish(sheet_name, read):
+        try:
+            df = read()
+        except Exception as e:
+            return sheet_name, None, e
+        if parse_cache:
+            key = cache_key(sheet_name, usecols.get(sheet_name))
+            parse_cache.put(file_path, df, key)
+        return sheet_name, df, None
+
+    if max_workers > 1 and len(missing) > 1:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(missing)),
+                                 initializer=_init_worker,
+                                 initargs=(file_path,)) as pool:
+            futures = {
+                sheet_name: pool.submit(_parse_sheet, sheet_name,
+                                        usecols.get(sheet_name))
+                for sheet_name in missing
+            }
+            for sheet_name in sheet_names:
+                if sheet_name in futures:
+                    yield finish(sheet_name, futures[sheet_name].result)
+                else:
+                    yield sheet_name, frames[sheet_name], None
+    else:
+        for sheet_name in sheet_names:
+            if sheet_name in frames:
+                yield sheet_name, frames[sheet_name], None
+            else:
+                yield finish(sheet_name, lambda: parse_sheet(
+                    excel_file, file_path, sheet_name, usecols.get(sheet_name)
+                ))
@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+📤 STREAM EXPORT - ExcelTools
+=============================
+
+Esportazione a blocchi da cursori SQL e DataFrame: riesporta
+modules/stream_export.py.
+"""
+
+import shared_modules  # noqa: F401
+from modules.stream_export import (  # noqa: F401
+    CHUNK_ROWS, EXCEL_MAX_ROWS, XlsxStreamWriter, as_chunks, cursor_chunks,
+    export_csv, export_xlsx, frame_chunks, to_frame
+)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+📥 STREAMING LOADER - ExcelTools
+================================
+
+Caricamento CSV a blocchi di chunk_size righe: il primo blocco è subito
+disponibile per l'anteprima, i successivi vengono accumulati per colonna.
+"""
+
+import os
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+
+def _is_number(dtype) -> bool:
+    return is_numeric_dtype(dtype) and not is_bool_dtype(dtype)
+
+
+def concat_parts(parts: List[pd.Series]) -> pd.Series:
+    """
+    Unisce i blocchi di una colonna. Se i blocchi hanno tipi incompatibili
+    (es. numeri nei primi e testo nei successivi) la colonna diventa testo
+    come con un'unica read_csv, invece di un object con int e str misti.
+    """
+    dtypes = [part.dtype for part in parts]
+    if any(dtype != dtypes[0] for dtype in dtypes) and not all(
+            _is_number(dtype) for dtype in dtypes):
+        text_dtype = next(dtype for dtype in dtypes if not _is_number(dtype))
+        parts = [
+            part if part.dtype == text_dtype
+            else part.map(str, na_action='ignore').astype(text_dtype)
+            for part in parts
+        ]
+    return pd.concat(parts, ignore_index=True)
+
+
+class ColumnarStore:
+    """Accumula i blocchi letti colonna per colonna"""
+
+    def __init__(self):
+        self.columns: Dict[str, List[pd.Series]] = {}
+        self.rows = 0
+
+    def append(self, chunk: pd.DataFrame):
+        """Aggiunge un blocco al negozio colonnare"""
+        for col in chunk.columns:
+            # Copia per colonna: non resta un riferimento al blocco 2D del
+            # chunk, così to_dataframe può liberare una colonna alla volta
+            self.columns.setdefault(col, []).append(chunk[col].copy())
+        self.rows += len(chunk)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Unisce i blocchi di ogni colonna in un unico DataFrame, liberando i
+        blocchi di una colonna appena unita (picco: dati + una colonna)
+        """
+        data = {}
+        for col in list(self.columns):
+            parts = self.columns.pop(col)
+            if len(parts) > 1:
+                data[col] = concat_parts(parts)
+            else:
+                data[col] = parts[0].reset_index(drop=True)
+            del parts
+        # copy=False: nessuna copia finale per consolidare le colonne
+        return pd.DataFrame(data, copy=False)
+
+
+ProgressCallback = Callable[[int, float], None]
+
+
+def iter_csv_chunks(filepath: str, chunk_size: int = 10000,
+                    progress_callback: Optional[ProgressCallback] = None,
+                    **read_csv_kwargs) -> Iterator[pd.DataFrame]:
+    """
+    Legge un CSV a blocchi di chunk_size righe.
+    progress_callback(righe_lette, frazione_file_letta) è chiamato dopo
+    ogni blocco.
+    """
+    total_bytes = os.path.getsize(filepath) or 1
+    rows = 0
+    with open(filepath, "rb") as handle:
+        with pd.read_csv(handle, chunksize=chunk_size,
+                         **read_csv_kwargs) as reader:
+            for chunk in reader:
+                rows += len(chunk)
+                if progress_callback:
+                    fraction = min(handle.tell() / total_bytes, 1.0)
+                    progress_callback(rows, fraction)
+                yield chunk
+
+
+def load_csv_streaming(filepath: str, chunk_size: int = 10000,
+                       on_first_chunk: Optional[
+                           Callable[[pd.DataFrame], None]] = None,
+                       progress_callback: Optional[ProgressCallback] = None,
+                       **read_csv_kwargs) -> pd.DataFrame:
+    """
+    Carica un CSV completo a blocchi.
+    on_first_chunk riceve subito il primo blocco per l'anteprima.
+    """
+    store = ColumnarStore()
+    chunks = iter_csv_chunks(
+        filepath, chunk_size, progress_callback, **read_csv_kwargs
+    )
+    for chunk in chunks:
+        if store.rows == 0 and on_first_chunk:
+            on_first_chunk(chunk)
+        store.append(chunk)
+    return store.to_dataframe()
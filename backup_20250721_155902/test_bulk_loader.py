@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST BULK LOADER
+===================
+
+Controlli su bulk_loader: CREATE TABLE tipizzata, inserimento a
+blocchi, PRAGMA ripristinati dopo l'import e conteggi dell'upsert
+(inserite, aggiornate, eliminate), anche per valori come -1 e -2.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from bulk_loader import BulkLoader, IMPORT_PRAGMAS
+
+
+class CountingConnection(sqlite3.Connection):
+    """Connessione che conta le chiamate a executemany (un blocco ciascuna)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = 0
+
+    def executemany(self, *args, **kwargs):
+        self.batches += 1
+        return super().executemany(*args, **kwargs)
+
+
+def check(condition: bool, message: str) -> bool:
+    print(f"   {'✅' if condition else '❌'} {message}")
+    return condition
+
+
+def test_typed_table() -> bool:
+    """Tipi dichiarati come DataFrame.to_sql e NaN/NaT scritti come NULL"""
+    print("🏗️ CREATE TABLE tipizzata...")
+    df = pd.DataFrame({
+        'id': [1, 2, 3],
+        'importo': [1.5, np.nan, -2.25],
+        'attivo': [True, False, True],
+        'data': pd.to_datetime(['2024-01-05 00:00', None,
+                                '2024-03-01 10:30']),
+        'nome': ['a', None, "l'x"],
+    })
+    conn = sqlite3.connect(':memory:')
+    BulkLoader(conn).load_dataframe(df, 'dati')
+
+    types = [row[2] for row in conn.execute("PRAGMA table_info(dati)")]
+    rows = conn.execute("SELECT * FROM dati ORDER BY id").fetchall()
+    results = [
+        check(types == ['INTEGER', 'REAL', 'INTEGER', 'TIMESTAMP', 'TEXT'],
+              f"tipi dichiarati {types}"),
+        check(rows[0] == (1, 1.5, 1, '2024-01-05 00:00:00', 'a'),
+              f"prima riga {rows[0]}"),
+        check(rows[1] == (2, None, 0, None, None),
+              f"valori mancanti come NULL {rows[1]}"),
+        check(rows[2][3] == '2024-03-01 10:30:00',
+              f"data e ora {rows[2][3]}"),
+    ]
+    conn.close()
+    return all(results)
+
+
+def test_batches() -> bool:
+    """Righe scritte a blocchi di batch_size, indici creati alla fine"""
+    print("\n📦 Inserimento a blocchi...")
+    df = pd.DataFrame({'id': range(10), 'valore': np.arange(10) * 0.5})
+    conn = sqlite3.connect(':memory:', factory=CountingConnection)
+    stats = BulkLoader(conn, batch_size=3).load_dataframe(
+        df, 'dati', index_columns=['id'])
+
+    count = conn.execute("SELECT COUNT(*) FROM dati").fetchone()[0]
+    indexes = [row[1] for row in conn.execute("PRAGMA index_list(dati)")]
+    results = [
+        check(conn.batches == 4, f"4 blocchi da 3 righe ({conn.batches})"),
+        check(count == 10 and stats['rows'] == 10, f"{count} righe scritte"),
+        check(indexes == ['idx_dati_id'], f"indici {indexes}"),
+    ]
+    conn.close()
+    return all(results)
+
+
+def test_pragma_restore() -> bool:
+    """I PRAGMA di import tornano ai valori precedenti, anche dopo un errore"""
+    print("\n⚙️ Ripristino PRAGMA...")
+    path = os.path.join(tempfile.mkdtemp(), 'pragma.db')
+    conn = sqlite3.connect(path)
+
+    def pragmas():
+        return {name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+                for name in IMPORT_PRAGMAS}
+
+    before = pragmas()
+    loader = BulkLoader(conn)
+    df = pd.DataFrame({'id': [1, 2]})
+    loader.load_dataframe(df, 'dati')
+    after_load = pragmas()
+    try:
+        loader.load_dataframe(df, 'dati', if_exists='fail')
+        failed = False
+    except ValueError:
+        failed = True
+    after_error = pragmas()
+
+    results = [
+        check(after_load == before, f"dopo il caricamento {after_load}"),
+        check(failed, "if_exists='fail' su tabella esistente solleva errore"),
+        check(after_error == before, f"dopo l'errore {after_error}"),
+        check(not conn.in_transaction, "nessuna transazione rimasta aperta"),
+    ]
+    conn.close()
+    os.remove(path)
+    return all(results)
+
+
+def test_upsert_counts() -> bool:
+    """Conteggi dell'upsert per chiave e per riga intera"""
+    print("\n🔁 Upsert incrementale...")
+    first = pd.DataFrame({'id': [1, 2, 3], 'valore': [-1.0, 5.0, None]})
+    # -1 -> -2: valori con lo stesso hash() in Python, ma righe diverse
+    second = pd.DataFrame({'id': [1, 2, 4], 'valore': [-2.0, 5.0, None]})
+    results = []
+
+    conn = sqlite3.connect(':memory:')
+    loader = BulkLoader(conn)
+    loader.load_dataframe(first, 'dati')
+    stats = loader.upsert_dataframe(second, 'dati', key_columns=['id'])
+    counts = (stats['inserted'], stats['updated'], stats['deleted'])
+    results.append(check(counts == (1, 1, 1), f"per chiave +/~/- {counts}"))
+    rows = conn.execute("SELECT * FROM dati ORDER BY id").fetchall()
+    results.append(check(rows == [(1, -2.0), (2, 5.0), (4, None)],
+                         f"tabella aggiornata {rows}"))
+    stats = loader.upsert_dataframe(second, 'dati', key_columns=['id'])
+    counts = (stats['inserted'], stats['updated'], stats['deleted'])
+    results.append(check(counts == (0, 0, 0), f"nessuna modifica {counts}"))
+    conn.close()
+
+    conn = sqlite3.connect(':memory:')
+    loader = BulkLoader(conn)
+    loader.load_dataframe(first, 'dati')
+    stats = loader.upsert_dataframe(second, 'dati')
+    counts = (stats['inserted'], stats['updated'], stats['deleted'])
+    results.append(check(counts == (2, 0, 2), f"per riga +/~/- {counts}"))
+    rows = conn.execute("SELECT * FROM dati ORDER BY id").fetchall()
+    results.append(check(rows == [(1, -2.0), (2, 5.0), (4, None)],
+                         f"tabella aggiornata {rows}"))
+    conn.close()
+    return all(results)
+
+
+def main():
+    results = [test_typed_table(), test_batches(), test_pragma_restore(),
+               test_upsert_counts()]
+    print("\n" + "=" * 60)
+    print("✅ TUTTI I TEST PASSATI" if all(results) else "❌ TEST FALLITI")
+    return all(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -104,7 +104,8 @@ def test_enterprise_system():
             # Test filtro semplice
             filters = [{'column': columns[0], 'operator': 'IS NOT NULL', 'value': ''}]
             filtered_query = db.build_filtered_query(table_name, filters=filters, limit=10)
-            result = db.execute_advanced_query(filtered_query)
+            result = db.execute_advanced_query(filtered_query.sql,
+                                               filtered_query.params)
 
             if result is not None:
                 print(f"   ✅ Filtri avanzati OK ({len(result)} risultati)")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST QUERY BUILDER
+=====================
+
+Controlli su query_builder: testo SQL e parametri di BuiltQuery per
+confronti, LIKE (testo contenuto) e LIKE_PATTERN (pattern così com'è),
+liste IN, combinazioni AND/OR, ORDER BY con direzione e LIMIT, più
+l'esecuzione su SQLite con valori come D'Angelo e 10%, con parametri e
+con i valori scritti come letterali (inline_params).
+"""
+
+import sqlite3
+import sys
+
+from query_builder import BuiltQuery, build_select, inline_params
+
+
+def check(condition: bool, message: str) -> bool:
+    print(f"   {'✅' if condition else '❌'} {message}")
+    return condition
+
+
+def test_sql_and_params() -> bool:
+    """Testo SQL con segnaposto e valori nello stesso ordine"""
+    print("🧱 SQL e parametri...")
+    results = []
+
+    query = build_select('clienti', ['nome', 'città'],
+                         [{'column': 'nome', 'operator': '=',
+                           'value': "D'Angelo"}])
+    results.append(check(
+        query == BuiltQuery(
+            "SELECT [nome], [città] FROM [clienti] WHERE [nome] = ?",
+            ("D'Angelo",)),
+        f"confronto {query}"))
+
+    query = build_select('t', filters=[
+        {'column': 'note', 'operator': 'like', 'value': '10%_a'}])
+    results.append(check(
+        query.sql == "SELECT * FROM [t] WHERE [note] LIKE ? ESCAPE '\\'"
+        and query.params == ('%10\\%\\_a%',),
+        f"LIKE con % e _ alla lettera {query}"))
+
+    query = build_select('t', filters=[
+        {'column': 'note', 'operator': 'NOT LIKE_PATTERN', 'value': 'A_%'}])
+    results.append(check(
+        query.sql == "SELECT * FROM [t] WHERE [note] NOT LIKE ?"
+        and query.params == ('A_%',),
+        f"NOT LIKE_PATTERN invariato {query}"))
+
+    query = build_select('t', filters=[
+        {'column': 'id', 'operator': 'IN', 'value': '1, 2, 3'}])
+    results.append(check(
+        query.sql == "SELECT * FROM [t] WHERE [id] IN (?, ?, ?, ?)"
+        and query.params == ('1', '2', '3', '3'),
+        f"IN completato a 4 segnaposto {query}"))
+
+    query = build_select('t', filters=[
+        {'column': 'a', 'operator': '>', 'value': 1},
+        {'column': 'b', 'operator': 'IS NULL', 'logic': 'OR'},
+        {'column': 'c', 'operator': '!=', 'value': 'x'},
+    ], order_by=('a', 'desc'), limit=10)
+    results.append(check(
+        query.sql == "SELECT * FROM [t] WHERE (([a] > ?) OR ([b] IS NULL)) "
+                     "AND ([c] != ?) ORDER BY [a] DESC LIMIT ?"
+        and query.params == (1, 'x', 10),
+        f"AND/OR, ORDER BY e LIMIT {query}"))
+
+    query = build_select('t', order_by='nome')
+    results.append(check(query.sql == "SELECT * FROM [t] ORDER BY [nome]",
+                         f"ORDER BY senza direzione {query.sql}"))
+
+    for order_by, operator in ((('a', 'DESC; DROP'), '='), ('a', 'REGEXP')):
+        try:
+            build_select('t', filters=[
+                {'column': 'a', 'operator': operator, 'value': 1}],
+                order_by=order_by)
+            rejected = False
+        except ValueError:
+            rejected = True
+        results.append(check(rejected,
+                             f"rifiutato {order_by!r} / {operator!r}"))
+    return all(results)
+
+
+def test_execution() -> bool:
+    """Le query costruite trovano le righe attese"""
+    print("\n🔍 Esecuzione su SQLite...")
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE clienti (nome TEXT, sconto TEXT)")
+    conn.executemany("INSERT INTO clienti VALUES (?, ?)", [
+        ("D'Angelo", '10%'), ('Rossi', '100'), ('Bianchi', '5%')])
+
+    def names(filters, order_by='nome'):
+        query = build_select('clienti', ['nome'], filters, order_by)
+        found = [row[0] for row in conn.execute(query.sql, query.params)]
+        # Stesso risultato dal testo mostrato nell'editor, anche modificato
+        literal = inline_params(query) + " "
+        if [row[0] for row in conn.execute(literal)] != found:
+            return None
+        return found
+
+    results = [
+        check(names([{'column': 'nome', 'operator': '=',
+                      'value': "D'Angelo"}]) == ["D'Angelo"],
+              "apostrofo nel valore"),
+        check(names([{'column': 'sconto', 'operator': 'LIKE',
+                      'value': '0%'}]) == ["D'Angelo"],
+              "LIKE cerca '0%' alla lettera"),
+        check(names([{'column': 'sconto', 'operator': 'LIKE_PATTERN',
+                      'value': '10%'}]) == ["D'Angelo", 'Rossi'],
+              "LIKE_PATTERN usa % come jolly"),
+        check(names(None, ('nome', 'DESC')) == ['Rossi', "D'Angelo",
+                                                'Bianchi'],
+              "ordinamento decrescente"),
+    ]
+    conn.close()
+    return all(results)
+
+
+def test_inline_params() -> bool:
+    """Letterali SQL al posto dei '?', non dentro identificatori e stringhe"""
+    print("\n✍️ Parametri come letterali...")
+    query = build_select('t?', ['a?'], [
+        {'column': 'n', 'operator': 'LIKE', 'value': "D'A?"},
+        {'column': 'v', 'operator': 'IN', 'value': [1, 2.5, None]},
+    ], limit=5)
+    text = inline_params(query)
+    results = [
+        check(text == "SELECT [a?] FROM [t?] WHERE [n] LIKE '%D''A?%' "
+                      "ESCAPE '\\' AND [v] IN (1, 2.5, NULL, NULL) LIMIT 5",
+              f"testo {text}"),
+    ]
+    try:
+        inline_params(BuiltQuery("SELECT ?", ()))
+        rejected = False
+    except ValueError:
+        rejected = True
+    results.append(check(rejected, "parametri mancanti rifiutati"))
+    return all(results)
+
+
+def main():
+    results = [test_sql_and_params(), test_execution(), test_inline_params()]
+    print("\n" + "=" * 60)
+    print("✅ TUTTI I TEST PASSATI" if all(results) else "❌ TEST FALLITI")
+    return all(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
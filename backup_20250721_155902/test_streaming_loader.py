@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST STREAMING LOADER
+========================
+
+Controlli su streaming_loader: a blocchi si ottengono gli stessi tipi di
+un'unica read_csv anche quando una colonna cambia tipo tra un blocco e
+l'altro, e to_dataframe non raddoppia la memoria dei dati.
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from streaming_loader import ColumnarStore, iter_csv_chunks, load_csv_streaming
+
+
+def check(condition: bool, message: str) -> bool:
+    print(f"   {'✅' if condition else '❌'} {message}")
+    return condition
+
+
+def write_csv(lines) -> str:
+    handle, path = tempfile.mkstemp(suffix='.csv')
+    with os.fdopen(handle, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def test_mixed_types() -> bool:
+    """Numeri nei primi blocchi e testo nei successivi: colonna di testo"""
+    print("🔤 Tipi tra blocchi...")
+    lines = ["codice,importo,nota"]
+    lines += [f"{i},{i},x" for i in range(10)]
+    lines += ["A-1,1.5,", "007,,y"]
+    path = write_csv(lines)
+    streamed = load_csv_streaming(path, chunk_size=4)
+    single = pd.read_csv(path, low_memory=False)
+    os.remove(path)
+
+    results = [
+        check(streamed.dtypes.to_dict() == single.dtypes.to_dict(),
+              f"tipi come read_csv {dict(streamed.dtypes.astype(str))}"),
+        check(streamed['codice'].tolist() == single['codice'].tolist(),
+              "valori di testo invariati ('007' compreso)"),
+        check(streamed['importo'].equals(single['importo']),
+              "interi e decimali uniti come float"),
+    ]
+    try:
+        streamed.sort_values('codice')
+        sortable = True
+    except TypeError:
+        sortable = False
+    results.append(check(sortable, "colonna ordinabile (niente int e str)"))
+    return all(results)
+
+
+def test_peak_memory() -> bool:
+    """to_dataframe libera i blocchi colonna per colonna"""
+    print("\n💾 Memoria di to_dataframe...")
+    frame = pd.DataFrame(np.random.rand(200000, 6), columns=list('abcdef'))
+    handle, path = tempfile.mkstemp(suffix='.csv')
+    os.close(handle)
+    frame.to_csv(path, index=False)
+    del frame
+
+    store = ColumnarStore()
+    for chunk in iter_csv_chunks(path, 20000):
+        store.append(chunk)
+    del chunk
+    os.remove(path)
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    df = store.to_dataframe()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    data = df.memory_usage(index=False).sum()
+    return check(peak < data * 1.5,
+                 f"picco {peak / 1e6:.1f} MB per {data / 1e6:.1f} MB di dati")
+
+
+def main():
+    results = [test_mixed_types(), test_peak_memory()]
+    print("\n" + "=" * 60)
+    print("✅ TUTTI I TEST PASSATI" if all(results) else "❌ TEST FALLITI")
+    return all(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+🔍 WORKBOOK INSPECTOR - ExcelTools
+==================================
+
+Ispezione rapida di una cartella di lavoro senza caricarne i dati: nomi
+dei fogli, intervallo usato, intestazioni e dtype stimati dalle prime
+righe. Per .xlsx/.xlsm vengono letti direttamente dallo ZIP solo
+workbook.xml, l'elemento <dimension> e le prime righe di ogni foglio
+(le stringhe condivise sono lette solo fino all'indice necessario).
+"""
+
+import os
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from csv_sniffer import read_csv_sniffed
+
+DEFAULT_SAMPLE_ROWS = 20
+XLSX_EXTENSIONS = ('.xlsx', '.xlsm')
+
+MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_NS = ('{http://schemas.openxmlformats.org/officeDocument/2006/'
+          'relationships}')
+PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# Formati numerici predefiniti di Excel che rappresentano date/ore
+BUILTIN_DATE_FORMATS = set(range(14, 23)) | {45, 46, 47}
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+CELL_REF = re.compile(r'^([A-Z]+)(\d+)$')
+
+
+def column_index(letters: str) -> int:
+    """Indice (da 0) della colonna Excel: A -> 0, AA -> 26"""
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - ord('A') + 1
+    return index - 1
+
+
+def parse_dimension(ref: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Ultima riga e numero di colonne dall'intervallo usato ('A1:F1000')"""
+    if not ref:
+        return None
+    last = CELL_REF.match(ref.split(':')[-1].upper())
+    first = CELL_REF.match(ref.split(':')[0].upper())
+    if not last or not first:
+        return None
+    width = column_index(last.group(1)) - column_index(first.group(1)) + 1
+    return int(last.group(2)), width
+
+
+def make_header(values: List[Any]) -> List[str]:
+    """
+    Nomi colonna come pd.read_excel: 'Unnamed: n' per le celle vuote e
+    suffissi '.n' ai duplicati, saltando i nomi già presenti nella riga
+    (a, a, a.1 -> a, a.2, a.1).
+    """
+    unnamed = [i for i, value in enumerate(values)
+               if value is None or value == '']
+    names = [f"Unnamed: {i}" if i in unnamed else value
+             for i, value in enumerate(values)]
+    order = [i for i in range(len(names)) if i not in unnamed] + unnamed
+    counts = defaultdict(int)
+    for i in order:
+        name = original = names[i]
+        count = counts[name]
+        while count > 0:
+            counts[original] = count + 1
+            name = f"{original}.{count}"
+            count = count + 1 if name in names else counts[name]
+        names[i] = name
+        counts[name] = count + 1
+    return names
+
+
+def _is_date_format(code: str) -> bool:
+    code = re.sub(r'"[^"]*"|\[[^\]]*\]|\\.', '', code).lower()
+    return any(char in code for char in 'dmyhs') and 'general' not in code
+
+
+class _SharedStrings:
+    """Stringhe condivise lette in streaming solo fino all'indice richiesto"""
+
+    def __init__(self, archive: zipfile.ZipFile):
+        self._values = []
+        self._stream = None
+        self._events = None
+        if 'xl/sharedStrings.xml' in archive.namelist():
+            self._stream = archive.open('xl/sharedStrings.xml')
+            self._events = ET.iterparse(self._stream, events=('end',))
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        while index >= len(self._values) and self._events is not None:
+            try:
+                _, elem = next(self._events)
+            except StopIteration:
+                self.close()
+                break
+            if elem.tag == f'{MAIN_NS}si':
+                texts = (elem.findall(f'{MAIN_NS}t')
+                         + elem.findall(f'{MAIN_NS}r/{MAIN_NS}t'))
+                self._values.append(''.join(t.text or '' for t in texts))
+                elem.clear()
+        return self._values[index] if index < len(self._values) else None
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+        self._stream = None
+        self._events = None
+
+
+def _date_styles(archive: zipfile.ZipFile) -> set:
+    """Indici degli stili di cella con formato data/ora"""
+    if 'xl/styles.xml' not in archive.namelist():
+        return set()
+    root = ET.fromstring(archive.read('xl/styles.xml'))
+    date_formats = set(BUILTIN_DATE_FORMATS)
+    for fmt in root.iter(f'{MAIN_NS}numFmt'):
+        if _is_date_format(fmt.get('formatCode', '')):
+            date_formats.add(int(fmt.get('numFmtId')))
+    cell_xfs = root.find(f'{MAIN_NS}cellXfs')
+    if cell_xfs is None:
+        return set()
+    return {i for i, xf in enumerate(cell_xfs)
+            if int(xf.get('numFmtId', 0)) in date_formats}
+
+
+def _cell_value(cell, shared: _SharedStrings, date_styles: set) -> Any:
+    cell_type = cell.get('t', 'n')
+    v = cell.find(f'{MAIN_NS}v')
+    text = v.text if v is not None else None
+    if cell_type == 'inlineStr':
+        inline = cell.find(f'{MAIN_NS}is')
+        if inline is None:
+            return None
+        return ''.join(t.text or '' for t in inline.iter(f'{MAIN_NS}t'))
+    if text is None:
+        return None
+    if cell_type == 's':
+        return shared[int(text)]
+    if cell_type == 'b':
+        return text == '1'
+    if cell_type in ('str', 'e'):
+        return text
+    if cell_type == 'd':
+        return pd.Timestamp(text)
+    if int(cell.get('s', 0)) in date_styles:
+        # Come openpyxl: giorni interi più frazione arrotondata al
+        # millisecondo
+        day, fraction = divmod(float(text), 1)
+        milliseconds = round(fraction * 86400000)
+        return EXCEL_EPOCH + pd.Timedelta(days=day, milliseconds=milliseconds)
+    if '.' in text or 'E' in text or 'e' in text:
+        return float(text)
+    return int(text)
+
+
+def _row_values(row, shared: _SharedStrings, date_styles: set) -> List[Any]:
+    """Valori delle celle di una riga, con None per le celle assenti"""
+    values = []
+    for position, cell in enumerate(row.iter(f'{MAIN_NS}c')):
+        ref = CELL_REF.match(cell.get('r', ''))
+        index = column_index(ref.group(1)) if ref else position
+        values.extend([None] * (index + 1 - len(values)))
+        values[index] = _cell_value(cell, shared, date_styles)
+    return values
+
+
+def _sheet_path(target: str) -> str:
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join('xl', target))
+
+
+def _read_sheet_head(archive: zipfile.ZipFile, path: str,
+                     shared: _SharedStrings, date_styles: set,
+                     sample_rows: int
+                     ) -> Tuple[Optional[str], List[Tuple[int, List[Any]]]]:
+    """
+    Elemento <dimension> e prime sample_rows + 1 righe (numero riga, valori)
+    a partire dalla prima non vuota; come in pandas le righe vuote
+    successive restano nel campione.
+    """
+    dimension = None
+    rows = []
+    with archive.open(path) as stream:
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                if elem.tag == f'{MAIN_NS}dimension':
+                    dimension = elem.get('ref')
+                continue
+            if elem.tag == f'{MAIN_NS}row':
+                values = _row_values(elem, shared, date_styles)
+                number = int(elem.get('r', rows[-1][0] + 1 if rows else 1))
+                if rows:
+                    # Righe assenti nell'XML: vuote
+                    previous = rows[-1][0]
+                    gap = range(previous + 1,
+                                min(number, previous + 2 + sample_rows))
+                    rows.extend((missing, []) for missing in gap)
+                    rows.append((number, values))
+                elif any(value is not None for value in values):
+                    rows.append((number, values))
+                elem.clear()
+                if len(rows) > sample_rows:
+                    del rows[sample_rows + 1:]
+                    break
+            elif elem.tag == f'{MAIN_NS}sheetData':
+                break
+    return dimension, rows
+
+
+def _sheet_info(name: str, headers: List[Any], sample: List[List[Any]],
+                rows: Optional[int], columns: Optional[int],
+                dimension: Optional[str] = None) -> Dict[str, Any]:
+    width = max([len(headers)] + [len(row) for row in sample])
+    headers = make_header(list(headers) + [None] * (width - len(headers)))
+    records = [tuple(row) + (None,) * (width - len(row)) for row in sample]
+    if records:
+        frame = pd.DataFrame.from_records(records, columns=headers)
+    else:
+        frame = pd.DataFrame(columns=headers)
+    return {
+        'name': name,
+        'dimension': dimension,
+        'rows': rows,
+        'columns': columns if columns is not None else width,
+        'headers': headers,
+        'dtypes': {col: str(frame[col].dtype) for col in headers},
+        'sample': frame,
+    }
+
+
+def _sheet_paths(archive: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    """(nome foglio, percorso XML nello ZIP) nell'ordine del file"""
+    rels = ET.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    targets = {rel.get('Id'): rel.get('Target')
+               for rel in rels.iter(f'{PKG_REL_NS}Relationship')}
+    workbook = ET.fromstring(archive.read('xl/workbook.xml'))
+    return [(sheet.get('name'), _sheet_path(targets[sheet.get(f'{REL_NS}id')]))
+            for sheet in workbook.iter(f'{MAIN_NS}sheet')]
+
+
+def inspect_xlsx(file_path: str, sample_rows: int = DEFAULT_SAMPLE_ROWS
+                 ) -> List[Dict[str, Any]]:
+    """Fogli di un .xlsx/.xlsm letti direttamente dallo ZIP"""
+    with zipfile.ZipFile(file_path) as archive:
+        sheet_paths = _sheet_paths(archive)
+        shared = _SharedStrings(archive)
+        date_styles = _date_styles(archive)
+        try:
+            sheets = []
+            for name, path in sheet_paths:
+                dimension, head = _read_sheet_head(
+                    archive, path, shared, date_styles, sample_rows)
+                size = parse_dimension(dimension)
+                if head:
+                    header_row, headers = head[0]
+                    sample = [values for _, values in head[1:]]
+                else:
+                    header_row, headers, sample = 1, [], []
+                rows = max(0, size[0] - header_row) if size else None
+                columns = size[1] if size else None
+                sheets.append(_sheet_info(name, headers, sample, rows,
+                                          columns, dimension))
+            return sheets
+        finally:
+            shared.close()
+
+
+def column_letters(index: int) -> str:
+    """Lettere della colonna Excel dall'indice (da 0): 0 -> A, 26 -> AA"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def _wanted_columns(values: List[Any],
+                    columns: Optional[List[str]]) -> Dict[str, Any]:
+    """Lettere colonna -> nome per le colonne richieste dell'intestazione"""
+    headers = make_header(values)
+    missing = [col for col in columns or [] if col not in headers]
+    if missing:
+        raise ValueError(f"Colonne non presenti nel foglio: {missing}")
+    return {column_letters(i): header for i, header in enumerate(headers)
+            if columns is None or header in columns}
+
+
+def read_xlsx_columns(file_path: str, columns: Optional[List[str]] = None,
+                      sheet_name=None) -> pd.DataFrame:
+    """
+    Legge un foglio .xlsx/.xlsm (il primo se sheet_name è None)
+    materializzando solo le colonne richieste: le celle delle altre colonne
+    vengono saltate senza convertirne il valore né decodificarne le
+    stringhe condivise.
+    Come pd.read_excel l'intestazione è la prima riga non vuota, le righe
+    vuote intermedie restano (NaN) e le colonne seguono l'ordine del foglio.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        sheet_paths = _sheet_paths(archive)
+        if sheet_name is None:
+            path = sheet_paths[0][1]
+        else:
+            matches = [p for name, p in sheet_paths if name == sheet_name]
+            if not matches:
+                raise ValueError(f"Foglio '{sheet_name}' non trovato")
+            path = matches[0]
+        shared = _SharedStrings(archive)
+        date_styles = _date_styles(archive)
+        wanted = None  # lettere colonna -> nome
+        data = {}
+        last_row = 0
+        try:
+            with archive.open(path) as stream:
+                for _, elem in ET.iterparse(stream):
+                    if elem.tag != f'{MAIN_NS}row':
+                        continue
+                    number = int(elem.get('r', last_row + 1))
+                    if wanted is None:
+                        values = _row_values(elem, shared, date_styles)
+                        if any(value is not None for value in values):
+                            wanted = _wanted_columns(values, columns)
+                            data = {header: [] for header in wanted.values()}
+                            last_row = number
+                    elif any(len(cell) for cell in elem):
+                        row = {}
+                        for position, cell in enumerate(elem):
+                            ref = cell.get('r')
+                            letters = (ref.rstrip('0123456789') if ref
+                                       else column_letters(position))
+                            if letters in wanted and len(cell):
+                                row[wanted[letters]] = _cell_value(
+                                    cell, shared, date_styles)
+                        # Righe vuote intermedie (assenti o senza valori)
+                        # come in pandas
+                        blanks = [None] * (number - last_row - 1)
+                        for header, values in data.items():
+                            values.extend(blanks)
+                            values.append(row.get(header))
+                        last_row = number
+                    elem.clear()
+        finally:
+            shared.close()
+        if wanted is None:
+            return pd.DataFrame(columns=columns or [])
+        return pd.DataFrame(data, columns=list(wanted.values()))
+
+
+def _inspect_with_pandas(file_path: str,
+                         sample_rows: int) -> List[Dict[str, Any]]:
+    """
+    Ripiego per .xls e file non leggibili come ZIP: solo le prime righe di
+    ogni foglio
+    """
+    sheets = []
+    with pd.ExcelFile(file_path) as excel_file:
+        book = excel_file.book
+        for name in excel_file.sheet_names:
+            sample = excel_file.parse(name, nrows=sample_rows)
+            rows = None
+            if hasattr(book, 'sheet_by_name'):  # xlrd: dimensioni già note
+                rows = max(0, book.sheet_by_name(name).nrows - 1)
+            info = _sheet_info(name, list(sample.columns),
+                               sample.values.tolist(), rows,
+                               len(sample.columns))
+            info['dtypes'] = {col: str(sample[col].dtype)
+                              for col in sample.columns}
+            sheets.append(info)
+    return sheets
+
+
+def inspect_file(file_path: str, sample_rows: int = DEFAULT_SAMPLE_ROWS
+                 ) -> List[Dict[str, Any]]:
+    """
+    Descrizione dei fogli del file (un solo 'foglio' per i CSV):
+    name, dimension, rows (righe di dati, None se non note), columns,
+    headers, dtypes (stimati dalle prime righe) e sample (DataFrame).
+    """
+    lower = file_path.lower()
+    if lower.endswith('.csv'):
+        sample = read_csv_sniffed(file_path, nrows=sample_rows)
+        info = _sheet_info(os.path.basename(file_path), list(sample.columns),
+                           sample.values.tolist(), None, len(sample.columns))
+        info['dtypes'] = {col: str(sample[col].dtype)
+                          for col in sample.columns}
+        return [info]
+    if lower.endswith(XLSX_EXTENSIONS):
+        try:
+            return inspect_xlsx(file_path, sample_rows)
+        except (KeyError, zipfile.BadZipFile, ET.ParseError):
+            pass  # Struttura non standard: lettura tramite pandas
+    return _inspect_with_pandas(file_path, sample_rows)
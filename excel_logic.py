@@ -1,14 +1,18 @@
 import pandas as pd
 
+from modules.xlsx_reader import is_xlsx, read_xlsx
+
 
 class ExcelManager:
-    def load_excel(self, file_path):
-        return pd.read_excel(file_path)
+    def load_excel(self, file_path, nrows=None):
+        if is_xlsx(file_path):
+            return read_xlsx(file_path, nrows=nrows)
+        return pd.read_excel(file_path, nrows=nrows)
 
     def merge_excels(self, files):
         dfs = []
         for file_path in files:
-            df = pd.read_excel(file_path)
+            df = self.load_excel(file_path)
             dfs.append(df)
         merged = pd.concat(dfs, ignore_index=True)
         return merged, dfs
@@ -13,16 +13,30 @@ Versione: 2.0 - AI Enhanced
 
 import os
 import sqlite3
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 
+from modules.settings import load_config
+
 try:
-    import pandas as pd
+    import pandas  # noqa: F401
     HAS_PANDAS = True
 except ImportError:
     HAS_PANDAS = False
     print("⚠️ Pandas not available - limited functionality")
 
+if HAS_PANDAS:
+    from modules.batch_reader import (
+        default_max_workers, iter_data_files, read_data_file
+    )
+    from modules.dtype_optimizer import optimize_dtypes
+    from modules.memory_governor import (
+        GovernedAttribute, GovernedDict, MemoryGovernor
+    )
+    from modules.parse_cache import ParseCache
+    from modules.stream_export import export_csv, export_xlsx
+
 try:
     import customtkinter as ctk
     ctk.set_appearance_mode("dark")
@@ -36,13 +50,45 @@ except ImportError:
 class ExcelToolsUnified:
     """Strumento unificato per gestione Excel e Database"""
 
+    # Righe inserite nel treeview per ogni ciclo dell'event loop
+    TREEVIEW_BATCH_SIZE = 200
+
+    if HAS_PANDAS:
+        # DataFrame conservati nel governor della memoria
+        current_data = GovernedAttribute()
+        filtered_data = GovernedAttribute()
+
     def __init__(self):
         self.db_path = "exceltools_unified.db"
+
+        # Configurazione
+        self.config = load_config()
+
+        # Limite di memoria per i DataFrame (config.ini [PERFORMANCE])
+        if HAS_PANDAS:
+            self.memory_governor = MemoryGovernor.from_config(self.config)
+            self.imported_files = GovernedDict(
+                self.memory_governor, "imported"
+            )
+        else:
+            self.memory_governor = None
+            self.imported_files = {}
         self.current_data = None
         self.filtered_data = None
-        self.imported_files = {}
         self.saved_views = {}
 
+        self.preview_rows = self.config.getint(
+            "UI", "preview_rows", fallback=100
+        )
+        self.optimize_dtypes = self.config.getboolean(
+            "PERFORMANCE", "optimize_dtypes", fallback=True
+        )
+        self._treeview_job = 0
+        self._import_errors = []
+
+        # Cache su disco dei file già letti
+        self.parse_cache = ParseCache() if HAS_PANDAS else None
+
         # Inizializza database
         self.init_database()
 
@@ -265,11 +311,12 @@ class ExcelToolsUnified:
                 )
                 return
 
-            # Determina il tipo di file e carica
-            if file_path.endswith('.csv'):
-                df = pd.read_csv(file_path)
-            else:
-                df = pd.read_excel(file_path)
+            # Determina il tipo di file e carica (dalla cache se possibile)
+            df = read_data_file(file_path, self.parse_cache)
+            memory = ""
+            if self.optimize_dtypes:
+                df, report = optimize_dtypes(df)
+                memory = f", {self.format_memory_report(report)}"
 
             self.current_data = df
             filename = os.path.basename(file_path)
@@ -282,7 +329,7 @@ class ExcelToolsUnified:
             self.status_bar.config(
                 text=(
                     f"Loaded: {filename} "
-                    f"({len(df)} rows, {len(df.columns)} cols)"
+                    f"({len(df)} rows, {len(df.columns)} cols{memory})"
                 )
             )
 
@@ -291,14 +338,20 @@ class ExcelToolsUnified:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load file:\n{str(e)}")
 
+    @staticmethod
+    def format_memory_report(report):
+        """Memoria prima/dopo l'ottimizzazione dei dtype"""
+        before = report["before"] / 1024 / 1024
+        after = report["after"] / 1024 / 1024
+        return f"memory {before:.1f} MB -> {after:.1f} MB"
+
     def update_treeview(self):
         """Aggiorna il treeview con i dati correnti"""
         if self.current_data is None:
             return
 
         # Pulisci treeview
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.tree.delete(*self.tree.get_children())
 
         # Configura colonne
         df = self.current_data
@@ -313,16 +366,47 @@ class ExcelToolsUnified:
             self.tree.heading(col, text=col, anchor="w")
             self.tree.column(col, width=100, minwidth=50)
 
-        # Inserisci dati (limite 1000 righe per performance)
-        max_rows = min(1000, len(df))
-        for i in range(max_rows):
-            row_data = [str(df.iloc[i, j]) for j in range(len(df.columns))]
-            self.tree.insert("", "end", text=str(i+1), values=row_data)
+        # Formatta le righe in background e inseriscile a blocchi
+        self._treeview_job += 1
+        preview = df.iloc[:self.preview_rows]
+        threading.Thread(
+            target=self._format_treeview_rows,
+            args=(self._treeview_job, preview, len(df)),
+            daemon=True
+        ).start()
+
+    def _format_treeview_rows(self, job, preview, total_rows):
+        """Thread: formatta le righe di anteprima per colonna"""
+        try:
+            columns = [preview[col].astype(str).tolist() for col in preview]
+            rows = list(zip(*columns))
+            self.root.after(
+                0, self._insert_treeview_rows, job, rows, 0, total_rows
+            )
+        except Exception as e:
+            message = f"Preview error: {e}"
+            self.root.after(
+                0, lambda: self.status_bar.config(text=message)
+            )
+
+    def _insert_treeview_rows(self, job, rows, start, total_rows):
+        """Inserisce un blocco di righe e pianifica il successivo"""
+        if job != self._treeview_job:
+            # Un aggiornamento più recente ha sostituito questo
+            return
 
-        if len(df) > max_rows:
+        end = min(start + self.TREEVIEW_BATCH_SIZE, len(rows))
+        for i in range(start, end):
+            self.tree.insert("", "end", text=str(i+1), values=rows[i])
+
+        if end < len(rows):
+            self.root.after(
+                1, self._insert_treeview_rows, job, rows, end, total_rows
+            )
+        elif total_rows > len(rows):
             self.tree.insert(
                 "", "end", text="...",
-                values=["..." for _ in df.columns]
+                values=["..." for _ in self.tree["columns"]]
             )
 
     def import_multiple(self):
@@ -336,9 +420,80 @@ class ExcelToolsUnified:
             ]
         )
 
-        if file_paths:
-            for file_path in file_paths:
-                self.load_file(file_path)
+        if not file_paths:
+            return
+        if not HAS_PANDAS:
+            messagebox.showerror(
+                "Error",
+                "Pandas required for file operations"
+            )
+            return
+
+        self.status_bar.config(text=f"Importing {len(file_paths)} files...")
+        threading.Thread(
+            target=self._import_multiple_thread,
+            args=(list(file_paths),),
+            daemon=True
+        ).start()
+
+    def _import_multiple_thread(self, file_paths):
+        """Thread: legge i file in parallelo e notifica ogni completamento"""
+        total = len(file_paths)
+        pending = list(file_paths)
+        try:
+            max_workers = default_max_workers(self.config)
+            results = iter_data_files(
+                file_paths, max_workers=max_workers,
+                parse_cache=self.parse_cache
+            )
+            for file_path, df, error in results:
+                if error is None and self.optimize_dtypes:
+                    df, _ = optimize_dtypes(df)
+                pending.remove(file_path)
+                self.root.after(
+                    0, self._multiple_file_done,
+                    total - len(pending), total, file_path, df, error
+                )
+        except Exception as e:
+            # I file non ancora notificati risultano falliti, così il
+            # riepilogo finale viene mostrato comunque
+            for file_path in list(pending):
+                pending.remove(file_path)
+                self.root.after(
+                    0, self._multiple_file_done,
+                    total - len(pending), total, file_path, None, e
+                )
+
+    def _multiple_file_done(self, done, total, file_path, df, error):
+        """Aggiorna lo stato per un file completato"""
+        filename = os.path.basename(file_path)
+        if error is None:
+            self.imported_files[filename] = df
+            self.current_data = df
+            status = f"[{done}/{total}] Loaded: {filename} ({len(df)} rows)"
+        else:
+            self._import_errors.append(f"{filename}: {error}")
+            status = f"[{done}/{total}] Failed: {filename}"
+        self.status_bar.config(text=status)
+
+        if done == total:
+            self._multiple_import_complete(total)
+
+    def _multiple_import_complete(self, total):
+        """Riepilogo finale dell'importazione multipla"""
+        errors, self._import_errors = self._import_errors, []
+        loaded = total - len(errors)
+        if loaded:
+            self.update_treeview()
+        self.status_bar.config(
+            text=f"Imported {loaded}/{total} files ({len(errors)} failed)"
+        )
+        if errors:
+            messagebox.showwarning(
+                "Import",
+                f"Imported {loaded}/{total} files. Failed:\n"
+                + "\n".join(errors)
+            )
 
     def open_ai_query_builder(self):
         """Apre il AI Query Builder"""
@@ -576,10 +731,12 @@ class ExcelToolsUnified:
 
         if file_path:
             try:
+                # Scrittura a blocchi: memoria costante anche su file grandi
                 if file_path.endswith('.csv'):
-                    self.current_data.to_csv(file_path, index=False)
+                    export_csv(self.current_data, file_path)
                 else:
-                    self.current_data.to_excel(file_path, index=False)
+                    export_xlsx(self.current_data, file_path,
+                                sheet_name='Sheet1')
 
                 messagebox.showinfo("Success", f"Data exported to {file_path}")
 
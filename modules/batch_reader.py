@@ -0,0 +1,67 @@
+"""
+Modulo per la lettura di più file CSV/Excel in parallelo.
+I file vengono letti in un pool di processi e restituiti man mano che
+sono pronti; un file illeggibile non interrompe gli altri.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from modules.settings import load_config
+from modules.xlsx_reader import is_xlsx, read_xlsx
+
+
+def default_max_workers(config=None):
+    """Processi da usare secondo config.ini [PERFORMANCE]."""
+    config = config or load_config()
+    if not config.getboolean(
+        'PERFORMANCE', 'parallel_processing', fallback=True
+    ):
+        return 1
+    return max(1, config.getint('PERFORMANCE', 'max_threads', fallback=4))
+
+
+def read_data_file(file_path, parse_cache=None):
+    """Legge un file CSV o Excel (dalla cache su disco se disponibile)."""
+    if file_path.endswith('.csv'):
+        def reader():
+            return pd.read_csv(file_path)
+    elif is_xlsx(file_path):
+        def reader():
+            return read_xlsx(file_path)
+    else:
+        def reader():
+            return pd.read_excel(file_path)
+    if parse_cache is None:
+        return reader()
+    return parse_cache.load(file_path, reader)
+
+
+def iter_data_files(file_paths, max_workers=None, parse_cache=None):
+    """
+    Restituisce (percorso, DataFrame, errore) per ogni file, nell'ordine
+    di completamento. Con più file e più processi disponibili la lettura
+    avviene in parallelo.
+    """
+    if max_workers is None:
+        max_workers = default_max_workers()
+
+    if max_workers <= 1 or len(file_paths) <= 1:
+        for file_path in file_paths:
+            try:
+                yield file_path, read_data_file(file_path, parse_cache), None
+            except Exception as e:
+                yield file_path, None, e
+        return
+
+    workers = min(max_workers, len(file_paths))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(read_data_file, file_path, parse_cache): file_path
+            for file_path in file_paths
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
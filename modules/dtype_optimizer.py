@@ -0,0 +1,145 @@
+"""
+Modulo per la riduzione della memoria dei DataFrame caricati.
+Interi ridotti fino a int32, float64 convertiti in float32 solo se
+senza perdita, testi ripetuti in categorie e date testuali convertite
+in datetime una volta sola.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# Sotto int32 le operazioni aritmetiche dell'utente andrebbero in overflow
+MIN_INT_DTYPE = np.int32
+# Testi convertiti in categoria se i valori distinti sono al massimo
+# questa frazione delle righe
+CATEGORY_RATIO = 0.5
+# Valori controllati prima di tentare la conversione in date
+DATE_SAMPLE = 1000
+# Formati di data accettati (anno sempre a quattro cifre), ciascuno con
+# l'espressione che lo riconosce: la conversione usa solo format=
+DATE_FORMATS = [
+    (re.compile(r'^\d{4}-\d{2}-\d{2}$'), '%Y-%m-%d'),
+    (re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$'),
+     '%Y-%m-%d %H:%M:%S'),
+    (re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}$'),
+     '%Y-%m-%dT%H:%M:%S'),
+    (re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{1,6}$'),
+     '%Y-%m-%d %H:%M:%S.%f'),
+    (re.compile(r'^\d{4}/\d{2}/\d{2}$'), '%Y/%m/%d'),
+    # Export italiani: giorno prima del mese
+    (re.compile(r'^\d{1,2}/\d{1,2}/\d{4}$'), '%d/%m/%Y'),
+    (re.compile(r'^\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}$'),
+     '%d/%m/%Y %H:%M'),
+    (re.compile(r'^\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}:\d{2}$'),
+     '%d/%m/%Y %H:%M:%S'),
+    (re.compile(r'^\d{1,2}\.\d{1,2}\.\d{4}$'), '%d.%m.%Y'),
+    (re.compile(r'^\d{1,2}-\d{1,2}-\d{4}$'), '%d-%m-%Y'),
+]
+
+
+def optimize_series(series, category_ratio=CATEGORY_RATIO,
+                    parse_dates=True):
+    """Restituisce la colonna con il dtype più compatto equivalente."""
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'iu':
+        return _downcast_int(series)
+    if isinstance(dtype, np.dtype) and dtype == np.float64:
+        return _downcast_float(series)
+    if dtype == object or pd.api.types.is_string_dtype(dtype):
+        return _optimize_text(series, category_ratio, parse_dates)
+    return series
+
+
+def _downcast_int(series):
+    if series.empty:
+        return series
+    if series.dtype.itemsize <= np.dtype(MIN_INT_DTYPE).itemsize:
+        return series
+    info = np.iinfo(MIN_INT_DTYPE)
+    if info.min <= series.min() and series.max() <= info.max:
+        return series.astype(MIN_INT_DTYPE)
+    return series
+
+
+def _downcast_float(series):
+    values = series.to_numpy()
+    narrow = values.astype(np.float32)
+    if np.array_equal(narrow.astype(np.float64), values, equal_nan=True):
+        return pd.Series(narrow, index=series.index, name=series.name)
+    return series
+
+
+def _optimize_text(series, category_ratio, parse_dates):
+    values = series.dropna()
+    if values.empty:
+        return series
+    if pd.api.types.infer_dtype(values, skipna=True) != 'string':
+        return series  # Colonna mista: lasciata invariata
+
+    if parse_dates:
+        parsed = _parse_dates(series, values)
+        if parsed is not None:
+            return parsed
+
+    if values.nunique() <= category_ratio * len(series):
+        category = series.astype('category')
+        if (category.memory_usage(deep=True)
+                < series.memory_usage(deep=True)):
+            return category
+    return series
+
+
+def _parse_dates(series, values):
+    """
+    Date della colonna se tutti i valori non nulli rispettano uno stesso
+    formato di DATE_FORMATS; None altrimenti (colonna lasciata testo).
+    """
+    first = values.iloc[0]
+    sample = values.iloc[:DATE_SAMPLE]
+    for pattern, date_format in DATE_FORMATS:
+        if not pattern.match(first):
+            continue
+        # Controllo rapido sul campione, poi conversione di tutti i valori
+        if not all(pattern.match(value) for value in sample):
+            return None
+        parsed = pd.to_datetime(series, format=date_format, errors='coerce')
+        if parsed.notna().sum() == len(values):
+            return parsed
+        return None
+    return None
+
+
+def optimize_dtypes(df, category_ratio=CATEGORY_RATIO, parse_dates=True):
+    """
+    Ottimizza i dtype di tutte le colonne.
+    Restituisce (DataFrame, report) con la memoria prima e dopo
+    (memory_usage deep) e le colonne convertite.
+    """
+    before = int(df.memory_usage(deep=True).sum())
+    data = {}
+    converted = {}
+    for i in range(df.shape[1]):
+        series = df.iloc[:, i]
+        optimized = optimize_series(series, category_ratio, parse_dates)
+        if optimized is not series:
+            converted[df.columns[i]] = f'{series.dtype} -> {optimized.dtype}'
+        data[i] = optimized
+    if converted:
+        result = pd.DataFrame(data, index=df.index, copy=False)
+        result.columns = df.columns
+    else:
+        result = df
+    report = {
+        'before': before,
+        'after': int(result.memory_usage(deep=True).sum()),
+        'converted': converted,
+    }
+    return result, report
+
+
+def format_memory_report(report):
+    """Testo per la status bar: memoria prima e dopo l'ottimizzazione"""
+    before = report['before'] / 1024 / 1024
+    after = report['after'] / 1024 / 1024
+    return f'memoria {before:.1f} MB → {after:.1f} MB'
@@ -1,22 +1,67 @@
 """
 Modulo per la gestione di file Excel: caricamento, salvataggio, filtri rapidi.
 """
+import operator
+
+import numpy as np
 import pandas as pd
 
+from modules.dtype_optimizer import optimize_dtypes
+from modules.parse_cache import ParseCache
+from modules.xlsx_reader import is_xlsx, read_xlsx
+
 
 class ExcelHandler:
-    def __init__(self):
+    OPERATORS = {
+        '=': operator.eq,
+        '!=': operator.ne,
+        '>': operator.gt,
+        '<': operator.lt,
+        '>=': operator.ge,
+        '<=': operator.le,
+    }
+
+    def __init__(self, parse_cache=None, optimize_dtypes=True):
+        # Cache su disco dei file già letti (None: cache predefinita)
+        if parse_cache is None:
+            parse_cache = ParseCache()
+        self.parse_cache = parse_cache
+        # Riduzione della memoria dopo il caricamento
+        self.optimize_dtypes = optimize_dtypes
+        self.memory_report = None
         self.df = None
         self.filtered_df = None
         self.filters = []  # Lista di tuple (colonna, operatore, valore)
+        # Uno stato per filtro attivo: {'mask': maschera cumulativa sulle
+        # righe di df, 'df': risultato materializzato o None}
+        self.filter_stack = []
+        # Incrementata a ogni modifica di filtered_df (usata dalle cache)
+        self.data_version = 0
 
-    def load_excel(self, file_path):
-        """Carica un file Excel in un DataFrame."""
-        self.df = pd.read_excel(file_path)
-        self.filtered_df = self.df.copy()
+    def load_excel(self, file_path, nrows=None):
+        """
+        Carica un file Excel in un DataFrame.
+        I file .xlsx sono letti in streaming; nrows limita le righe lette.
+        """
+        df = self.parse_cache.load(
+            file_path, lambda: self._read_file(file_path, nrows),
+            extra=f'nrows={nrows}'
+        )
+        if self.optimize_dtypes:
+            df, self.memory_report = optimize_dtypes(df)
+        self.df = df
+        self.filtered_df = self.df
         self.filters = []
+        self.filter_stack = []
+        self.data_version += 1
         return self.df
 
+    @staticmethod
+    def _read_file(file_path, nrows=None):
+        if is_xlsx(file_path):
+            return read_xlsx(file_path, nrows=nrows)
+        return pd.read_excel(file_path, nrows=nrows)
+
     def save_excel(self, file_path):
         """Salva il DataFrame filtrato su file Excel."""
         if self.filtered_df is not None:
@@ -24,32 +69,101 @@ class ExcelHandler:
 
     def apply_filters(self, filters):
         """Applica filtri cumulativi e restituisce il DataFrame filtrato."""
-        df = self.df.copy()
+        # Un'unica maschera combinata e una sola selezione finale,
+        # invece di una copia del DataFrame per ogni filtro
+        mask = np.ones(len(self.df), dtype=bool)
+        stack = []
         for col, op, val in filters:
-            if op == '=':
-                df = df[df[col] == val]
-            elif op == '!=':
-                df = df[df[col] != val]
-            elif op == '>':
-                df = df[df[col] > val]
-            elif op == '<':
-                df = df[df[col] < val]
-            elif op == '>=':
-                df = df[df[col] >= val]
-            elif op == '<=':
-                df = df[df[col] <= val]
-            elif op == 'contiene':
-                df = df[df[col].astype(str).str.contains(
-                    str(val), case=False, na=False
-                )]
-            elif op == 'non contiene':
-                df = df[~df[col].astype(str).str.contains(
-                    str(val), case=False, na=False
-                )]
+            filter_mask = self.filter_mask(self.df[col], op, val)
+            if filter_mask is not None:
+                mask &= filter_mask
+            stack.append({'mask': mask.copy(), 'df': None})
+        df = self.df[mask]
+        if stack:
+            stack[-1]['df'] = df
+        self.filters = list(filters)
+        self.filter_stack = stack
         self.filtered_df = df
+        self.data_version += 1
         return df
 
+    def add_filter(self, col, op, val):
+        """
+        Aggiunge un filtro valutandolo solo sulle righe già filtrate.
+        """
+        current = self.filtered_df
+        rows = (
+            self.filter_stack[-1]['mask'] if self.filter_stack
+            else np.ones(len(self.df), dtype=bool)
+        )
+        filter_mask = self.filter_mask(current[col], op, val)
+        if filter_mask is None:
+            mask, df = rows, current
+        else:
+            mask = np.zeros_like(rows)
+            mask[np.flatnonzero(rows)[filter_mask]] = True
+            df = current[filter_mask]
+        self.filters.append((col, op, val))
+        self.filter_stack.append({'mask': mask, 'df': df})
+        self.filtered_df = df
+        self.data_version += 1
+        return df
+
+    def remove_last_filter(self):
+        """Rimuove l'ultimo filtro ripristinando il risultato precedente."""
+        if not self.filter_stack:
+            return self.filtered_df
+        self.filters.pop()
+        self.filter_stack.pop()
+        if self.filter_stack:
+            previous = self.filter_stack[-1]
+            if previous['df'] is None:
+                previous['df'] = self.df[previous['mask']]
+            self.filtered_df = previous['df']
+        else:
+            self.filtered_df = self.df
+        self.data_version += 1
+        return self.filtered_df
+
+    def filter_mask(self, series, op, val):
+        """
+        Restituisce la maschera booleana NumPy di un singolo filtro,
+        o None se l'operatore non è riconosciuto.
+        """
+        if op in ('contiene', 'non contiene'):
+            mask = series.astype(str).str.contains(
+                str(val), case=False, na=False
+            ).to_numpy(dtype=bool)
+            return ~mask if op == 'non contiene' else mask
+        compare = self.OPERATORS.get(op)
+        if compare is None:
+            return None
+        val = self.coerce_value(series, val)
+        if (isinstance(series.dtype, pd.CategoricalDtype)
+                and op not in ('=', '!=')):
+            # Le categorie non ordinate non supportano < e >
+            series = series.astype(series.cat.categories.dtype)
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'iufb':
+            return np.asarray(compare(series.to_numpy(), val), dtype=bool)
+        return compare(series, val).to_numpy(dtype=bool, na_value=False)
+
+    @staticmethod
+    def coerce_value(series, val):
+        """Converte una volta sola il valore del filtro nel tipo colonna."""
+        if not isinstance(val, str):
+            return val
+        try:
+            if pd.api.types.is_bool_dtype(series):
+                return val
+            if pd.api.types.is_numeric_dtype(series):
+                return pd.to_numeric(val)
+        except (ValueError, TypeError):
+            pass
+        return val
+
     def clear_filters(self):
         self.filters = []
-        self.filtered_df = self.df.copy()
+        self.filter_stack = []
+        self.filtered_df = self.df
+        self.data_version += 1
         return self.filtered_df
@@ -0,0 +1,245 @@
+"""
+Modulo per il controllo della memoria occupata dai DataFrame.
+I DataFrame registrati nel governor vengono misurati; quando il totale
+supera memory_limit_mb (config.ini [PERFORMANCE]) i meno usati di recente
+sono scaricati su disco e riletti automaticamente al primo accesso.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+import pandas as pd
+
+from modules.parse_cache import read_frame, write_frame
+from modules.settings import load_config
+
+DEFAULT_SPILL_DIR = os.path.join(tempfile.gettempdir(), 'exceltools_spill')
+
+
+def frame_size(value):
+    """Memoria occupata da un DataFrame (0 per gli altri oggetti)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    return 0
+
+
+class MemoryGovernor:
+    """
+    Tiene traccia dei DataFrame per chiave, in ordine LRU.
+    Le cache ricalcolabili (ad es. risultati di query) possono essere
+    aggiunte con add_cache: vengono svuotate prima di scaricare dati.
+    Gli oggetti che tengono altri riferimenti ai DataFrame (ad es.
+    QueryEngine) si aggiungono con add_holder e li rilasciano quando il
+    DataFrame viene scaricato.
+    """
+
+    def __init__(self, limit_bytes, spill_dir=DEFAULT_SPILL_DIR):
+        self.limit_bytes = limit_bytes
+        self.spill_dir = os.path.join(spill_dir, uuid.uuid4().hex)
+        self.spills = 0
+        self.reloads = 0
+        self._entries = OrderedDict()  # chiave -> [valore, dimensione]
+        self._spilled = {}  # chiave -> cartella su disco
+        self._caches = []
+        self._holders = []
+        self._lock = threading.RLock()
+        # I file scaricati non servono oltre la durata del processo
+        atexit.register(self.close)
+
+    @classmethod
+    def from_config(cls, config=None, spill_dir=DEFAULT_SPILL_DIR):
+        """Governor con il limite di config.ini [PERFORMANCE]."""
+        config = config or load_config()
+        limit_mb = config.getint(
+            'PERFORMANCE', 'memory_limit_mb', fallback=2048
+        )
+        return cls(limit_mb * 1024 * 1024, spill_dir)
+
+    def add_cache(self, cache):
+        """
+        Registra una cache con attributo current_bytes e metodo
+        invalidate(), svuotata per prima quando si supera il limite.
+        """
+        self._caches.append(cache)
+
+    def add_holder(self, holder):
+        """
+        Registra un oggetto con metodo release(value): chiamato quando
+        value viene scaricato, perché lasci il suo riferimento (altrimenti
+        la memoria resterebbe occupata).
+        """
+        self._holders.append(holder)
+
+    def put(self, key, value):
+        """Registra (o sostituisce) il valore della chiave."""
+        with self._lock:
+            self._drop_spilled(key)
+            if value is None:
+                self._entries.pop(key, None)
+                # Oggetti prima condivisi ora possono essere scaricati
+                self.enforce()
+                return
+            self._entries[key] = [value, frame_size(value)]
+            self._entries.move_to_end(key)
+            self.enforce(protect=key)
+
+    def get(self, key, default=None):
+        """Valore della chiave, riletto dal disco se era stato scaricato."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+            entry_dir = self._spilled.pop(key, None)
+            if entry_dir is None:
+                return default
+            value = read_frame(entry_dir)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            self.reloads += 1
+            self._entries[key] = [value, frame_size(value)]
+            self.enforce(protect=key)
+            return value
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._drop_spilled(key)
+
+    def __contains__(self, key):
+        return key in self._entries or key in self._spilled
+
+    def usage(self):
+        """Byte in memoria: ogni oggetto condiviso da più chiavi conta una
+        volta sola, più le cache registrate."""
+        seen = set()
+        total = 0
+        for value, size in self._entries.values():
+            if id(value) not in seen:
+                seen.add(id(value))
+                total += size
+        return total + sum(cache.current_bytes for cache in self._caches)
+
+    def enforce(self, protect=None):
+        """Rientra nel limite: prima le cache, poi i DataFrame meno usati."""
+        with self._lock:
+            if self.usage() <= self.limit_bytes:
+                return
+            for cache in self._caches:
+                cache.invalidate()
+            for key in list(self._entries):
+                if self.usage() <= self.limit_bytes:
+                    break
+                if key != protect:
+                    self._spill(key)
+
+    def _spill(self, key):
+        value, size = self._entries[key]
+        if not isinstance(value, pd.DataFrame) or size == 0:
+            return
+        # Un oggetto ancora referenziato da un'altra chiave non libera
+        # memoria se scaricato
+        shared = any(
+            other is value for k, (other, _) in self._entries.items()
+            if k != key
+        )
+        if shared:
+            return
+        entry_dir = os.path.join(self.spill_dir, uuid.uuid4().hex)
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            write_frame(entry_dir, value)
+        except Exception:
+            return  # Disco non disponibile: il DataFrame resta in memoria
+        for holder in self._holders:
+            holder.release(value)
+        del self._entries[key]
+        self._spilled[key] = entry_dir
+        self.spills += 1
+
+    def _drop_spilled(self, key):
+        entry_dir = self._spilled.pop(key, None)
+        if entry_dir is not None:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+    def stats(self):
+        return {
+            'bytes': self.usage(),
+            'limit_bytes': self.limit_bytes,
+            'in_memory': len(self._entries),
+            'spilled': len(self._spilled),
+            'spills': self.spills,
+            'reloads': self.reloads,
+        }
+
+    def close(self):
+        """Elimina i file scaricati su disco."""
+        with self._lock:
+            self._entries.clear()
+            self._spilled.clear()
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+
+class GovernedAttribute:
+    """
+    Attributo di istanza conservato nel MemoryGovernor dell'oggetto
+    (attributo memory_governor): assegnazione e lettura restano invariate.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return obj.memory_governor.get(self.name)
+
+    def __set__(self, obj, value):
+        obj.memory_governor.put(self.name, value)
+
+
+class GovernedDict(MutableMapping):
+    """
+    Dizionario i cui valori sono conservati nel MemoryGovernor.
+    Con field i valori sono dizionari e solo value[field] (il DataFrame)
+    passa dal governor; gli altri campi restano in memoria.
+    """
+
+    def __init__(self, governor, prefix, field=None):
+        self.governor = governor
+        self.prefix = prefix
+        self.field = field
+        self._items = {}  # chiave -> campi rimanenti (o None)
+
+    def _key(self, key):
+        return f'{self.prefix}:{key}'
+
+    def __getitem__(self, key):
+        extra = self._items[key]
+        value = self.governor.get(self._key(key))
+        if self.field is None:
+            return value
+        return dict(extra, **{self.field: value})
+
+    def __setitem__(self, key, value):
+        if self.field is not None:
+            extra = dict(value)
+            value = extra.pop(self.field)
+        else:
+            extra = None
+        self._items[key] = extra
+        self.governor.put(self._key(key), value)
+
+    def __delitem__(self, key):
+        del self._items[key]
+        self.governor.discard(self._key(key))
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,217 @@
+"""
+Modulo per la cache su disco dei file già letti.
+Ogni DataFrame viene salvato per colonne (file .npy) in una cartella
+identificata dall'impronta del file sorgente e riletto in memory-map.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser('~'), '.exceltools', 'parse_cache'
+)
+# Byte letti all'inizio e alla fine del file per l'impronta del contenuto
+SAMPLE_BYTES = 1024 * 1024
+META_FILE = 'meta.pkl'
+# Colonne più piccole rilette in memoria: un file aperto in memory-map
+# non si può cancellare su Windows finché il DataFrame resta in uso
+MMAP_MIN_BYTES = 1024 * 1024
+
+logger = logging.getLogger('ParseCache')
+
+
+def file_fingerprint(file_path, extra=''):
+    """
+    Impronta del file: percorso, dimensione, mtime e hash del contenuto
+    (primo e ultimo MB). extra distingue letture diverse dello stesso file
+    (foglio, nrows, ...).
+    """
+    stat = os.stat(file_path)
+    digest = hashlib.sha1()
+    digest.update(
+        f'{os.path.abspath(file_path)}|{stat.st_size}|'
+        f'{stat.st_mtime_ns}|{extra}'.encode('utf-8')
+    )
+    with open(file_path, 'rb') as f:
+        digest.update(f.read(SAMPLE_BYTES))
+        if stat.st_size > SAMPLE_BYTES:
+            f.seek(max(SAMPLE_BYTES, stat.st_size - SAMPLE_BYTES))
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def read_frame(entry):
+    """
+    Rilegge un DataFrame salvato con write_frame: colonne NumPy in
+    memory-map (copy-on-write) da MMAP_MIN_BYTES in su, le altre in
+    memoria o da pickle. None se assente.
+    """
+    meta_path = os.path.join(entry, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, 'rb') as f:
+        meta = pickle.load(f)
+    data = {}
+    for i in range(len(meta['columns'])):
+        if i in meta['objects']:
+            data[i] = meta['objects'][i]
+        else:
+            path = os.path.join(entry, f'{i}.npy')
+            if os.path.getsize(path) < MMAP_MIN_BYTES:
+                data[i] = np.load(path)
+            else:
+                data[i] = np.load(path, mmap_mode='c')
+    df = pd.DataFrame(data, index=meta['index'], copy=False)
+    df.columns = meta['columns']
+    return df
+
+
+def write_frame(entry, df, source=''):
+    """
+    Salva il DataFrame per colonne nella cartella entry. La scrittura
+    avviene in una cartella temporanea resa visibile in modo atomico.
+    """
+    tmp = f'{entry}.tmp{os.getpid()}'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    try:
+        objects = {}
+        for i in range(df.shape[1]):
+            column = df.iloc[:, i]
+            dtype = column.dtype
+            if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+                np.save(os.path.join(tmp, f'{i}.npy'), column.to_numpy())
+            else:
+                objects[i] = column.array
+        meta = {
+            'source': source,
+            'columns': df.columns,
+            'index': df.index,
+            'objects': objects,
+        }
+        with open(os.path.join(tmp, META_FILE), 'wb') as f:
+            pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+class ParseCache:
+    """
+    Cache LRU su disco dei DataFrame letti, limitata a max_bytes.
+    Le colonne NumPy sono salvate in formato .npy e rilette in memory-map
+    (copy-on-write); le altre colonne sono serializzate con pickle.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR,
+                 max_bytes=2 * 1024 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def load(self, file_path, reader, extra=''):
+        """
+        Restituisce il DataFrame dalla cache, oppure lo legge con reader()
+        e lo salva per le aperture successive.
+        """
+        df = self.get(file_path, extra)
+        if df is None:
+            df = reader()
+            self.put(file_path, df, extra)
+        return df
+
+    def get(self, file_path, extra=''):
+        """DataFrame in cache per il file, o None."""
+        return self._read_entry(file_fingerprint(file_path, extra))
+
+    def put(self, file_path, df, extra=''):
+        """Salva il DataFrame letto dal file e applica il limite di spazio."""
+        self._write_entry(file_fingerprint(file_path, extra), df, file_path)
+        self.evict()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def _read_entry(self, key):
+        entry = self._entry_dir(key)
+        try:
+            df = read_frame(entry)
+        except Exception:
+            # Voce corrotta o incompleta: verrà riscritta
+            self._remove_entry(entry)
+            return None
+        if df is not None:
+            # Aggiorna l'ordine LRU
+            os.utime(os.path.join(entry, META_FILE))
+        return df
+
+    def _write_entry(self, key, df, file_path):
+        try:
+            write_frame(
+                self._entry_dir(key), df, os.path.abspath(file_path)
+            )
+        except Exception:
+            pass  # La cache è facoltativa
+
+    def _remove_entry(self, entry):
+        """
+        Elimina la voce; False se resta su disco (su Windows i file ancora
+        aperti in memory-map non si cancellano). Senza meta.pkl la voce
+        non viene più letta e la rimozione si ripete al prossimo evict.
+        """
+        try:
+            os.remove(os.path.join(entry, META_FILE))
+        except OSError:
+            pass
+        shutil.rmtree(entry, ignore_errors=True)
+        if os.path.exists(entry):
+            logger.warning(f'Voce della cache ancora in uso: {entry}')
+            return False
+        return True
+
+    def _remove_orphans(self):
+        """Ritenta la rimozione delle voci rimaste senza meta.pkl."""
+        for name in os.listdir(self.cache_dir):
+            entry = os.path.join(self.cache_dir, name)
+            # Le cartelle .tmp sono scritture in corso di write_frame
+            if ('.tmp' not in name and os.path.isdir(entry)
+                    and not os.path.exists(os.path.join(entry, META_FILE))):
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def entries(self):
+        """Voci in cache come (ultimo accesso, dimensione, percorso)."""
+        result = []
+        for name in os.listdir(self.cache_dir):
+            entry = os.path.join(self.cache_dir, name)
+            meta_path = os.path.join(entry, META_FILE)
+            if not os.path.exists(meta_path):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(entry, f))
+                for f in os.listdir(entry)
+            )
+            result.append((os.path.getmtime(meta_path), size, entry))
+        return result
+
+    def evict(self):
+        """Elimina le voci meno usate finché si rientra in max_bytes."""
+        self._remove_orphans()
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove_entry(entry):
+                total -= size
+
+    def clear(self):
+        self._remove_orphans()
+        for _, _, entry in self.entries():
+            self._remove_entry(entry)
@@ -1,13 +1,145 @@
 """
 Modulo per parsing, esecuzione e validazione query SQL-like su DataFrame.
 """
-import pandasql
+import sqlite3
+from collections import OrderedDict
+
+import pandas as pd
 import sqlparse
+from sqlparse import tokens as T
+
+
+class QueryEngine:
+    """
+    Sessione SQLite in memoria di lunga durata.
+    Il DataFrame viene registrato come tabella 'df' una sola volta e
+    riscritto solo quando cambia, invece di essere copiato a ogni query.
+    """
+
+    TABLE_NAME = 'df'
+
+    def __init__(self):
+        self.conn = sqlite3.connect(':memory:', check_same_thread=False)
+        self._registered_df = None
+
+    def register(self, df):
+        """Registra il DataFrame come tabella 'df' se non è già presente."""
+        if df is self._registered_df:
+            return
+        self.conn.execute('PRAGMA query_only = OFF')
+        # Come pandasql: l'indice viene scritto solo se tutti i livelli
+        # hanno un nome
+        index = not any(name is None for name in df.index.names)
+        df.to_sql(self.TABLE_NAME, self.conn, if_exists='replace', index=index)
+        # Le query utente non possono modificare la tabella registrata
+        self.conn.execute('PRAGMA query_only = ON')
+        self._registered_df = df
+
+    def execute(self, query):
+        """Esegue la query sulla tabella registrata."""
+        return pd.read_sql_query(query, self.conn)
+
+    def reset(self):
+        """Rimuove la tabella registrata."""
+        self.conn.execute('PRAGMA query_only = OFF')
+        self.conn.execute(f'DROP TABLE IF EXISTS {self.TABLE_NAME}')
+        # Restituisce le pagine della tabella eliminata
+        self.conn.execute('VACUUM')
+        self._registered_df = None
+
+    def release(self, df):
+        """Rimuove la tabella se registrata da df (scaricato dal
+        MemoryGovernor): verrà riscritta alla prossima query."""
+        if df is self._registered_df:
+            self.reset()
+
+    def close(self):
+        self.conn.close()
+        self._registered_df = None
+
+
+class ResultCache:
+    """
+    Cache LRU dei risultati delle query, legata a una versione dei dati.
+    Quando la versione cambia (nuovo file o nuovi filtri) la cache viene
+    svuotata. La memoria occupata è limitata da max_bytes.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.data_version = None
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # chiave -> (risultato, dimensione)
+
+    @staticmethod
+    def normalize(statements):
+        """Chiave normalizzata a partire dagli statement di sqlparse."""
+        parts = []
+        for stmt in statements:
+            for token in stmt.flatten():
+                if token.is_whitespace or token.ttype in T.Comment:
+                    continue
+                if token.is_keyword:
+                    parts.append(token.normalized)
+                else:
+                    parts.append(token.value)
+        while parts and parts[-1] == ';':
+            parts.pop()
+        return ' '.join(parts)
+
+    def get(self, key, data_version):
+        if data_version != self.data_version:
+            self.invalidate()
+            self.data_version = data_version
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, result, data_version):
+        if data_version != self.data_version or result is None:
+            return
+        size = int(result.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (result, size)
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            _, (_, old_size) = self._entries.popitem(last=False)
+            self.current_bytes -= old_size
+
+    def invalidate(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+        }
 
 
 class QueryHandler:
-    def __init__(self, excel_handler):
+    def __init__(self, excel_handler, cache_max_bytes=256 * 1024 * 1024,
+                 memory_governor=None):
         self.excel_handler = excel_handler
+        self.engine = QueryEngine()
+        self.cache = ResultCache(cache_max_bytes)
+        # La cache dei risultati conta nel limite di memoria complessivo;
+        # la tabella registrata viene rilasciata con il DataFrame scaricato
+        if memory_governor is not None:
+            memory_governor.add_cache(self.cache)
+            memory_governor.add_holder(self.engine)
 
     def run_query(self, query):
         """Esegue una query SQL-like sul DataFrame filtrato."""
@@ -16,9 +148,17 @@ class QueryHandler:
             parsed = sqlparse.parse(query)
             if not parsed:
                 return None, 'Query vuota o non valida.'
+            # Risultato già calcolato sulla stessa versione dei dati
+            key = self.cache.normalize(parsed)
+            version = self.excel_handler.data_version
+            result = self.cache.get(key, version)
+            if result is not None:
+                return result, None
             # Esegui query su DataFrame filtrato
             df = self.excel_handler.filtered_df
-            result = pandasql.sqldf(query, {'df': df})
+            self.engine.register(df)
+            result = self.engine.execute(query)
+            self.cache.put(key, result, version)
             return result, None
         except Exception as e:
             return None, f'Errore query: {str(e)}'
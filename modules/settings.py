@@ -0,0 +1,19 @@
+"""
+Modulo per la lettura delle impostazioni da config.ini.
+"""
+import configparser
+import os
+
+CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.ini'
+)
+
+
+def load_config(path=None):
+    """
+    Legge config.ini e restituisce un ConfigParser.
+    Se il file non esiste il parser è vuoto: usare sempre fallback=...
+    """
+    config = configparser.ConfigParser()
+    config.read(path or CONFIG_PATH, encoding='utf-8')
+    return config
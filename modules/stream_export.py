@@ -0,0 +1,175 @@
+"""
+Modulo per l'esportazione a blocchi di DataFrame e cursori SQL.
+Il CSV viene scritto un blocco alla volta e l'XLSX in modalità
+constant_memory (xlsxwriter, oppure openpyxl write_only se assente),
+passando a un nuovo foglio al limite di righe di Excel.
+"""
+import pandas as pd
+
+try:
+    import xlsxwriter
+    HAS_XLSXWRITER = True
+except ImportError:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+    HAS_XLSXWRITER = False
+
+# Righe per foglio in Excel (intestazione compresa)
+EXCEL_MAX_ROWS = 1048576
+CHUNK_ROWS = 50000
+
+HEADER_STYLE = {
+    'bold': True, 'bg_color': '#4F81BD', 'font_color': 'white'
+}
+
+
+def frame_chunks(df, chunk_size=CHUNK_ROWS):
+    """Blocchi di righe di un DataFrame (viste, senza copie)"""
+    if df.empty:
+        yield df
+        return
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def cursor_chunks(cursor, chunk_size=CHUNK_ROWS):
+    """Blocchi da un cursore già eseguito (almeno uno, per le intestazioni)"""
+    columns = (
+        [d[0] for d in cursor.description] if cursor.description else []
+    )
+    empty = True
+    while columns:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        empty = False
+        yield pd.DataFrame.from_records(rows, columns=columns)
+    if empty:
+        yield pd.DataFrame(columns=columns)
+
+
+def as_chunks(source, chunk_size=CHUNK_ROWS):
+    """
+    Blocchi da esportare: source può essere un DataFrame, un oggetto con
+    iter_chunks o un iterabile di DataFrame.
+    """
+    if isinstance(source, pd.DataFrame):
+        return frame_chunks(source, chunk_size)
+    if hasattr(source, 'iter_chunks'):
+        return source.iter_chunks(chunk_size)
+    return iter(source)
+
+
+def to_frame(source):
+    """DataFrame completo, per i formati che non si scrivono a blocchi"""
+    if isinstance(source, pd.DataFrame):
+        return source
+    return pd.concat(list(as_chunks(source)), ignore_index=True)
+
+
+def export_csv(source, file_path, sep=',', encoding='utf-8',
+               chunk_size=CHUNK_ROWS):
+    """Scrive il CSV un blocco alla volta; restituisce le righe scritte"""
+    rows = 0
+    with open(file_path, 'w', newline='', encoding=encoding) as f:
+        for index, chunk in enumerate(as_chunks(source, chunk_size)):
+            chunk.to_csv(f, sep=sep, index=False, header=index == 0)
+            rows += len(chunk)
+    return rows
+
+
+def cell_rows(chunk):
+    """Valori Python delle righe (NaN/NaT -> cella vuota, durate come testo)"""
+    for column, dtype in chunk.dtypes.items():
+        if pd.api.types.is_timedelta64_dtype(dtype):
+            chunk = chunk.assign(**{column: chunk[column].astype(str)})
+    return chunk.astype(object).where(chunk.notna(), None).values.tolist()
+
+
+class XlsxStreamWriter:
+    """Cartella .xlsx scritta riga per riga, un foglio ogni EXCEL_MAX_ROWS"""
+
+    def __init__(self, file_path, sheet_name='Data', add_formatting=False,
+                 max_rows=EXCEL_MAX_ROWS):
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self.add_formatting = add_formatting
+        self.max_rows = max_rows
+        self.columns = None
+        self.sheets = 0
+        self.rows = 0
+        self._sheet = None
+        self._sheet_row = 0
+        if HAS_XLSXWRITER:
+            self._book = xlsxwriter.Workbook(file_path, {
+                'constant_memory': True,
+                'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+                'remove_timezone': True,
+            })
+            self._header_format = (
+                self._book.add_format(HEADER_STYLE) if add_formatting
+                else None
+            )
+        else:
+            self._book = Workbook(write_only=True)
+
+    def _new_sheet(self):
+        self.sheets += 1
+        suffix = f"_{self.sheets}" if self.sheets > 1 else ""
+        title = self.sheet_name[:31 - len(suffix)] + suffix
+        header = [str(col) for col in self.columns]
+        if HAS_XLSXWRITER:
+            self._sheet = self._book.add_worksheet(title)
+            self._sheet.write_row(0, 0, header, self._header_format)
+        else:
+            self._sheet = self._book.create_sheet(title)
+            if self.add_formatting:
+                header = [self._styled_header(value) for value in header]
+            self._sheet.append(header)
+        self._sheet_row = 1
+
+    def _styled_header(self, value):
+        cell = WriteOnlyCell(self._sheet, value=value)
+        cell.font = Font(bold=True, color='FFFFFF')
+        cell.fill = PatternFill('solid', fgColor='4F81BD')
+        return cell
+
+    def write_frame(self, chunk):
+        """Accoda le righe del blocco (il primo fissa le intestazioni)"""
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+            self._new_sheet()
+        for values in cell_rows(chunk):
+            if self._sheet_row >= self.max_rows:
+                self._new_sheet()
+            if HAS_XLSXWRITER:
+                self._sheet.write_row(self._sheet_row, 0, values)
+            else:
+                self._sheet.append(values)
+            self._sheet_row += 1
+        self.rows += len(chunk)
+
+    def close(self):
+        if self.columns is None:
+            self.columns = []
+            self._new_sheet()
+        if HAS_XLSXWRITER:
+            self._book.close()
+        else:
+            self._book.save(self.file_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_xlsx(source, file_path, sheet_name='Data', add_formatting=False,
+                chunk_size=CHUNK_ROWS):
+    """Scrive l'XLSX a memoria costante; restituisce le righe scritte"""
+    with XlsxStreamWriter(file_path, sheet_name, add_formatting) as writer:
+        for chunk in as_chunks(source, chunk_size):
+            writer.write_frame(chunk)
+    return writer.rows
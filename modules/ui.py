@@ -34,6 +34,8 @@ class ExcelToolsUI(ctk.CTkFrame):
         ).pack(side='left', padx=5)
         self.filter_counter = ctk.CTkLabel(file_frame, text='Filtri attivi: 0')
         self.filter_counter.pack(side='left', padx=10)
+        self.memory_label = ctk.CTkLabel(file_frame, text='')
+        self.memory_label.pack(side='left', padx=10)
 
         # Query controls
         query_frame = ctk.CTkFrame(self)
@@ -50,8 +52,9 @@ class ExcelToolsUI(ctk.CTkFrame):
         self.sql_label.pack(side='left', padx=10)
 
         # Data table
-        self.tree = ttk.Treeview(self, show='headings')
-        self.tree.pack(fill='both', expand=True, padx=10, pady=5)
+        self.table = VirtualTreeview(self)
+        self.table.pack(fill='both', expand=True, padx=10, pady=5)
+        self.tree = self.table.tree
 
     def import_excel(self):
         file_path = filedialog.askopenfilename(
@@ -61,6 +64,7 @@ class ExcelToolsUI(ctk.CTkFrame):
             self.excel_handler.load_excel(file_path)
             self.update_table(self.excel_handler.df)
             self.update_filter_counter()
+            self.update_memory_label()
 
     def save_excel(self):
         file_path = filedialog.asksaveasfilename(
@@ -90,13 +94,7 @@ class ExcelToolsUI(ctk.CTkFrame):
             self.update_table(result)
 
     def update_table(self, df):
-        self.tree.delete(*self.tree.get_children())
-        self.tree['columns'] = list(df.columns)
-        for col in df.columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=100)
-        for _, row in df.iterrows():
-            self.tree.insert('', 'end', values=list(row))
+        self.table.set_dataframe(df)
 
     def open_filter_dialog(self):
         FilterDialog(self, self.excel_handler)
@@ -108,11 +106,112 @@ class ExcelToolsUI(ctk.CTkFrame):
         self.update_table(self.excel_handler.df)
         self.update_filter_counter()
 
+    def update_memory_label(self):
+        report = self.excel_handler.memory_report
+        if report is None:
+            self.memory_label.configure(text='')
+            return
+        before = report['before'] / 1024 / 1024
+        after = report['after'] / 1024 / 1024
+        self.memory_label.configure(
+            text=f'Memoria: {before:.1f} MB -> {after:.1f} MB'
+        )
+
     def update_filter_counter(self):
         n = len(self.excel_handler.filters)
         self.filter_counter.configure(text=f'Filtri attivi: {n}')
 
 
+class VirtualTreeview(ttk.Frame):
+    """
+    Treeview virtualizzato: solo le righe visibili (più un margine di
+    overscan) esistono come item e vengono formattate dal DataFrame durante
+    lo scorrimento. La scrollbar riflette il numero reale di righe.
+    """
+
+    def __init__(self, master, overscan=20, column_width=100):
+        super().__init__(master)
+        self.overscan = overscan
+        self.column_width = column_width
+        self.df = None
+        self.top = 0  # Indice della prima riga visibile
+        self.visible_rows = 20
+        self.window = (0, 0)  # Righe presenti come item: [inizio, fine)
+
+        self.tree = ttk.Treeview(self, show='headings')
+        self.scrollbar = ttk.Scrollbar(
+            self, orient='vertical', command=self.on_scrollbar
+        )
+        self.scrollbar.pack(side='right', fill='y')
+        self.tree.pack(side='left', fill='both', expand=True)
+        self.tree.bind('<Configure>', self.on_resize)
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.tree.bind(sequence, self.on_mousewheel)
+
+    def set_dataframe(self, df):
+        """Mostra un nuovo DataFrame ripartendo dalla prima riga."""
+        self.df = df
+        self.top = 0
+        self.window = (0, 0)
+        self.tree.delete(*self.tree.get_children())
+        self.tree['columns'] = list(df.columns)
+        for col in df.columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=self.column_width)
+        self.render()
+
+    def total_rows(self):
+        return 0 if self.df is None else len(self.df)
+
+    def scroll_to(self, top):
+        max_top = max(0, self.total_rows() - self.visible_rows)
+        self.top = min(max(0, int(top)), max_top)
+        self.render()
+
+    def render(self):
+        """Aggiorna gli item solo se la finestra visibile non è coperta."""
+        total = self.total_rows()
+        bottom = min(total, self.top + self.visible_rows)
+        start, end = self.window
+        if not (start <= self.top and bottom <= end) or end > total:
+            start = max(0, self.top - self.overscan)
+            end = min(total, bottom + self.overscan)
+            self.tree.delete(*self.tree.get_children())
+            chunk = self.df.iloc[start:end]
+            for values in chunk.astype(str).to_numpy().tolist():
+                self.tree.insert('', 'end', values=values)
+            self.window = (start, end)
+        if end > start:
+            self.tree.yview_moveto((self.top - start) / (end - start))
+        if total:
+            self.scrollbar.set(self.top / total, bottom / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == 'moveto':
+            self.scroll_to(float(value) * self.total_rows())
+        elif action == 'scroll':
+            step = self.visible_rows if unit == 'pages' else 1
+            self.scroll_to(self.top + int(value) * step)
+
+    def on_mousewheel(self, event):
+        if event.num == 4:
+            delta = -3
+        elif event.num == 5:
+            delta = 3
+        else:
+            delta = -3 if event.delta > 0 else 3
+        self.scroll_to(self.top + delta)
+        return 'break'
+
+    def on_resize(self, event):
+        row_height = ttk.Style().lookup('Treeview', 'rowheight') or 20
+        # Una riga è occupata dall'intestazione
+        self.visible_rows = max(1, event.height // int(row_height) - 1)
+        self.scroll_to(self.top)
+
+
 class FilterDialog(ctk.CTkToplevel):
     def __init__(self, parent, excel_handler):
         super().__init__(parent)
@@ -158,10 +257,8 @@ class FilterDialog(ctk.CTkToplevel):
         op = self.op_var.get()
         val = self.val_var.get()
         if col and op and val:
-            self.excel_handler.filters.append((col, op, val))
-            self.excel_handler.apply_filters(self.excel_handler.filters)
+            self.excel_handler.add_filter(col, op, val)
 
     def remove_last_filter(self):
         if self.excel_handler.filters:
-            self.excel_handler.filters.pop()
-            self.excel_handler.apply_filters(self.excel_handler.filters)
+            self.excel_handler.remove_last_filter()
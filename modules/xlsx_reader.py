@@ -0,0 +1,142 @@
+"""
+Modulo per la lettura in streaming di file XLSX (openpyxl in sola lettura).
+Le righe vengono convertite a blocchi in colonne tipizzate, senza tenere in
+memoria il modello a oggetti dell'intera cartella di lavoro.
+"""
+from collections import defaultdict
+
+import openpyxl
+import pandas as pd
+
+XLSX_EXTENSIONS = ('.xlsx', '.xlsm')
+
+
+def is_xlsx(file_path):
+    return str(file_path).lower().endswith(XLSX_EXTENSIONS)
+
+
+def iter_xlsx_rows(file_path, sheet_name=None):
+    """
+    Restituisce le righe del foglio come tuple di valori, senza le celle
+    vuote in coda (come pd.read_excel).
+    """
+    workbook = openpyxl.load_workbook(
+        file_path, read_only=True, data_only=True
+    )
+    try:
+        sheet = (
+            workbook[sheet_name] if sheet_name is not None
+            else workbook.worksheets[0]
+        )
+        for row in sheet.iter_rows(values_only=True):
+            end = len(row)
+            while end and row[end - 1] is None:
+                end -= 1
+            yield row[:end]
+    finally:
+        workbook.close()
+
+
+def make_header(values):
+    """
+    Nomi colonna come pd.read_excel: 'Unnamed: n' per le celle vuote e
+    suffissi '.n' ai duplicati, saltando i nomi già presenti nella riga
+    (a, a, a.1 -> a, a.2, a.1).
+    """
+    names = [
+        f'Unnamed: {i}' if value is None or value == '' else value
+        for i, value in enumerate(values)
+    ]
+    unnamed = [i for i, value in enumerate(values)
+               if value is None or value == '']
+    order = [i for i in range(len(names)) if i not in unnamed] + unnamed
+    counts = defaultdict(int)
+    for i in order:
+        name = original = names[i]
+        count = counts[name]
+        while count > 0:
+            counts[original] = count + 1
+            name = f'{original}.{count}'
+            count = count + 1 if name in names else counts[name]
+        names[i] = name
+        counts[name] = count + 1
+    return names
+
+
+def iter_xlsx_chunks(file_path, sheet_name=None, chunk_size=10000,
+                     nrows=None):
+    """
+    Legge il foglio a blocchi di chunk_size righe, restituendo DataFrame
+    con i tipi dedotti sul singolo blocco (read_xlsx li ricalcola
+    sull'intero foglio). La prima riga è l'intestazione; nrows limita le
+    righe di dati lette (anteprima).
+    """
+    rows = iter_xlsx_rows(file_path, sheet_name)
+    try:
+        first = next(rows, None)
+        if first is None:
+            return
+        header = make_header(first)
+        width = len(header)
+        block = []
+        empty = []  # Righe vuote in attesa: scartate se in fondo al foglio
+        count = 0
+        for row in rows:
+            if nrows is not None and count + len(empty) >= nrows:
+                break
+            if not row:
+                empty.append(row)
+                continue
+            if len(row) > width:
+                header = make_header(
+                    list(header) + [None] * (len(row) - width)
+                )
+                width = len(header)
+            block.extend(empty)
+            count += len(empty)
+            empty = []
+            block.append(row)
+            count += 1
+            if len(block) >= chunk_size:
+                yield _block_to_frame(block, header, count - len(block))
+                block = []
+        if block or not count:
+            yield _block_to_frame(block, header, count - len(block))
+    finally:
+        rows.close()
+
+
+def _block_to_frame(block, header, start):
+    width = len(header)
+    records = [tuple(row) + (None,) * (width - len(row)) for row in block]
+    frame = pd.DataFrame.from_records(records, columns=header)
+    frame.index = pd.RangeIndex(start, start + len(frame))
+    return frame
+
+
+def read_xlsx(file_path, sheet_name=None, nrows=None, chunk_size=10000):
+    """Legge un foglio XLSX in un DataFrame (eventualmente solo nrows)."""
+    chunks = list(iter_xlsx_chunks(file_path, sheet_name, chunk_size, nrows))
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return _infer_columns(chunks[0])
+    header = list(chunks[-1].columns)
+    return _infer_columns(pd.concat(
+        [chunk.reindex(columns=header) for chunk in chunks]
+    ))
+
+
+def _infer_columns(frame):
+    """
+    Tipi dedotti una sola volta sull'intero foglio, come pd.read_excel:
+    un blocco senza valori non lascia la colonna object.
+    """
+    frame = frame.infer_objects()
+    if frame.empty:
+        return frame
+    for i in range(frame.shape[1]):
+        column = frame.iloc[:, i]
+        if column.dtype == object and column.isna().all():
+            frame.isetitem(i, column.astype('float64'))
+    return frame
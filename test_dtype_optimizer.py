@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST DTYPE OPTIMIZER
+=======================
+
+Controlli di regressione su modules.dtype_optimizer: codici e versioni
+che somigliano a date restano testo, le date vere sono convertite solo
+con un formato esplicito valido per tutti i valori.
+"""
+
+import sys
+import warnings
+
+import pandas as pd
+
+from modules.dtype_optimizer import optimize_series
+
+# (valori, dtype atteso: 'datetime' oppure 'text' = object/str/category)
+CASES = [
+    (['12-05-10', '01-02-03', '11-11-11'], 'text'),  # anno a due cifre
+    (['1.2.3', '1.2.4', '2.0.1'] * 3, 'text'),  # versioni
+    (['1.2.3'] * 5 + ['12.05.2010'], 'text'),  # codici con una data
+    (['12.05.2010'] * 5 + ['1.2.3'], 'text'),  # date con un codice
+    (['12.05.2010'] * 1500 + ['1.2.3'], 'text'),  # codice oltre il campione
+    (['2024-01-05', '2024-02-29', None], 'datetime'),
+    (['05/01/2024', '31/12/2023'], 'datetime'),
+    (['05/01/2024', '31/02/2024'], 'text'),  # 31 febbraio non esiste
+    (['12.05.2010', '01.02.2003'], 'datetime'),
+]
+
+
+def kind(series: pd.Series) -> str:
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return 'datetime'
+    return 'text'
+
+
+def test_date_detection() -> bool:
+    """Ogni caso produce il dtype atteso senza warning di pandas"""
+    print("🗓️ Riconoscimento date...")
+    success = True
+    for values, expected in CASES:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            result = optimize_series(pd.Series(values, dtype=object))
+        if kind(result) == expected:
+            print(f"   ✅ {values[:3]} -> {result.dtype}")
+        else:
+            print(f"   ❌ {values[:3]} -> {result.dtype} (atteso {expected})")
+            success = False
+    return success
+
+
+def test_day_first() -> bool:
+    """Date italiane: giorno prima del mese"""
+    print("\n🇮🇹 Giorno prima del mese...")
+    result = optimize_series(pd.Series(['05/01/2024', '31/12/2023']))
+    if result.iloc[0] == pd.Timestamp('2024-01-05'):
+        print("   ✅ 05/01/2024 -> 5 gennaio 2024")
+        return True
+    print(f"   ❌ 05/01/2024 -> {result.iloc[0]}")
+    return False
+
+
+def main():
+    results = [test_date_detection(), test_day_first()]
+    print("\n" + "=" * 60)
+    print("✅ TUTTI I TEST PASSATI" if all(results) else "❌ TEST FALLITI")
+    return all(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST MEMORY GOVERNOR
+=======================
+
+Controlli su modules.memory_governor: scaricando un DataFrame che
+QueryEngine ha registrato come tabella la memoria del processo scende
+davvero (DataFrame e tabella SQLite rilasciati) e la query successiva
+rilegge i dati dal disco.
+"""
+
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from modules.memory_governor import MemoryGovernor
+from modules.query_handler import QueryHandler
+
+ROWS = 500000
+
+
+def check(condition: bool, message: str) -> bool:
+    print(f"   {'✅' if condition else '❌'} {message}")
+    return condition
+
+
+def rss_bytes():
+    """Memoria residente del processo (None se /proc non è disponibile)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class GovernedHandler:
+    """Come ExcelHandler, ma con i dati conservati nel governor"""
+
+    data_version = 1
+
+    def __init__(self, governor):
+        self.governor = governor
+
+    @property
+    def filtered_df(self):
+        return self.governor.get('dati')
+
+
+def make_frame(seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.random((ROWS, 4)), columns=list('abcd'))
+
+
+def test_spill_releases_memory() -> bool:
+    """Lo spill libera DataFrame e tabella registrata, non solo la chiave"""
+    print("💾 Spill di un DataFrame usato dalle query...")
+    spill_dir = tempfile.mkdtemp()
+    frame = make_frame(0)
+    size = int(frame.memory_usage(index=True, deep=True).sum())
+    governor = MemoryGovernor(int(size * 1.5), spill_dir)
+    handler = QueryHandler(GovernedHandler(governor),
+                           memory_governor=governor)
+    governor.put('dati', frame)
+    frame_ref = weakref.ref(frame)
+    del frame
+    result, error = handler.run_query("SELECT COUNT(*) AS n FROM df")
+    expected = result['n'][0] if error is None else None
+    registered = handler.engine._registered_df is not None
+
+    other = make_frame(1)
+    gc.collect()
+    rss_before = rss_bytes()
+    governor.put('altro', other)  # supera il limite: 'dati' va su disco
+    gc.collect()
+    rss_after = rss_bytes()
+
+    results = [
+        check(expected == ROWS and registered, "tabella 'df' registrata"),
+        check(governor.stats()['spilled'] == 1, "'dati' scaricato su disco"),
+        check(handler.engine._registered_df is None,
+              "QueryEngine ha rilasciato la tabella"),
+        check(frame_ref() is None, "nessun riferimento al DataFrame"),
+    ]
+    if rss_before is not None:
+        freed = rss_before - rss_after
+        results.append(check(
+            freed >= size * 0.9,
+            f"RSS scesa di {freed / 1e6:.1f} MB ({size / 1e6:.1f} MB di "
+            f"dati)"))
+
+    result, error = handler.run_query("SELECT COUNT(*) AS n FROM df")
+    results.append(check(error is None and result['n'][0] == ROWS,
+                         "la query successiva rilegge i dati dal disco"))
+    governor.close()
+    handler.engine.close()
+    shutil.rmtree(spill_dir, ignore_errors=True)
+    return all(results)
+
+
+def main():
+    results = [test_spill_releases_memory()]
+    print("\n" + "=" * 60)
+    print("✅ TUTTI I TEST PASSATI" if all(results) else "❌ TEST FALLITI")
+    return all(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST PARSE CACHE
+===================
+
+Controlli su modules.parse_cache: le colonne piccole vengono rilette in
+memoria e non in memory-map, e una voce che non si riesce a cancellare
+(file aperti su Windows) non viene più letta, non conta come spazio
+liberato e viene rimossa al primo evict successivo.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from modules import parse_cache
+from modules.parse_cache import MMAP_MIN_BYTES, ParseCache
+
+ROWS = MMAP_MIN_BYTES // 8 * 2
+
+
+def check(condition: bool, message: str) -> bool:
+    print(f"   {'✅' if condition else '❌'} {message}")
+    return condition
+
+
+def is_mapped(array) -> bool:
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def write_source(folder: str, name: str) -> str:
+    path = os.path.join(folder, name)
+    with open(path, 'w') as f:
+        f.write(name)
+    return path
+
+
+def test_small_columns_in_memory() -> bool:
+    """Memory-map solo da MMAP_MIN_BYTES in su"""
+    print("🗺️ Colonne in memoria e in memory-map...")
+    folder = tempfile.mkdtemp()
+    cache = ParseCache(os.path.join(folder, 'cache'))
+    source = write_source(folder, 'dati.csv')
+    df = pd.DataFrame({'piccola': np.arange(ROWS) < 1000,
+                       'grande': np.arange(ROWS, dtype=np.float64)})
+    cache.put(source, df)
+    cached = cache.get(source)
+    results = [
+        check(cached is not None and cached.equals(df), "DataFrame riletto"),
+        check(not is_mapped(cached['piccola'].to_numpy()),
+              "colonna piccola in memoria"),
+        check(is_mapped(cached['grande'].to_numpy()),
+              "colonna grande in memory-map"),
+    ]
+    del cached
+    shutil.rmtree(folder)
+    return all(results)
+
+
+def test_evict_locked_entry() -> bool:
+    """Una voce rimasta su disco non conta come liberata e viene ritentata"""
+    print("\n🔒 Evict di una voce ancora aperta...")
+    folder = tempfile.mkdtemp()
+    cache = ParseCache(os.path.join(folder, 'cache'))
+    frame = pd.DataFrame({'a': np.arange(ROWS, dtype=np.float64)})
+    first = write_source(folder, 'primo.csv')
+    cache.put(first, frame)
+    (accessed, size, entry), = cache.entries()
+    # Meno recente della voce successiva anche con mtime poco precisi
+    meta_path = os.path.join(entry, parse_cache.META_FILE)
+    os.utime(meta_path, (accessed - 60, accessed - 60))
+
+    # Come su Windows: i file .npy aperti in memory-map non si cancellano
+    rmtree = shutil.rmtree
+    locked = {os.path.join(entry, '0.npy')}
+
+    def windows_rmtree(path, ignore_errors=False):
+        if path != entry:
+            return rmtree(path, ignore_errors=ignore_errors)
+        for name in os.listdir(path):
+            file_path = os.path.join(path, name)
+            if file_path not in locked:
+                os.remove(file_path)
+
+    parse_cache.shutil.rmtree = windows_rmtree
+    try:
+        cache.max_bytes = size + size // 2
+        cache.put(write_source(folder, 'secondo.csv'), frame)
+    finally:
+        parse_cache.shutil.rmtree = rmtree
+
+    results = [
+        check(os.path.isdir(entry), "voce bloccata ancora su disco"),
+        check(cache.get(first) is None, "voce bloccata non più letta"),
+        check(cache.entries() == [],
+              "spazio non liberato: eliminata anche la voce successiva"),
+    ]
+    cache.evict()
+    results.append(check(not os.path.exists(entry),
+                         "voce rimossa al primo evict successivo"))
+    shutil.rmtree(folder)
+    return all(results)
+
+
+def main():
+    results = [test_small_columns_in_memory(), test_evict_locked_entry()]
+    print("\n" + "=" * 60)
+    print("✅ TUTTI I TEST PASSATI" if all(results) else "❌ TEST FALLITI")
+    return all(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)